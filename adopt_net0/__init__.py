@@ -7,6 +7,7 @@ from .result_management import (
     extract_datasets_from_h5group,
 )
 from .diagnostics import get_infeasible_constraints
+from .data_management import export_case_bundle, import_case_bundle
 from .data_preprocessing import *
 
 logger = logging.getLogger()
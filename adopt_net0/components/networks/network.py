@@ -2,7 +2,7 @@ from ..component import ModelComponent
 from ..utilities import (
     annualize,
     set_discount_rate,
-    perform_disjunct_relaxation,
+    perform_component_disjunct_relaxation,
     determine_variable_scaling,
     determine_constraint_scaling,
 )
@@ -287,10 +287,14 @@ class Network(ModelComponent):
         if self.component_options.energyconsumption:
             b_netw = self._define_energyconsumption_parameters(b_netw)
 
+        profiler = data.get("construction_profiler")
+
         def arc_block_init(b_arc, node_from, node_to):
             """
             Constructs each arc as a block
             """
+            if profiler is not None:
+                profiler.start("arc", f"{node_from}-{node_to}")
 
             b_arc.big_m_transformation_required = 0
             b_arc = self._define_size_arc(b_arc, b_netw, node_from, node_to)
@@ -306,7 +310,10 @@ class Network(ModelComponent):
                 b_arc = self._define_energyconsumption_arc(b_arc, b_netw)
 
             if b_arc.big_m_transformation_required:
-                b_arc = perform_disjunct_relaxation(b_arc)
+                b_arc = perform_component_disjunct_relaxation(b_arc, config)
+
+            if profiler is not None:
+                profiler.stop(b_arc)
 
             # LOG
             log_msg = f"\t\t - Constructing Arc {node_from} - {node_to} " f"completed"
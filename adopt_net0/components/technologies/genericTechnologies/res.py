@@ -1,13 +1,13 @@
 import warnings
 import pvlib
-from timezonefinder import TimezoneFinder
+from pvlib import spa
 import pandas as pd
-from pathlib import Path
 import pyomo.environ as pyo
 from scipy.interpolate import interp1d
 import numpy as np
 
 from ..technology import Technology
+from ..resources import get_pv_module, get_wind_turbine_data
 from ...utilities import get_attribute_from_dict
 
 
@@ -46,129 +46,118 @@ class Res(Technology):
 
         self.component_options.emissions_based_on = "output"
 
-    def fit_technology_performance(self, climate_data: pd.DataFrame, location: dict):
+    def fit_technology_performance(
+        self,
+        climate_data: pd.DataFrame,
+        location: dict,
+        capacity_factor: np.ndarray = None,
+    ):
         """
         Fits technology performance
 
         :param pd.Dataframe climate_data: dataframe containing climate data
         :param dict location: dict containing location details
+        :param np.ndarray capacity_factor: (optional) capacity factors calculated
+            beforehand, e.g. for multiple nodes at once with
+            :func:`calculate_pv_capacity_factors` or
+            :func:`calculate_wt_capacity_factors`
         """
         super(Res, self).fit_technology_performance(climate_data, location)
 
         if "Photovoltaic" in self.name:
-            if "system_type" in self.input_parameters.performance_data:
-                self._perform_fitting_pv(
-                    climate_data,
-                    location,
-                    system_data=self.input_parameters.performance_data["system_type"],
-                )
-            else:
-                self._perform_fitting_pv(climate_data, location)
+            self._perform_fitting_pv(climate_data, location, capacity_factor)
 
         elif "SolarThermal" in self.name:
             self._perform_fitting_ST(climate_data)
 
         elif "WindTurbine" in self.name:
-            if "hubheight" in self.input_parameters.performance_data:
-                hubheight = self.input_parameters.performance_data["hubheight"]
-            else:
-                hubheight = 120
-            self._perform_fitting_wt(climate_data, hubheight)
+            self._perform_fitting_wt(climate_data, capacity_factor)
 
         # Options
         self.component_options.other["curtailment"] = get_attribute_from_dict(
             self.input_parameters.performance_data, "curtailment", 0
         )
 
-    def _perform_fitting_pv(self, climate_data: pd.DataFrame, location: dict, **kwargs):
+    def get_capacity_factor_group(self) -> tuple:
         """
-        Calculates capacity factors and specific area requirements for a PV system using pvlib
+        Returns the parameters that determine the capacity factors of the technology
 
-        :param pd.Dataframe climate_data: dataframe containing climate data
-        :param dict location: dict containing location details
-        :param PV_type: (optional) can specify a certain type of module, angle, ...
+        Technologies with the same parameters can be fitted for multiple nodes at
+        once.
+
+        :return: tuple of parameters or None, if the technology has no capacity
+            factors calculated from climate data
+        :rtype: tuple
+        """
+        if "Photovoltaic" in self.name:
+            system_data = self.get_pv_system_data()
+            return (
+                "Photovoltaic",
+                system_data["module_name"],
+                system_data["tilt"],
+                system_data["surface_azimuth"],
+                system_data["inverter_eff"],
+            )
+        elif "WindTurbine" in self.name:
+            return ("WindTurbine", self.name, self.get_hubheight())
+        else:
+            return None
+
+    def get_pv_system_data(self) -> dict:
+        """
+        Returns the PV system data from the performance data or the default system
+
+        :return: tilt, surface_azimuth, module_name and inverter_eff of PV system
+        :rtype: dict
         """
-        if not kwargs.__contains__("system_data"):
+        if "system_type" in self.input_parameters.performance_data:
+            return self.input_parameters.performance_data["system_type"]
+        else:
             system_data = dict()
             system_data["tilt"] = 18
             system_data["surface_azimuth"] = 180
             system_data["module_name"] = "SunPower_SPR_X20_327"
             system_data["inverter_eff"] = 0.96
-        else:
-            system_data = kwargs["system_data"]
-
-        def define_pv_system(location: dict, system_data: dict):
-            """
-            defines the pv system
-            :param dict location: location information (latitude, longitude, altitude,
-            time zone)
-            :param dict system_data: contains data on tilt, surface_azimuth,
-            module_name, inverter efficiency
-            :return: returns PV model chain, peak power, specific area requirements
-            """
-            module_database = pvlib.pvsystem.retrieve_sam("CECMod")
-            module = module_database[system_data["module_name"]]
-
-            # Define temperature losses of module
-            temperature_model_parameters = (
-                pvlib.temperature.TEMPERATURE_MODEL_PARAMETERS["sapm"][
-                    "open_rack_glass_glass"
-                ]
-            )
+            return system_data
 
-            # Create PV model chain
-            inverter_parameters = {
-                "pdc0": 5000,
-                "eta_inv_nom": system_data["inverter_eff"],
-            }
-            system = pvlib.pvsystem.PVSystem(
-                surface_tilt=system_data["tilt"],
-                surface_azimuth=system_data["surface_azimuth"],
-                module_parameters=module,
-                inverter_parameters=inverter_parameters,
-                temperature_model_parameters=temperature_model_parameters,
-            )
-
-            pv_model = pvlib.modelchain.ModelChain(
-                system, location, spectral_model="no_loss", aoi_model="physical"
-            )
-            peakpower = module.STC
-            specific_area = module.STC / module.A_c / 1000 / 1000
-
-            return pv_model, peakpower, specific_area
-
-        # Define parameters for convinience
-        lon = location["lon"]
-        lat = location["lat"]
-        alt = location["alt"]
-
-        if (
-            (np.isnan(location["lon"]))
-            or (np.isnan(location["lat"]))
-            or (np.isnan(location["alt"]))
-        ):
-            raise Exception(
-                "To use Photovoltaic technology you need to specify a "
-                "location in the NodeLocations.csv file"
-            )
+    def get_hubheight(self) -> float:
+        """
+        Returns the hubheight of a wind turbine (default: 120)
 
-        # Get location
-        tf = TimezoneFinder()
-        tz = tf.timezone_at(lng=lon, lat=lat)
-        location = pvlib.location.Location(lat, lon, tz=tz, altitude=alt)
+        :return: hubheight
+        :rtype: float
+        """
+        if "hubheight" in self.input_parameters.performance_data:
+            return self.input_parameters.performance_data["hubheight"]
+        else:
+            return 120
+
+    def _perform_fitting_pv(
+        self,
+        climate_data: pd.DataFrame,
+        location: dict,
+        capacity_factor: np.ndarray = None,
+    ):
+        """
+        Calculates capacity factors and specific area requirements for a PV system using pvlib
 
-        # Initialize pv_system
-        pv_model, peakpower, specific_area = define_pv_system(location, system_data)
+        :param pd.Dataframe climate_data: dataframe containing climate data
+        :param dict location: dict containing location details
+        :param np.ndarray capacity_factor: (optional) capacity factors calculated
+            beforehand
+        """
+        system_data = self.get_pv_system_data()
 
-        # Run system with climate data
-        pv_model.run_model(climate_data)
+        if capacity_factor is None:
+            capacity_factor = calculate_pv_capacity_factors(
+                [climate_data], [location], system_data
+            )[:, 0]
 
-        # Calculate cap factors
-        power = pv_model.results.ac.p_mp
-        capacity_factor = round(power / peakpower, 3)
+        module = get_pv_module(system_data["module_name"])
+        specific_area = module.STC / module.A_c / 1000 / 1000
 
         # Coefficients
-        self.processed_coeff.time_dependent_full["capfactor"] = capacity_factor.values
+        self.processed_coeff.time_dependent_full["capfactor"] = capacity_factor
         self.processed_coeff.time_independent["specific_area"] = specific_area
 
     def _perform_fitting_ST(self, climate_data: pd.DataFrame):
@@ -180,61 +169,27 @@ class Res(Technology):
         # Todo: code this
         pass
 
-    def _perform_fitting_wt(self, climate_data: pd.DataFrame, hubheight: float):
+    def _perform_fitting_wt(
+        self, climate_data: pd.DataFrame, capacity_factor: np.ndarray = None
+    ):
         """
         Calculates capacity factors for a wind turbine
 
         The power curves are located in ``data/technology_data/RES/WT_data``
 
         :param pd.Dataframe climate_data: dataframe containing climate data
-        :param float hubheight: hubheight of wind turbine
+        :param np.ndarray capacity_factor: (optional) capacity factors calculated
+            beforehand
         """
-        # Load data for wind turbine type
-        wt_path = Path(__file__).parent.parent.parent.parent
-        wt_data_path = wt_path / "data/technology_data/RES/WT_data/WT_data.csv"
-        wt_data = pd.read_csv(wt_data_path, delimiter=";")
-
-        # match WT with data
-        if self.name in wt_data["TurbineName"]:
-            wt_data = wt_data[wt_data["TurbineName"] == self.name]
-        else:
-            wt_data = wt_data[wt_data["TurbineName"] == "WindTurbine_Onshore_1500"]
-            warnings.warn(
-                "TurbineName not in csv, standard WindTurbine_Onshore_1500 selected."
-            )
-
-        # Load wind speed and correct for height
-        ws = climate_data["ws10"]
-
-        # TODO: make power exponent choice possible
-        # TODO: Make different heights possible
-        alpha = 1 / 7
-        # if data.node_data.windPowerExponent(node) >= 0
-        #     alpha = data.node_data.windPowerExponent(node);
-        # else:
-        #     if data.node_data.offshore(node) == 1:
-        #         alpha = 0.45;
-        #     else:
-        #         alpha = 1 / 7;
-
-        if hubheight > 0:
-            ws = ws * (hubheight / 10) ** alpha
-
-        # Make power curve
-        rated_power = wt_data.iloc[0]["RatedPowerkW"]
-        x = np.linspace(0, 35, 71)
-        y = wt_data.iloc[:, 13:84]
-        y = y.to_numpy()
-
-        f = interp1d(x, y)
-        ws[ws < 0] = 0
-        capacity_factor = f(ws) / rated_power
+        if capacity_factor is None:
+            capacity_factor = calculate_wt_capacity_factors(
+                [climate_data], self.name, self.get_hubheight()
+            )[:, 0]
 
         # Coefficients
-        self.processed_coeff.time_dependent_full["capfactor"] = capacity_factor[
-            0
-        ].round(3)
+        self.processed_coeff.time_dependent_full["capfactor"] = capacity_factor
         # Rated Power
+        rated_power = get_wind_turbine_power_curve(self.name).iloc[0]["RatedPowerkW"]
         self.input_parameters.rated_power = rated_power / 1000
 
     def _calculate_bounds(self):
@@ -374,3 +329,256 @@ class Res(Technology):
                     for t in self.set_t_performance
                 ],
             )
+
+
+def _stack_climate_data(
+    climate_data: list, column: str, default: float = None
+) -> np.ndarray:
+    """
+    Stacks a column of the climate data of multiple nodes to a (timesteps x nodes)
+    array
+
+    :param list climate_data: list of climate data (pd.DataFrame) of the nodes
+    :param str column: column to stack
+    :param float default: value used if the column is not in the climate data
+    :return: array with one column per node
+    :rtype: np.ndarray
+    """
+    if default is not None and column not in climate_data[0]:
+        return np.full((len(climate_data[0]), len(climate_data)), default)
+    return np.column_stack(
+        [data[column].to_numpy(dtype=np.float64) for data in climate_data]
+    )
+
+
+def _calculate_solar_position(
+    times: pd.DatetimeIndex,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    alt: np.ndarray,
+    temp_air: np.ndarray,
+) -> (np.ndarray, np.ndarray):
+    """
+    Calculates the apparent solar zenith and the solar azimuth for multiple sites
+
+    Uses the NREL SPA algorithm of pvlib with the same settings as
+    pvlib.location.Location.get_solarposition. All parts of the algorithm that only
+    depend on time are calculated once for all sites.
+
+    :param pd.DatetimeIndex times: timesteps
+    :param np.ndarray lat: latitudes as (1 x sites) array
+    :param np.ndarray lon: longitudes as (1 x sites) array
+    :param np.ndarray alt: altitudes as (1 x sites) array
+    :param np.ndarray temp_air: air temperature as (timesteps x sites) array
+    :return: apparent zenith and azimuth as (timesteps x sites) arrays
+    :rtype: tuple
+    """
+    if times.tz is not None:
+        epoch = pd.Timestamp("1970-01-01", tz="UTC").tz_convert(times.tz)
+    else:
+        epoch = pd.Timestamp("1970-01-01")
+    unixtime = np.array((times - epoch) / pd.Timedelta("1s"))
+    delta_t = 67.0
+    atmos_refract = 0.5667
+    pressure = pvlib.atmosphere.alt2pres(alt) / 100
+
+    # Time dependent part
+    v, alpha, delta = spa.solar_position_numpy(
+        unixtime, 0, 0, 0, 0, 0, delta_t, atmos_refract, 1, sst=True
+    )
+    (r,) = spa.solar_position_numpy(
+        unixtime, 0, 0, 0, 0, 0, delta_t, atmos_refract, 1, esd=True
+    )
+    v, alpha, delta, r = (x[:, np.newaxis] for x in (v, alpha, delta, r))
+
+    # Site dependent part
+    h = spa.local_hour_angle(v, lon, alpha)
+    xi = spa.equatorial_horizontal_parallax(r)
+    u = spa.uterm(lat)
+    x = spa.xterm(u, lat, alt)
+    y = spa.yterm(u, lat, alt)
+    delta_alpha = spa.parallax_sun_right_ascension(x, xi, h, delta)
+    delta_prime = spa.topocentric_sun_declination(delta, x, y, xi, delta_alpha, h)
+    h_prime = spa.topocentric_local_hour_angle(h, delta_alpha)
+    e0 = spa.topocentric_elevation_angle_without_atmosphere(lat, delta_prime, h_prime)
+    delta_e = spa.atmospheric_refraction_correction(
+        pressure, temp_air, e0, atmos_refract
+    )
+    e = spa.topocentric_elevation_angle(e0, delta_e)
+    apparent_zenith = spa.topocentric_zenith_angle(e)
+    gamma = spa.topocentric_astronomers_azimuth(h_prime, delta_prime, lat)
+    azimuth = spa.topocentric_azimuth_angle(gamma)
+
+    return apparent_zenith, azimuth
+
+
+def calculate_pv_capacity_factors(
+    climate_data: list, locations: list, system_data: dict
+) -> np.ndarray:
+    """
+    Calculates capacity factors of a PV system for multiple nodes at once
+
+    The calculation is equivalent to a pvlib ModelChain with a CEC module, physical
+    aoi losses, no spectral losses, Hay-Davies transposition, SAPM cell temperature
+    (open rack, glass-glass) and a PVWatts inverter, but all steps are evaluated as
+    (timesteps x nodes) array operations. The single diode model is only solved
+    for timesteps with positive effective irradiance.
+
+    :param list climate_data: list of climate data (pd.DataFrame) of the nodes, all
+        with the same index
+    :param list locations: list of location details (lon, lat, alt) of the nodes
+    :param dict system_data: contains data on tilt, surface_azimuth,
+        module_name, inverter efficiency
+    :return: capacity factors as (timesteps x nodes) array
+    :rtype: np.ndarray
+    """
+    lon = np.array([[location["lon"] for location in locations]], dtype=np.float64)
+    lat = np.array([[location["lat"] for location in locations]], dtype=np.float64)
+    alt = np.array([[location["alt"] for location in locations]], dtype=np.float64)
+    if np.isnan(lon).any() or np.isnan(lat).any() or np.isnan(alt).any():
+        raise Exception(
+            "To use Photovoltaic technology you need to specify a "
+            "location in the NodeLocations.csv file"
+        )
+
+    module = get_pv_module(system_data["module_name"])
+    tilt = system_data["tilt"]
+    surface_azimuth = system_data["surface_azimuth"]
+
+    times = climate_data[0].index
+    ghi = _stack_climate_data(climate_data, "ghi")
+    dni = _stack_climate_data(climate_data, "dni")
+    dhi = _stack_climate_data(climate_data, "dhi")
+    temp_air = _stack_climate_data(climate_data, "temp_air", 20)
+    wind_speed = _stack_climate_data(climate_data, "wind_speed", 0)
+
+    # Irradiance on module
+    apparent_zenith, azimuth = _calculate_solar_position(times, lat, lon, alt, temp_air)
+    dni_extra = pvlib.irradiance.get_extra_radiation(times).to_numpy()
+    total_irrad = pvlib.irradiance.get_total_irradiance(
+        tilt,
+        surface_azimuth,
+        apparent_zenith,
+        azimuth,
+        dni,
+        ghi,
+        dhi,
+        dni_extra=dni_extra[:, np.newaxis],
+        albedo=0.25,
+        model="haydavies",
+    )
+    aoi = pvlib.irradiance.aoi(tilt, surface_azimuth, apparent_zenith, azimuth)
+    effective_irradiance = (
+        total_irrad["poa_direct"] * pvlib.iam.physical(aoi) + total_irrad["poa_diffuse"]
+    )
+
+    # Temperature losses of module
+    temperature_model_parameters = pvlib.temperature.TEMPERATURE_MODEL_PARAMETERS[
+        "sapm"
+    ]["open_rack_glass_glass"]
+    temp_cell = pvlib.temperature.sapm_cell(
+        total_irrad["poa_global"],
+        temp_air,
+        wind_speed,
+        **temperature_model_parameters,
+    )
+
+    # DC and AC power for timesteps with irradiance
+    day = effective_irradiance > 0
+    diode_parameters = pvlib.pvsystem.calcparams_cec(
+        effective_irradiance[day],
+        temp_cell[day],
+        **{
+            parameter: module[parameter]
+            for parameter in [
+                "a_ref",
+                "I_L_ref",
+                "I_o_ref",
+                "R_sh_ref",
+                "R_s",
+                "alpha_sc",
+                "Adjust",
+                "EgRef",
+                "dEgdT",
+                "irrad_ref",
+                "temp_ref",
+            ]
+            if parameter in module.index
+        },
+    )
+    p_dc = np.nan_to_num(
+        np.asarray(pvlib.pvsystem.singlediode(*diode_parameters)["p_mp"]), nan=0
+    )
+    power = np.zeros(effective_irradiance.shape)
+    power[day] = np.nan_to_num(
+        pvlib.inverter.pvwatts(p_dc, 5000, system_data["inverter_eff"]), nan=0
+    )
+
+    return np.round(power / module.STC, 3)
+
+
+def get_wind_turbine_power_curve(turbine_name: str) -> pd.DataFrame:
+    """
+    Returns the power curve of a wind turbine type
+
+    :param str turbine_name: name of wind turbine
+    :return: row of the wind turbine data containing the power curve
+    :rtype: pd.DataFrame
+    """
+    wt_data = get_wind_turbine_data()
+
+    # match WT with data
+    if turbine_name in wt_data["TurbineName"]:
+        return wt_data[wt_data["TurbineName"] == turbine_name]
+    else:
+        warnings.warn(
+            "TurbineName not in csv, standard WindTurbine_Onshore_1500 selected."
+        )
+        return wt_data[wt_data["TurbineName"] == "WindTurbine_Onshore_1500"]
+
+
+def calculate_wt_capacity_factors(
+    climate_data: list, turbine_name: str, hubheight: float
+) -> np.ndarray:
+    """
+    Calculates capacity factors of a wind turbine for multiple nodes at once
+
+    The power curves are located in ``data/technology_data/RES/WT_data``
+
+    :param list climate_data: list of climate data (pd.DataFrame) of the nodes, all
+        with the same index
+    :param str turbine_name: name of wind turbine
+    :param float hubheight: hubheight of wind turbine
+    :return: capacity factors as (timesteps x nodes) array
+    :rtype: np.ndarray
+    """
+    wt_data = get_wind_turbine_power_curve(turbine_name)
+
+    # Load wind speed and correct for height
+    ws = _stack_climate_data(climate_data, "ws10")
+
+    # TODO: make power exponent choice possible
+    # TODO: Make different heights possible
+    alpha = 1 / 7
+    # if data.node_data.windPowerExponent(node) >= 0
+    #     alpha = data.node_data.windPowerExponent(node);
+    # else:
+    #     if data.node_data.offshore(node) == 1:
+    #         alpha = 0.45;
+    #     else:
+    #         alpha = 1 / 7;
+
+    if hubheight > 0:
+        ws = ws * (hubheight / 10) ** alpha
+
+    # Make power curve
+    rated_power = wt_data.iloc[0]["RatedPowerkW"]
+    x = np.linspace(0, 35, 71)
+    y = wt_data.iloc[:, 13:84]
+    y = y.to_numpy()
+
+    f = interp1d(x, y)
+    ws[ws < 0] = 0
+    capacity_factor = f(ws) / rated_power
+
+    return capacity_factor[0].round(3)
@@ -0,0 +1,122 @@
+# Process-wide cache of static data used to fit technologies. All data is loaded
+# once per process and then shared by all technologies.
+import functools
+import os
+from pathlib import Path
+import pandas as pd
+import pvlib
+from timezonefinder import TimezoneFinder
+
+import logging
+
+log = logging.getLogger(__name__)
+
+WT_DATA_PATH = (
+    Path(__file__).parent.parent.parent / "data/technology_data/RES/WT_data/WT_data.csv"
+)
+
+
+def get_user_cache_path() -> Path:
+    """
+    Returns the cache folder of the current user
+
+    The folder is %LOCALAPPDATA%/adopt_net0 on Windows and $XDG_CACHE_HOME/adopt_net0
+    (default: ~/.cache/adopt_net0) otherwise. It is created if it does not exist
+    and is only accessible by the user.
+
+    :return: path to cache folder
+    :rtype: Path
+    """
+    if os.name == "nt":
+        base_path = os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local")
+    else:
+        base_path = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    cache_path = Path(base_path) / "adopt_net0"
+    cache_path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return cache_path
+
+
+@functools.lru_cache(maxsize=None)
+def get_pv_module_database() -> pd.DataFrame:
+    """
+    Returns the CEC module database of pvlib
+
+    Parsing the database is slow. Thus, it is parsed once and then written as a
+    pickle to the cache folder of the user (see :func:`get_user_cache_path`), from
+    which it is read in subsequent runs. The cache folder is not shared with other
+    users, as reading a pickle can execute code.
+
+    :return: CEC module database
+    :rtype: pd.DataFrame
+    """
+    try:
+        cache_path = get_user_cache_path()
+    except OSError:
+        log.debug("Could not create cache folder, parsing module database")
+        return pvlib.pvsystem.retrieve_sam("CECMod")
+
+    pickle_path = (
+        cache_path / f"CECMod_pvlib_{pvlib.__version__}_pandas_{pd.__version__}.pkl"
+    )
+    if pickle_path.exists():
+        try:
+            return pd.read_pickle(pickle_path)
+        except Exception:
+            log.debug(f"Could not read {pickle_path}, parsing module database")
+
+    module_database = pvlib.pvsystem.retrieve_sam("CECMod")
+    try:
+        tmp_path = pickle_path.with_suffix(f".{os.getpid()}.tmp")
+        module_database.to_pickle(tmp_path)
+        os.replace(tmp_path, pickle_path)
+    except OSError:
+        log.debug(f"Could not write {pickle_path}")
+    return module_database
+
+
+def get_pv_module(module_name: str) -> pd.Series:
+    """
+    Returns the parameters of a PV module from the CEC module database
+
+    :param str module_name: name of module
+    :return: module parameters
+    :rtype: pd.Series
+    """
+    return get_pv_module_database()[module_name]
+
+
+@functools.lru_cache(maxsize=None)
+def get_timezone_finder() -> TimezoneFinder:
+    """
+    Returns a TimezoneFinder instance that is shared within the process
+
+    :return: timezone finder
+    :rtype: TimezoneFinder
+    """
+    return TimezoneFinder()
+
+
+@functools.lru_cache(maxsize=4096)
+def get_timezone(lon: float, lat: float) -> str:
+    """
+    Returns the timezone at a location
+
+    :param float lon: longitude
+    :param float lat: latitude
+    :return: name of timezone
+    :rtype: str
+    """
+    return get_timezone_finder().timezone_at(lng=lon, lat=lat)
+
+
+@functools.lru_cache(maxsize=None)
+def get_wind_turbine_data() -> pd.DataFrame:
+    """
+    Returns the power curves of all wind turbines
+
+    The returned data frame is shared and must not be modified.
+
+    :return: wind turbine data from ``data/technology_data/RES/WT_data/WT_data.csv``
+    :rtype: pd.DataFrame
+    """
+    return pd.read_csv(WT_DATA_PATH, delimiter=";")
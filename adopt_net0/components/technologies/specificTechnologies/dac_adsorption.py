@@ -4,9 +4,11 @@ import copy
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from scipy.interpolate import griddata
 
-from ..utilities import fit_piecewise_function
+from ..utilities import (
+    fit_piecewise_function_batch,
+    interpolate_performance_points,
+)
 from ..technology import Technology
 
 import logging
@@ -86,71 +88,39 @@ class DacAdsorption(Technology):
         T.loc[T < min(performance_data.temp_air)] = min(performance_data.temp_air)
 
         # Derive performance points for each timestep
-        def interpolate_performance_point(t, rh, point_data, var):
-            zi = griddata(
-                (point_data.temp_air, point_data.humidity),
-                point_data[var],
-                (T, RH),
-                method="linear",
-            )
-            return zi
-
-        CO2_Out = np.empty(shape=(len(T), len(performance_data.Point.unique())))
-        E_tot = np.empty(shape=(len(T), len(performance_data.Point.unique())))
-        E_el = np.empty(shape=(len(T), len(performance_data.Point.unique())))
-        for point in performance_data.Point.unique():
-            CO2_Out[:, point - 1] = interpolate_performance_point(
-                T, RH, performance_data.loc[performance_data.Point == point], "CO2_Out"
-            )
-            E_tot[:, point - 1] = interpolate_performance_point(
-                T, RH, performance_data.loc[performance_data.Point == point], "E_tot"
-            )
-            E_el[:, point - 1] = interpolate_performance_point(
-                T, RH, performance_data.loc[performance_data.Point == point], "E_el"
-            )
+        variables = ["CO2_Out", "E_tot", "E_el"]
+        interpolated = interpolate_performance_points(
+            performance_data.Point.to_numpy(),
+            performance_data[["temp_air", "humidity"]].to_numpy(),
+            performance_data[variables].to_numpy(),
+            np.column_stack((T.to_numpy(), RH.to_numpy())),
+        )
+        CO2_Out = interpolated[:, :, 0]
+        E_tot = interpolated[:, :, 1]
+        E_el = interpolated[:, :, 2]
 
         # Derive piecewise definition
-        alpha = np.empty(shape=(len(T), nr_segments))
-        beta = np.empty(shape=(len(T), nr_segments))
-        b = np.empty(shape=(len(T), nr_segments + 1))
-        gamma = np.empty(shape=(len(T), nr_segments))
-        delta = np.empty(shape=(len(T), nr_segments))
-        a = np.empty(shape=(len(T), nr_segments + 1))
-        el_in_max = np.empty(shape=(len(T)))
-        th_in_max = np.empty(shape=(len(T)))
-        out_max = np.empty(shape=(len(T)))
-        total_in_max = np.empty(shape=(len(T)))
-
         log.info("Deriving performance data for DAC...")
 
-        for timestep in range(len(T)):
-            if timestep % 100 == 1:
-                print("\rComplete: ", round(timestep / len(T), 2) * 100, "%", end="")
-            # Input-Output relation
-            y = {}
-            y["CO2_Out"] = CO2_Out[timestep, :]
-            time_step_fit = fit_piecewise_function(
-                E_tot[timestep, :], y, int(nr_segments)
-            )
-            alpha[timestep, :] = time_step_fit["CO2_Out"]["alpha1"]
-            beta[timestep, :] = time_step_fit["CO2_Out"]["alpha2"]
-            b[timestep, :] = time_step_fit["CO2_Out"]["bp_x"]
-            out_max[timestep] = max(time_step_fit["CO2_Out"]["bp_y"])
-            total_in_max[timestep] = max(time_step_fit["CO2_Out"]["bp_x"])
-
-            # Input-Input relation
-            y = {}
-            y["E_el"] = E_el[timestep, :]
-            time_step_fit = fit_piecewise_function(
-                E_tot[timestep, :], y, int(nr_segments)
-            )
-            gamma[timestep, :] = time_step_fit["E_el"]["alpha1"]
-            delta[timestep, :] = time_step_fit["E_el"]["alpha2"]
-            a[timestep, :] = time_step_fit["E_el"]["bp_x"]
-            el_in_max[timestep] = max(time_step_fit["E_el"]["bp_y"])
-            th_in_max[timestep] = max(time_step_fit["E_el"]["bp_x"])
-
-        print("Complete: ", 100, "%")
+        # Input-Output relation
+        fit = fit_piecewise_function_batch(
+            E_tot, {"CO2_Out": CO2_Out}, int(nr_segments)
+        )["CO2_Out"]
+        alpha = fit["alpha1"]
+        beta = fit["alpha2"]
+        b = fit["bp_x"]
+        out_max = fit["bp_y"].max(axis=1)
+        total_in_max = fit["bp_x"].max(axis=1)
+
+        # Input-Input relation
+        fit = fit_piecewise_function_batch(E_tot, {"E_el": E_el}, int(nr_segments))[
+            "E_el"
+        ]
+        gamma = fit["alpha1"]
+        delta = fit["alpha2"]
+        a = fit["bp_x"]
+        el_in_max = fit["bp_y"].max(axis=1)
+        th_in_max = fit["bp_x"].max(axis=1)
 
         # Coefficients
         self.processed_coeff.time_dependent_full["alpha"] = alpha
@@ -5,7 +5,11 @@ import numpy as np
 import statsmodels.api as sm
 import pandas as pd
 
-from ..utilities import fit_piecewise_function, fit_linear_function
+from ..utilities import (
+    fit_piecewise_function_batch,
+    fit_linear_function,
+    sig_figs_array,
+)
 from ..technology import Technology
 from ...utilities import link_full_resolution_to_clustered
 
@@ -96,61 +100,40 @@ class HeatPump(Technology):
 
         log.info("Deriving performance data for Heat Pump...")
 
-        if (
-            self.component_options.performance_function_type == 1
-            or self.component_options.performance_function_type == 2
-        ):  # Linear performance function
-            size_alpha = 1
-        elif self.component_options.performance_function_type == 3:
-            size_alpha = 2
-        else:
+        if self.component_options.performance_function_type not in [1, 2, 3]:
             raise Exception(
                 "performance_function_type must be an integer between 1 and 3"
             )
 
-        fit = {}
-        fit["out"] = {}
-        alpha1 = np.empty(shape=(time_steps, size_alpha))
-        alpha2 = np.empty(shape=(time_steps, size_alpha))
-        bp_x = np.empty(shape=(time_steps, size_alpha + 1))
-
-        for idx, cop_t in enumerate(cop):
-            if idx % 100 == 1:
-                print("\rComplete: ", round(idx / time_steps, 2) * 100, "%", end="")
-
-            if self.component_options.performance_function_type == 1:
-                x = np.linspace(
-                    self.input_parameters.performance_data["min_part_load"], 1, 9
-                )
-                y = (x / (1 - 0.9 * (1 - x))) * cop_t * x
-                coeff = fit_linear_function(x, y)
-                alpha1[idx, :] = coeff[0]
+        # The part load curve is separable in the COP: out_t(x) = cop_t * g(x).
+        # Thus, the curve g(x) is fitted once and the coefficients are scaled with
+        # the COP of each timestep. The breakpoints of the piecewise fit do not
+        # depend on the COP.
+        cop = np.asarray(cop, dtype=float)[:, None]
+        x = np.linspace(self.input_parameters.performance_data["min_part_load"], 1, 9)
+        g = (x / (1 - 0.9 * (1 - x))) * x
 
-            elif self.component_options.performance_function_type == 2:
-                x = np.linspace(
-                    self.input_parameters.performance_data["min_part_load"], 1, 9
-                )
-                y = (x / (1 - 0.9 * (1 - x))) * cop_t * x
-                x = sm.add_constant(x)
-                coeff = fit_linear_function(x, y)
-                alpha1[idx, :] = coeff[1]
-                alpha2[idx, :] = coeff[0]
-
-            elif (
-                self.component_options.performance_function_type == 3
-            ):  # piecewise performance function
-                y = {}
-                x = np.linspace(
-                    self.input_parameters.performance_data["min_part_load"], 1, 9
-                )
-                y["out"] = (x / (1 - 0.9 * (1 - x))) * cop_t * x
-                time_step_fit = fit_piecewise_function(x, y, 2)
-                alpha1[idx, :] = time_step_fit["out"]["alpha1"]
-                alpha2[idx, :] = time_step_fit["out"]["alpha2"]
-                bp_x[idx, :] = time_step_fit["out"]["bp_x"]
-        print("Complete: ", 100, "%")
+        if self.component_options.performance_function_type == 1:
+            coeff = fit_linear_function(x, g)
+            alpha1 = cop * coeff[0]
+
+        elif self.component_options.performance_function_type == 2:
+            coeff = fit_linear_function(sm.add_constant(x), g)
+            alpha1 = cop * coeff[1]
+            alpha2 = cop * coeff[0]
+
+        elif (
+            self.component_options.performance_function_type == 3
+        ):  # piecewise performance function
+            base_fit = fit_piecewise_function_batch(
+                x, {"out": g}, 2, significant_figures=None
+            )["out"]
+            alpha1 = sig_figs_array(cop * base_fit["alpha1"], 4)
+            alpha2 = sig_figs_array(cop * base_fit["alpha2"], 4)
+            bp_x = np.repeat(sig_figs_array(base_fit["bp_x"], 4), time_steps, axis=0)
 
         # Coefficients
+        fit = {}
         fit["coeff"] = {}
         if self.component_options.performance_function_type == 1:
             fit["coeff"]["alpha1"] = alpha1.round(5)
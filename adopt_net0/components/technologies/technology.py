@@ -392,14 +392,14 @@ class Technology(ModelComponent):
             self.component_options.modelled_with_full_res = True
             self.set_t_performance = set_t_full
             self.set_t_global = set_t_full
-            self.sequence = list(self.set_t_performance)
+            self.sequence = np.array(list(self.set_t_performance))
 
         elif config["optimization"]["typicaldays"]["method"]["value"] == 1:
             # everything with reduced resolution
             self.component_options.modelled_with_full_res = False
             self.set_t_performance = set_t_clustered
             self.set_t_global = set_t_clustered
-            self.sequence = list(self.set_t_performance)
+            self.sequence = np.array(list(self.set_t_performance))
 
         elif config["optimization"]["typicaldays"]["method"]["value"] == 2:
             # resolution of balances is full, so interactions with them also need to
@@ -414,7 +414,7 @@ class Technology(ModelComponent):
                 self.component_options.modelled_with_full_res = True
                 self.component_options.lower_res_than_full = False
                 self.set_t_performance = self.set_t_full
-                self.sequence = list(self.set_t_performance)
+                self.sequence = np.array(list(self.set_t_performance))
             else:
                 # technologies modelled with reduced resolution
                 self.component_options.modelled_with_full_res = False
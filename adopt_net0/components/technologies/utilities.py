@@ -1,8 +1,11 @@
+import hashlib
+import itertools
 import json
 import os
 import pwlf
 import numpy as np
 from math import floor, log10
+from scipy.spatial import Delaunay
 from statsmodels import api as sm
 from pathlib import Path
 
@@ -132,6 +135,354 @@ def fit_piecewise_function(X: np.array, Y: np.array, nr_segments: int) -> dict:
     return fit
 
 
+def fit_piecewise_function_batch(
+    X: np.array,
+    Y: dict,
+    nr_segments: int,
+    grid_size: int = 20,
+    nr_refinements: int = 25,
+    significant_figures: int = 4,
+) -> dict:
+    """
+    Returns fitted parameters of piecewise defined functions for many data sets
+
+    Vectorized version of :func:`fit_piecewise_function`, fitting a continuous
+    piecewise linear function to each row of the data at once (e.g. one row per
+    timestep). The breakpoints are determined on the first y-series by a grid
+    search over all rows, followed by a local refinement of the best grid points.
+    For fixed breakpoints, the least squares problems of all rows are solved at
+    once. All other y-series are fitted with the breakpoints of the first one.
+
+    :param np.array X: x-values of data with shape (T, n) or (n,), if all rows
+        share the same x-values
+    :param dict Y: y-values of data with shape (T, n) for each series
+    :param int nr_segments: number of segments on piecewise defined function
+    :param int grid_size: number of grid points per breakpoint for the grid search
+    :param int nr_refinements: number of local refinement steps (each halving the
+        step size)
+    :param int significant_figures: number of significant figures to round the
+        results to. If None, results are not rounded
+    :return: x and y breakpoints, slope and intercept parameters of piecewise
+        defined function as arrays with one row per data set
+    :rtype: dict
+    """
+    series = list(Y)
+    Y = {car: np.atleast_2d(np.asarray(Y[car], dtype=float)) for car in series}
+    X = np.broadcast_to(np.asarray(X, dtype=float), Y[series[0]].shape)
+
+    x_min = X.min(axis=1)
+    x_max = X.max(axis=1)
+    u = _find_breakpoints_batch(X, Y[series[0]], nr_segments, grid_size, nr_refinements)
+    bp_x = np.column_stack(
+        (
+            x_min,
+            x_min[:, None] + u * (x_max - x_min)[:, None],
+            x_max,
+        )
+    )
+
+    fit = {}
+    for car in series:
+        beta = _solve_least_squares_batch(
+            _piecewise_design_matrix(X, bp_x[:, :-1]), Y[car]
+        )[0]
+        bp_y = np.einsum(
+            "tij,tj->ti", _piecewise_design_matrix(bp_x, bp_x[:, :-1]), beta
+        )
+        alpha1 = np.diff(bp_y, axis=1) / np.diff(bp_x, axis=1)  # Slope
+        alpha2 = bp_y[:, :-1] - alpha1 * bp_x[:, :-1]  # Intercept
+
+        fit[car] = {}
+        fit[car]["alpha1"] = alpha1
+        fit[car]["alpha2"] = alpha2
+        fit[car]["bp_y"] = bp_y
+        fit[car]["bp_x"] = bp_x
+        if significant_figures is not None:
+            for par in fit[car]:
+                fit[car][par] = sig_figs_array(fit[car][par], significant_figures)
+
+    return fit
+
+
+def _piecewise_design_matrix(x: np.array, breakpoints: np.array) -> np.array:
+    """
+    Returns the design matrix of a continuous piecewise linear function
+
+    Uses the same basis as pwlf: [1, x - b_0, max(x - b_1, 0), ...]
+
+    :param np.array x: x-values with shape (..., n)
+    :param np.array breakpoints: all breakpoints but the last with shape (..., k)
+    :return: design matrix with shape (..., n, k + 1)
+    :rtype: np.array
+    """
+    A = np.maximum(x[..., :, None] - breakpoints[..., None, :], 0)
+    A[..., 0] = x - breakpoints[..., 0:1]
+    return np.concatenate((np.ones(A.shape[:-1] + (1,)), A), axis=-1)
+
+
+def _solve_least_squares_batch(A: np.array, y: np.array) -> (np.array, np.array):
+    """
+    Solves many small least squares problems at once
+
+    Uses the normal equations with a small regularization, so that problems with
+    segments without data points remain solvable.
+
+    :param np.array A: design matrices with shape (..., n, p)
+    :param np.array y: data with shape (n,) or (T, n), broadcast against A
+    :return: coefficients with shape (..., p) and sum of squared residuals
+    :rtype: tuple
+    """
+    y = np.broadcast_to(
+        y.reshape(y.shape[:1] + (1,) * (A.ndim - 3) + y.shape[1:]), A.shape[:-1]
+    )
+    M = np.einsum("...ij,...ik->...jk", A, A)
+    r = np.einsum("...ij,...i->...j", A, y)
+    regularization = 1e-12 * (np.trace(M, axis1=-2, axis2=-1) + 1)
+    M = M + regularization[..., None, None] * np.eye(M.shape[-1])
+    beta = np.linalg.solve(M, r[..., None])[..., 0]
+    residuals = np.einsum("...ij,...j->...i", A, beta) - y
+    return beta, np.einsum("...i,...i->...", residuals, residuals)
+
+
+def _find_breakpoints_batch(
+    X: np.array,
+    Y: np.array,
+    nr_segments: int,
+    grid_size: int,
+    nr_refinements: int,
+    nr_starts: int = 5,
+) -> np.array:
+    """
+    Finds the interior breakpoints minimizing the sum of squared residuals
+
+    The breakpoints are returned relative to the range of x, i.e. 0 corresponds to
+    the minimum and 1 to the maximum x-value of a row.
+
+    :param np.array X: x-values with shape (T, n)
+    :param np.array Y: y-values with shape (T, n)
+    :param int nr_segments: number of segments
+    :param int grid_size: number of grid points per breakpoint
+    :param int nr_refinements: number of local refinement steps
+    :param int nr_starts: number of best grid points that are refined
+    :return: relative interior breakpoints with shape (T, nr_segments - 1)
+    :rtype: np.array
+    """
+    nr_rows = X.shape[0]
+    nr_interior = nr_segments - 1
+    if nr_interior == 0:
+        return np.empty((nr_rows, 0))
+
+    grid = np.linspace(0, 1, grid_size + 2)[1:-1]
+    grid_candidates = np.array(list(itertools.combinations(grid, nr_interior)))
+    offsets = np.array(
+        list(itertools.product([-1, -0.5, 0, 0.5, 1], repeat=nr_interior))
+    )
+    nr_starts = min(nr_starts, len(grid_candidates))
+
+    # Process rows in chunks to limit memory use
+    nr_candidates = max(len(grid_candidates), nr_starts * len(offsets))
+    chunk_size = max(1, int(2e6 // (nr_candidates * X.shape[1] * (nr_segments + 1))))
+
+    u = np.empty((nr_rows, nr_interior))
+    for start in range(0, nr_rows, chunk_size):
+        end = min(start + chunk_size, nr_rows)
+        x = X[start:end]
+        y = Y[start:end]
+        x_min = x.min(axis=1)[:, None, None]
+        x_range = (x.max(axis=1) - x.min(axis=1))[:, None, None]
+
+        def calculate_ssr(candidates):
+            # candidates: relative interior breakpoints (rows, C, nr_interior)
+            breakpoints = np.concatenate(
+                (
+                    np.broadcast_to(x_min, candidates.shape[:2] + (1,)),
+                    x_min + candidates * x_range,
+                ),
+                axis=-1,
+            )
+            A = _piecewise_design_matrix(x[:, None, :], breakpoints)
+            ssr = _solve_least_squares_batch(A, y)[1]
+            return np.where(np.isnan(ssr), np.inf, ssr)
+
+        # Grid search over all combinations of increasing breakpoints, keeping the
+        # best grid points as starting points for the refinement
+        ssr = calculate_ssr(
+            np.broadcast_to(grid_candidates, (end - start,) + grid_candidates.shape)
+        )
+        best = np.argsort(ssr, axis=1)[:, :nr_starts]
+        u_starts = grid_candidates[best]
+
+        # Local refinement around starting points
+        rows = np.arange(end - start)[:, None]
+        step = 1 / (grid_size + 1)
+        for _ in range(nr_refinements):
+            candidates = np.sort(
+                np.clip(
+                    u_starts[:, :, None, :] + offsets[None, None, :, :] * step, 0, 1
+                ),
+                axis=-1,
+            )
+            ssr = calculate_ssr(
+                candidates.reshape(end - start, -1, nr_interior)
+            ).reshape(candidates.shape[:3])
+            u_starts = candidates[
+                rows, np.arange(nr_starts)[None, :], np.argmin(ssr, axis=2)
+            ]
+            ssr_starts = ssr.min(axis=2)
+            step = step / 2
+
+        u[start:end] = u_starts[rows[:, 0], np.argmin(ssr_starts, axis=1)]
+
+    return u
+
+
+# Interpolation weights of recently used climate data, see
+# calculate_interpolation_weights
+_interpolation_weights_cache = {}
+INTERPOLATION_WEIGHTS_CACHE_SIZE = 16
+
+
+def calculate_interpolation_weights(
+    points: np.array, xi: np.array
+) -> (np.array, np.array):
+    """
+    Calculates weights for linear interpolation on scattered data
+
+    Triangulates the data points once (as scipy.interpolate.griddata with method
+    linear does) and calculates the barycentric weights of all points to interpolate
+    at. The weights can be used to interpolate any number of variables defined on
+    the same data points with :func:`interpolate_linear`. Weights are cached for
+    recently used inputs, e.g. for nodes sharing the same climate data.
+
+    :param np.array points: data point coordinates with shape (n, 2)
+    :param np.array xi: points to interpolate at with shape (T, 2)
+    :return: indices of the vertices of the enclosing simplex with shape (T, 3)
+        and the respective weights with shape (T, 3). Weights of points outside the
+        convex hull of the data points are NaN.
+    :rtype: tuple
+    """
+    points = np.ascontiguousarray(points, dtype=float)
+    xi = np.ascontiguousarray(xi, dtype=float)
+    key = hashlib.sha256(
+        points.tobytes() + str(points.shape).encode() + xi.tobytes()
+    ).hexdigest()
+    if key in _interpolation_weights_cache:
+        return _interpolation_weights_cache[key]
+
+    triangulation = Delaunay(points)
+    simplex = triangulation.find_simplex(xi)
+    transform = triangulation.transform[simplex]
+    barycentric = np.einsum("tij,tj->ti", transform[:, :2, :], xi - transform[:, 2, :])
+    weights = np.column_stack((barycentric, 1 - barycentric.sum(axis=1)))
+    weights[simplex == -1, :] = np.nan
+    vertices = triangulation.simplices[simplex]
+
+    if len(_interpolation_weights_cache) >= INTERPOLATION_WEIGHTS_CACHE_SIZE:
+        del _interpolation_weights_cache[next(iter(_interpolation_weights_cache))]
+    _interpolation_weights_cache[key] = (vertices, weights)
+
+    return vertices, weights
+
+
+def interpolate_linear(
+    vertices: np.array, weights: np.array, values: np.array
+) -> np.array:
+    """
+    Interpolates values linearly with precomputed weights
+
+    :param np.array vertices: vertices from :func:`calculate_interpolation_weights`
+    :param np.array weights: weights from :func:`calculate_interpolation_weights`
+    :param np.array values: values at the data points with shape (n,) or (n, m)
+    :return: interpolated values with shape (T,) or (T, m)
+    :rtype: np.array
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        return np.einsum("tk,tk->t", weights, values[vertices])
+    return np.einsum("tk,tkm->tm", weights, values[vertices])
+
+
+def interpolate_performance_points(
+    labels: np.array, coordinates: np.array, values: np.array, xi: np.array
+) -> np.array:
+    """
+    Interpolates the values of multiple performance points linearly on scattered data
+
+    Each row of the data belongs to a performance point (label). If all performance
+    points have the same data point coordinates (in any row order), the rows of
+    each performance point are sorted to the order of the first one and the
+    interpolation weights are calculated once for all performance points, see
+    :func:`calculate_interpolation_weights`. Otherwise, the weights are calculated
+    for each performance point.
+
+    :param np.array labels: performance point of each row with shape (n,)
+    :param np.array coordinates: data point coordinates of each row with shape (n, 2)
+    :param np.array values: values of each row with shape (n, m)
+    :param np.array xi: points to interpolate at with shape (T, 2)
+    :return: interpolated values with shape (T, performance points, m), the
+        performance points are in ascending order of their labels
+    :rtype: np.array
+    """
+    labels = np.asarray(labels)
+    coordinates = np.asarray(coordinates, dtype=float)
+    values = np.asarray(values, dtype=float)
+    points = np.unique(labels)
+    rows = [np.flatnonzero(labels == point) for point in points]
+
+    # Align the rows of all performance points to the rows of the first one
+    reference = rows[0]
+    reference_order = np.lexsort(coordinates[reference].T[::-1])
+    aligned_rows = [reference]
+    for point_rows in rows[1:]:
+        order = np.lexsort(coordinates[point_rows].T[::-1])
+        if len(point_rows) != len(reference) or not np.array_equal(
+            coordinates[point_rows[order]], coordinates[reference[reference_order]]
+        ):
+            aligned_rows = None
+            break
+        aligned = np.empty_like(point_rows)
+        aligned[reference_order] = point_rows[order]
+        aligned_rows.append(aligned)
+
+    interpolated = np.empty((len(xi), len(points), values.shape[1]))
+    if aligned_rows is not None:
+        vertices, weights = calculate_interpolation_weights(coordinates[reference], xi)
+        point_values = values[np.column_stack(aligned_rows)]
+        interpolated[:] = interpolate_linear(
+            vertices, weights, point_values.reshape(len(reference), -1)
+        ).reshape(interpolated.shape)
+    else:
+        for column, point_rows in enumerate(rows):
+            vertices, weights = calculate_interpolation_weights(
+                coordinates[point_rows], xi
+            )
+            interpolated[:, column, :] = interpolate_linear(
+                vertices, weights, values[point_rows]
+            )
+    return interpolated
+
+
+def sig_figs_array(x: np.array, precision: int) -> np.array:
+    """
+    Rounds all numbers of an array to a number of significant figures
+
+    Vectorized version of :func:`sig_figs`
+
+    :param np.array x: numbers to round
+    :param int precision: rounding precision
+    :return: rounded numbers
+    :rtype: np.array
+    """
+    x = np.asarray(x, dtype=float)
+    rounded = np.zeros_like(x)
+    round_x = (x != 0) & np.isfinite(x)
+    decimals = -np.floor(np.log10(np.abs(x[round_x]))) + (int(precision) - 1)
+    scale = 10.0**decimals
+    rounded[round_x] = np.round(x[round_x] * scale) / scale
+    rounded[~np.isfinite(x)] = x[~np.isfinite(x)]
+    return rounded
+
+
 def sig_figs(x: float, precision: int):
     """
     Rounds a number to number of significant figures
@@ -48,7 +48,7 @@ def link_full_resolution_to_clustered(
     :param var_clustered: pyomo variable with clustered resolution
     :param var_full: pyomo variable with full resolution
     :param set_t_full: pyomo set containing timesteps
-    :param sequence: order of typical days
+    :param np.ndarray sequence: clustered timestep of each full resolution timestep
     :param other_sets: other pyomo sets that variables are indexed by
     :return: pyomo constraint linking var_clustered and var_full
     """
@@ -79,19 +79,25 @@ def link_full_resolution_to_clustered(
     return constraint
 
 
-def perform_disjunct_relaxation(model_block, method: str = "gdp.bigm"):
+def perform_disjunct_relaxation(
+    model_block, method: str = "gdp.bigm", solver: str = None
+):
     """
     Performs big-m transformation for respective component
 
     :param component: pyomo component
     :param str method: method to make transformation with.
+    :param str solver: solver used to calculate the big-M values (only for gdp.mbigm)
     :return: component
     """
     log_msg = "\t\t\t" + method + " Transformation..."
     log.info(log_msg)
     start = time.time()
     xfrm = pyo.TransformationFactory(method)
-    xfrm.apply_to(model_block)
+    if method == "gdp.mbigm" and solver is not None:
+        xfrm.apply_to(model_block, solver=pyo.SolverFactory(solver))
+    else:
+        xfrm.apply_to(model_block)
     log_msg = (
         "\t\t\t"
         + method
@@ -104,6 +110,51 @@ def perform_disjunct_relaxation(model_block, method: str = "gdp.bigm"):
     return model_block
 
 
+def get_disjunct_relaxation_options(config: dict) -> dict:
+    """
+    Gets the transformation method and solver for the disjunct relaxation
+
+    :param dict config: dict containing model information
+    :return: keyword arguments for perform_disjunct_relaxation
+    :rtype: dict
+    """
+    return {
+        "method": config["performance"]["gdp_transformation"]["value"],
+        "solver": config["solveroptions"]["solver"]["value"].replace("_persistent", ""),
+    }
+
+
+def get_disjunct_reformulation_name(config: dict) -> str:
+    """
+    Gets the name of the block pyomo adds the reformulated disjunctions to
+
+    :param dict config: dict containing model information
+    :return: name of the reformulation block
+    :rtype: str
+    """
+    method = config["performance"]["gdp_transformation"]["value"]
+    return "_pyomo_gdp_" + method.split(".")[1] + "_reformulation"
+
+
+def perform_component_disjunct_relaxation(model_block, config: dict):
+    """
+    Performs the disjunct relaxation of a technology, network or arc block
+
+    If the transformation is deferred, the block is not transformed here. All
+    disjunctions are then transformed in one pass after the balances are
+    constructed (see ModelHub.construct_balances).
+
+    :param model_block: pyomo block of the component
+    :param dict config: dict containing model information
+    :return: pyomo block of the component
+    """
+    if config["performance"]["deferred_gdp_transformation"]["value"]:
+        return model_block
+    return perform_disjunct_relaxation(
+        model_block, **get_disjunct_relaxation_options(config)
+    )
+
+
 def read_dict_value(dict: dict, key: str) -> str | int | float:
     """
     Reads a value from a dictonary or sets it to 1 if key is not in dict
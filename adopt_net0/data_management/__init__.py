@@ -1,2 +1,11 @@
 from .handle_input_data import DataHandle
+from .case_bundle import CaseBundle, export_case_bundle, import_case_bundle
 from .utilities import check_input_data_consistency, read_tec_data
+from .technology_fitting import fit_technologies
+from .technology_fit_cache import TechnologyFitCache
+from .time_series_clustering import (
+    ClusteringCache,
+    cluster_investment_periods,
+    evaluate_nr_typical_days,
+)
+from .time_series_aggregation import average_time_series, cluster_days
@@ -0,0 +1,336 @@
+import hashlib
+import io
+import json
+from pathlib import Path
+import h5py
+import numpy as np
+import pandas as pd
+
+from .time_series_reader import replace_nan
+import logging
+
+log = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = "adopt_net0_case_bundle"
+BUNDLE_VERSION = 1
+CHUNK_ROWS = 8760
+
+
+def export_case_bundle(
+    data_path: Path | str, bundle_path: Path | str, compression: str = None
+):
+    """
+    Packs an input data folder into a single HDF5 file (case bundle)
+
+    Each file of the input data folder is stored under its relative path. Time series
+    (csv files in node_data) are stored as chunked float64 arrays with their index
+    and column names, all other files (json files, network matrices, node
+    locations,...) are embedded as they are. The content hash of each file is
+    stored to detect changes (see :meth:`DataHandle.refresh`). Hidden files and
+    folders (e.g. the cache folder) are skipped.
+
+    :param Path, str data_path: input data folder
+    :param Path, str bundle_path: path of the case bundle to write
+    :param str compression: compression filter of the time series (e.g. gzip or
+        lzf), if None the time series are not compressed
+    """
+    data_path = Path(data_path)
+    nr_files = 0
+    with h5py.File(bundle_path, "w") as bundle:
+        bundle.attrs["format"] = BUNDLE_FORMAT
+        bundle.attrs["version"] = BUNDLE_VERSION
+        for file_path in sorted(data_path.rglob("*")):
+            rel_path = file_path.relative_to(data_path)
+            if not file_path.is_file() or any(
+                part.startswith(".") for part in rel_path.parts
+            ):
+                continue
+            content = file_path.read_bytes()
+            entry = None
+            if file_path.suffix == ".csv" and "node_data" in rel_path.parts:
+                entry = _write_time_series(bundle, rel_path, content, compression)
+            if entry is None:
+                entry = bundle.create_dataset(
+                    rel_path.as_posix(), data=np.frombuffer(content, dtype=np.uint8)
+                )
+                entry.attrs["kind"] = "file"
+            entry.attrs["sha256"] = hashlib.sha256(content).hexdigest()
+            entry.attrs["size"] = len(content)
+            nr_files += 1
+
+    log.info(f"Exported {nr_files} files from {data_path} to {bundle_path}")
+
+
+def _write_time_series(
+    bundle: h5py.File, rel_path: Path, content: bytes, compression: str = None
+):
+    """
+    Writes a time series csv file to a case bundle
+
+    :param h5py.File bundle: case bundle
+    :param Path rel_path: path of the file relative to the input data folder
+    :param bytes content: content of the file
+    :param str compression: compression filter
+    :return: group of the time series or None if the file is not numeric
+    :rtype: h5py.Group
+    """
+    time_series = pd.read_csv(io.BytesIO(content), sep=";", index_col=0)
+    try:
+        values = time_series.to_numpy(dtype=np.float64)
+    except ValueError:
+        return None
+
+    entry = bundle.create_group(rel_path.as_posix())
+    entry.attrs["kind"] = "time_series"
+    entry.attrs["columns"] = json.dumps([str(column) for column in time_series])
+    entry.create_dataset(
+        "values",
+        data=values,
+        chunks=(
+            (min(values.shape[0], CHUNK_ROWS), values.shape[1]) if values.size else None
+        ),
+        compression=compression if values.size else None,
+    )
+    entry.create_dataset(
+        "index",
+        data=time_series.index.astype(str).to_numpy(dtype=object),
+        dtype=h5py.string_dtype(),
+    )
+    return entry
+
+
+def import_case_bundle(bundle_path: Path | str, data_path: Path | str):
+    """
+    Unpacks a case bundle into an input data folder
+
+    :param Path, str bundle_path: path of the case bundle
+    :param Path, str data_path: folder to write the input data to
+    """
+    bundle = CaseBundle(bundle_path)
+    data_path = Path(data_path)
+    for rel_path, entry in bundle.entries.items():
+        file_path = data_path / rel_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if entry["kind"] == "time_series":
+            bundle.read_csv(rel_path).to_csv(file_path, sep=";")
+        else:
+            file_path.write_bytes(bundle.read_bytes(rel_path))
+
+    log.info(f"Imported {len(bundle.entries)} files from {bundle_path} to {data_path}")
+
+
+class CaseBundle:
+    """
+    Input data packed into a single HDF5 file
+
+    The bundle is written with :func:`export_case_bundle`. It provides the same
+    methods as an :class:`InputFolder`, so that the DataHandle can read the input
+    data directly from the bundle. All paths passed to the methods are relative to
+    the input data folder the bundle was created from. The file is opened for each
+    read, so that the bundle can be replaced between reads.
+
+    :param Path path: path of the case bundle
+    :param dict entries: files in the bundle as {path: {"kind", "sha256", "size"}}
+    """
+
+    def __init__(self, path: Path | str):
+        """
+        Constructor
+
+        :param Path, str path: path of the case bundle
+        """
+        self.path = Path(path)
+        self.entries = {}
+
+        def add_entry(name, obj):
+            if "kind" in obj.attrs:
+                self.entries[name] = {
+                    "kind": obj.attrs["kind"],
+                    "sha256": obj.attrs["sha256"],
+                    "size": int(obj.attrs["size"]),
+                }
+
+        with h5py.File(self.path, "r") as bundle:
+            if bundle.attrs.get("format") != BUNDLE_FORMAT:
+                raise Exception(f"{self.path} is not a case bundle")
+            if bundle.attrs["version"] != BUNDLE_VERSION:
+                raise Exception(
+                    f"Case bundle {self.path} has version {bundle.attrs['version']}, "
+                    f"but version {BUNDLE_VERSION} is required"
+                )
+            bundle.visititems(add_entry)
+
+        self.folders = {"."}
+        for rel_path in self.entries:
+            self.folders.update(parent.as_posix() for parent in Path(rel_path).parents)
+
+    def _get_entry(self, rel_path: Path | str) -> str:
+        """
+        Returns the name of a file in the bundle
+
+        :param Path, str rel_path: path relative to the input data folder
+        :return: name of the file in the bundle
+        :rtype: str
+        """
+        name = Path(rel_path).as_posix()
+        if name not in self.entries:
+            raise FileNotFoundError(f"There is no file {name} in {self.path}")
+        return name
+
+    def exists(self, rel_path: Path | str) -> bool:
+        """
+        Checks if a file or folder exists
+
+        :param Path, str rel_path: path relative to the input data folder
+        :return: True if the file or folder exists
+        :rtype: bool
+        """
+        name = Path(rel_path).as_posix()
+        return name in self.entries or name in self.folders
+
+    def read_bytes(self, rel_path: Path | str) -> bytes:
+        """
+        Reads the content of an embedded file
+
+        :param Path, str rel_path: path relative to the input data folder
+        :return: content of the file
+        :rtype: bytes
+        """
+        name = self._get_entry(rel_path)
+        with h5py.File(self.path, "r") as bundle:
+            return bundle[name][()].tobytes()
+
+    def read_json(self, rel_path: Path | str) -> dict:
+        """
+        Reads a json file
+
+        :param Path, str rel_path: path relative to the input data folder
+        :return: content of the json file
+        :rtype: dict
+        """
+        return json.loads(self.read_bytes(rel_path))
+
+    def read_csv(self, rel_path: Path | str, **kwargs) -> pd.DataFrame:
+        """
+        Reads a csv file
+
+        Time series are returned with their index and column names, the keyword
+        arguments are only used for other files.
+
+        :param Path, str rel_path: path relative to the input data folder
+        :param kwargs: keyword arguments passed to pd.read_csv
+        :return: content of the csv file
+        :rtype: pd.DataFrame
+        """
+        name = self._get_entry(rel_path)
+        if self.entries[name]["kind"] != "time_series":
+            return pd.read_csv(io.BytesIO(self.read_bytes(name)), **kwargs)
+        with h5py.File(self.path, "r") as bundle:
+            entry = bundle[name]
+            return pd.DataFrame(
+                entry["values"][()],
+                index=entry["index"].asstr()[()],
+                columns=json.loads(entry.attrs["columns"]),
+            )
+
+    def find_file(self, rel_path: Path | str, file_name: str):
+        """
+        Searches a folder and its subfolders (top-down) for a file
+
+        :param Path, str rel_path: folder relative to the input data folder
+        :param str file_name: name of the file
+        :return: path of the first file found relative to the input data folder or
+            None if there is no such file
+        :rtype: Path
+        """
+        matches = [
+            Path(name)
+            for name in self.list_files(rel_path)
+            if Path(name).name == file_name
+        ]
+        if not matches:
+            return None
+        return min(matches, key=lambda path: len(path.parts))
+
+    def list_files(self, rel_path: Path | str) -> list:
+        """
+        Lists all files in a folder and its subfolders
+
+        :param Path, str rel_path: folder relative to the input data folder
+        :return: sorted list of file paths relative to the input data folder (as
+            posix)
+        :rtype: list
+        """
+        prefix = Path(rel_path).as_posix() + "/"
+        if prefix == "./":
+            prefix = ""
+        return sorted(name for name in self.entries if name.startswith(prefix))
+
+    def read_time_series(self, files: list, nr_workers: int = 1) -> (
+        np.ndarray,
+        list,
+        list,
+    ):
+        """
+        Reads time series into one 2-D float64 array
+
+        The arrays are read directly into their columns of the preallocated array.
+        NaN values are replaced by zeros.
+
+        :param list files: list of tuples (column prefix, path relative to the input
+            data folder) in the order the columns should be returned
+        :param int nr_workers: not used, the bundle is read sequentially
+        :return: array with all time series, list of column tuples (prefix + column
+            name) and list of column names per file
+        :rtype: tuple
+        """
+        if not files:
+            return np.empty((0, 0)), [], []
+        names = [self._get_entry(rel_path) for _, rel_path in files]
+        for name in names:
+            if self.entries[name]["kind"] != "time_series":
+                raise Exception(f"{name} in {self.path} is not a time series")
+
+        with h5py.File(self.path, "r") as bundle:
+            file_columns = [json.loads(bundle[name].attrs["columns"]) for name in names]
+            columns = []
+            offsets = [0]
+            for (prefix, _), names_file in zip(files, file_columns):
+                columns.extend([tuple(prefix) + (column,) for column in names_file])
+                offsets.append(offsets[-1] + len(names_file))
+
+            nr_rows = bundle[names[0]]["values"].shape[0]
+            values = np.empty((nr_rows, len(columns)), dtype=np.float64)
+            for idx, name in enumerate(names):
+                dataset = bundle[name]["values"]
+                if dataset.shape[0] != nr_rows:
+                    raise Exception(
+                        f"The number of rows in {name} ({dataset.shape[0]}) is "
+                        f"different from the number of rows in {names[0]} ({nr_rows})"
+                    )
+                if dataset.size:
+                    dataset.read_direct(
+                        values, dest_sel=np.s_[:, offsets[idx] : offsets[idx + 1]]
+                    )
+
+        replace_nan(values, columns)
+        return values, columns, file_columns
+
+    def get_fingerprints(self, rel_paths: list, previous: dict = None) -> dict:
+        """
+        Returns the fingerprints of files as stored in the bundle
+
+        :param list rel_paths: paths relative to the input data folder (as posix)
+        :param dict previous: not used, the hashes are stored in the bundle
+        :return: fingerprints of the files, see :func:`get_file_fingerprints`
+        :rtype: dict
+        """
+        fingerprints = {}
+        for rel_path in rel_paths:
+            entry = self.entries[self._get_entry(rel_path)]
+            fingerprints[rel_path] = {
+                "mtime_ns": 0,
+                "size": entry["size"],
+                "sha256": entry["sha256"],
+            }
+        return fingerprints
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+COLUMN_NAMES = ["type_series", "Node", "Key1", "Carrier", "Key2"]
+
+
+def _get_memory_key(values: np.ndarray) -> tuple:
+    """
+    Returns a key that is equal for arrays viewing the same memory
+
+    :param np.ndarray values: array
+    :return: memory address, shape, strides and data type of the array
+    :rtype: tuple
+    """
+    return (
+        values.__array_interface__["data"][0],
+        values.shape,
+        values.strides,
+        values.dtype.str,
+    )
+
+
+class FullResolutionMatrix:
+    """
+    Contiguous matrix of all time dependent data of an investment period
+
+    Holds the time series and the time dependent technology performances of an
+    investment period in one (timesteps x columns) array in column-major order, such
+    that each column is contiguous. A registry maps each time dependent coefficient
+    of a technology to its columns. The coefficients of the technologies are replaced
+    by views into the matrix (pandas series keep their index), so that every series is
+    stored only once. Coefficients that share their memory (e.g. of identical
+    technologies at different nodes) are mapped to the same columns, which are
+    labeled with the first technology, and keep sharing their memory.
+
+    Aggregated data (with the same columns) is written back to the technologies by
+    slicing the aggregated array with the registry, such that shared coefficients
+    share their aggregated data as well.
+
+    :param pd.DataFrame time_series: time series of the investment period
+    :param dict technology_data: technologies as {node: {technology: Technology}}
+    :param allocate: function returning an array in column-major order for a shape
+        to hold the matrix (e.g. a memory-mapped array), if None the matrix is
+        allocated in memory
+    """
+
+    def __init__(self, time_series: pd.DataFrame, technology_data: dict, allocate=None):
+        """
+        Constructor
+        """
+        self.index = time_series.index
+        self.technology_data = technology_data
+        self.nr_time_series = time_series.shape[1]
+        self.time_series_columns = time_series.columns
+
+        # Registry of technology coefficients: (node, tec, series, start, stop, ndim)
+        self.registry = []
+        tec_columns = []
+        position = self.nr_time_series
+        shared_columns = {}
+        for node in technology_data:
+            for tec in technology_data[node]:
+                coeff_td = technology_data[node][tec].processed_coeff
+                for series, coeff in coeff_td.time_dependent_full.items():
+                    ndim = np.ndim(coeff)
+                    values = np.asarray(coeff)
+                    memory_key = _get_memory_key(values)
+                    if memory_key in shared_columns:
+                        start, stop, _ = shared_columns[memory_key]
+                        self.registry.append((node, tec, series, start, stop, ndim))
+                        continue
+                    keys = range(np.shape(coeff)[1]) if ndim > 1 else [""]
+                    # The array is kept, such that its memory is not reused
+                    shared_columns[memory_key] = (
+                        position,
+                        position + len(keys),
+                        values,
+                    )
+                    self.registry.append(
+                        (node, tec, series, position, position + len(keys), ndim)
+                    )
+                    tec_columns.extend(
+                        ("tec_series", node, tec, series, key) for key in keys
+                    )
+                    position += len(keys)
+
+        self.columns = pd.MultiIndex.from_tuples(
+            [("time_series",) + column for column in time_series.columns] + tec_columns,
+            names=COLUMN_NAMES,
+        )
+
+        # Fill matrix and replace technology coefficients by views
+        shape = (len(self.index), position)
+        if allocate is None:
+            self.values = np.empty(shape, order="F")
+        else:
+            self.values = allocate(shape)
+        self.values[:, : self.nr_time_series] = time_series.to_numpy(dtype=np.float64)
+        views = {}
+        for node, tec, series, start, stop, ndim in self.registry:
+            coeff_td = technology_data[node][tec].processed_coeff.time_dependent_full
+            coeff = coeff_td[series]
+            if (start, type(coeff)) not in views:
+                view = (
+                    self.values[:, start] if ndim == 1 else self.values[:, start:stop]
+                )
+                view[...] = np.asarray(coeff)
+                if isinstance(coeff, pd.Series):
+                    view = pd.Series(view, index=coeff.index, copy=False)
+                views[(start, type(coeff))] = view
+            coeff_td[series] = views[(start, type(coeff))]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the matrix as data frame without copying the data
+
+        :return: data frame with all time dependent data
+        :rtype: pd.DataFrame
+        """
+        return pd.DataFrame(
+            self.values, index=self.index, columns=self.columns, copy=False
+        )
+
+    def align(self, aggregated_data: pd.DataFrame) -> np.ndarray:
+        """
+        Returns aggregated data as array with the columns in the order of the matrix
+
+        :param pd.DataFrame aggregated_data: aggregated data with the same columns as
+            the matrix (in any order)
+        :return: aggregated data as (aggregated timesteps x columns) array
+        :rtype: np.ndarray
+        """
+        values = aggregated_data.to_numpy(dtype=np.float64)
+        if aggregated_data.columns.equals(self.columns):
+            return values
+        return values[:, aggregated_data.columns.get_indexer(self.columns)]
+
+    def get_time_series(self, aggregated_values: np.ndarray, index=None):
+        """
+        Returns the time series of aggregated data
+
+        :param np.ndarray aggregated_values: aggregated data, see :meth:`align`
+        :param index: index of the aggregated timesteps (default: range)
+        :return: aggregated time series
+        :rtype: pd.DataFrame
+        """
+        return pd.DataFrame(
+            aggregated_values[:, : self.nr_time_series],
+            index=index,
+            columns=self.time_series_columns,
+        )
+
+    def write_aggregated_data(
+        self, aggregated_values: np.ndarray, aggregation_model: str
+    ):
+        """
+        Writes aggregated technology performances to the technologies
+
+        The time dependent coefficients of the technologies are set to views into
+        the aggregated array with the same number of dimensions as the full
+        resolution coefficients.
+
+        :param np.ndarray aggregated_values: aggregated data, see :meth:`align`
+        :param str aggregation_model: clustered or averaged
+        """
+        coefficients = {}
+        for node, tec, series, start, stop, ndim in self.registry:
+            coefficients.setdefault((node, tec), {})[series] = (
+                aggregated_values[:, start]
+                if ndim == 1
+                else aggregated_values[:, start:stop]
+            )
+        for (node, tec), coeff_td in coefficients.items():
+            processed_coeff = self.technology_data[node][tec].processed_coeff
+            if aggregation_model == "clustered":
+                processed_coeff.time_dependent_clustered = coeff_td
+            elif aggregation_model == "averaged":
+                processed_coeff.time_dependent_averaged = coeff_td
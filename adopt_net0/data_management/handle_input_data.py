@@ -4,6 +4,21 @@ from pathlib import Path
 import tsam.timeseriesaggregation as tsam
 
 from .utilities import *
+from .time_series_cache import TimeSeriesCache
+from .technology_fitting import fit_technologies
+from .technology_fit_cache import TechnologyFitCache
+from .time_series_aggregation import average_time_series
+from .full_resolution_matrix import FullResolutionMatrix
+from .time_series_store import MemoryMappedStore
+from .input_fingerprints import get_changed_files
+from .input_data_source import InputFolder, get_input_data_source
+from .time_series_clustering import (
+    ClusteringCache,
+    cluster_investment_periods,
+    evaluate_nr_typical_days,
+    get_typical_day_sequence,
+    select_nr_typical_days,
+)
 from ..components.networks import *
 import logging
 
@@ -22,6 +37,8 @@ class DataHandle:
 
     :param dict topology: Container for the topology
     :param Path data_path: Container data_path
+    :param input_data_source: input data folder or case bundle the data is read
+        from (InputFolder or CaseBundle)
     :param dict time_series: Container for all time series
     :param dict energybalance_options: Container for energy balance options
     :param dict technology_data: Container for technology data
@@ -30,6 +47,14 @@ class DataHandle:
     :param dict model_config: Container for the model configuration
     :param dict k_means_specs: Container for k-means clustering algorithm specifications
     :param dict averaged_specs: Container for averaging algorithm specifications
+    :param pd.DataFrame typical_days_selection: Container for aggregation errors of
+        the automatic selection of the number of typical days
+    :param int, None nr_typical_days: number of typical days used for clustering
+        (selected automatically, if the number of typical days is set to 'auto')
+    :param bool lazy_loading: if True, the data of each investment period is read
+        when it is first accessed
+    :param dict file_fingerprints: fingerprints of all input files of the last read,
+        see :meth:`refresh`
     :param int, None start_period: starting period to use, if None, the first available period is used
     :param int, None end_period: end period to use, if None, the last available period is used
     """
@@ -40,6 +65,7 @@ class DataHandle:
         """
         self.topology = {}
         self.data_path = Path()
+        self.input_data_source = None
         self.time_series = {}
         self.energybalance_options = {}
         self.technology_data = {}
@@ -51,6 +77,13 @@ class DataHandle:
         self.monte_carlo_specs = {}
         self.start_period = None
         self.end_period = None
+        self.technology_fit_cache = None
+        self.clustering_cache = None
+        self.time_series_store = None
+        self.typical_days_selection = None
+        self.nr_typical_days = None
+        self.lazy_loading = False
+        self.file_fingerprints = {}
 
     def set_settings(
         self, data_path: Path, start_period: int = None, end_period: int = None
@@ -60,6 +93,8 @@ class DataHandle:
 
         Checks the consistency of the provided folder structure and reads all required data form it, in case the
         input data check succeeds. In case used, it also clusters/averages the data accordingly.
+        Instead of a folder, a case bundle (see :func:`export_case_bundle`) can be
+        read.
 
         The following items are read:
 
@@ -71,7 +106,7 @@ class DataHandle:
         - technology data
         - network data
 
-        :param Path data_path: Path to read input data from
+        :param Path data_path: Path to read input data from (folder or case bundle)
         :param int | None start_period: Starting period of model if None, the first available period is used
         :param int | None end_period: End period of model if None, the last available period is used
         """
@@ -80,42 +115,450 @@ class DataHandle:
             data_path = Path(data_path)
 
         self.data_path = data_path
+        self.input_data_source = get_input_data_source(data_path)
         self.start_period = start_period
         self.end_period = end_period
 
         # Check consistency
-        check_input_data_consistency(data_path)
+        check_input_data_consistency(self.input_data_source)
 
     def read_data(self):
         """
         Reads all data from folder
+
+        If lazy loading is enabled in the model configuration, only topology, model
+        configuration, node locations and Monte Carlo data are read. The data of each
+        investment period is read, fitted and aggregated when it is first accessed,
+        see :meth:`_read_investment_period`.
         """
         log.info(f"Reading data from {self.data_path}")
         self._read_topology()
         self._read_model_config()
-        self._read_time_series()
-        self._read_node_locations()
-        self._read_energybalance_options()
-        self._read_technology_data()
-        self._read_network_data()
+        if self.model_config["data_management"]["lazy_loading"]["value"]:
+            self._read_node_locations()
+            self._initialize_lazy_loading()
+        else:
+            self._read_time_series()
+            self._read_node_locations()
+            self._read_energybalance_options()
+            self._read_technology_data()
+            self._read_network_data()
 
         # Monte Carlo
         if self.model_config["optimization"]["monte_carlo"]["N"]["value"] > 0:
             self._read_monte_carlo()
 
         # Clustering/Averaging algorithms
+        if not self.lazy_loading:
+            if self.model_config["optimization"]["typicaldays"]["N"]["value"] != 0:
+                self._cluster_data()
+            if self.model_config["optimization"]["timestaging"]["value"] != 0:
+                self._average_data()
+
+        self.file_fingerprints = self.input_data_source.get_fingerprints(
+            list(self._get_input_files()), self.file_fingerprints
+        )
+
+    def refresh(self) -> dict:
+        """
+        Reads the input data again, re-reading and re-fitting only what changed
+
+        The fingerprints (modification time, size and content hash) of all input
+        files are compared to the ones of the last read. Then:
+
+        - changed time series files are re-read and written to the full resolution
+          time series
+        - technologies are re-fitted if their json file (or the one of their CCS)
+          changed, all technologies at a node are re-fitted if Technologies.json or
+          the climate data of the node changed
+        - energy balance options and networks are re-read for investment periods in
+          which they changed
+        - investment periods with changed time series or technologies are clustered
+          or averaged again. If the number of typical days is set to 'auto', it is
+          selected again (except with lazy loading) and all investment periods are
+          clustered again, if it changed
+
+        If the topology, the model configuration, the node locations or the columns
+        of a time series file changed, or if a file was removed, all data is read
+        again. With lazy loading, investment periods that were not read yet are
+        skipped and released investment periods are read again when they are
+        accessed next.
+
+        :return: change set as dict with the keys full_reload (bool), files (changed
+            files), time_series (changed time series as (investment period, node,
+            key1, carrier)), technologies (re-fitted technologies as (investment
+            period, node, technology)), networks and energybalance_options
+            (investment periods in which they were re-read), monte_carlo (bool) and
+            investment_periods (all affected investment periods)
+        :rtype: dict
+        """
+        if not self.file_fingerprints:
+            raise Exception("Data needs to be read before it can be refreshed")
+        self.input_data_source = get_input_data_source(self.data_path)
+        check_input_data_consistency(self.input_data_source)
+
+        input_files = self._get_input_files()
+        fingerprints = self.input_data_source.get_fingerprints(
+            list(input_files), self.file_fingerprints
+        )
+        changes = {
+            "full_reload": False,
+            "files": get_changed_files(self.file_fingerprints, fingerprints),
+            "time_series": [],
+            "technologies": [],
+            "networks": [],
+            "energybalance_options": [],
+            "monte_carlo": False,
+            "investment_periods": [],
+        }
+        if not changes["files"]:
+            log.info("Input data is unchanged")
+            return changes
+
+        # Removed files (not part of the input data anymore) trigger a full reload
+        keys = [input_files.get(rel_path, ("global",)) for rel_path in changes["files"]]
+        if any(key[0] == "global" for key in keys):
+            return self._reload_data(changes)
+
+        time_series_files = []
+        technology_selection = set()
+        network_periods = set()
+        energybalance_periods = set()
+        invalidated_periods = set()
+        for rel_path, key in zip(changes["files"], keys):
+            if key[0] == "monte_carlo":
+                changes["monte_carlo"] = True
+                continue
+            investment_period = key[1]
+            if self.lazy_loading and investment_period not in self.time_series["full"]:
+                if investment_period in self.time_series["full"].released:
+                    invalidated_periods.add(investment_period)
+                continue
+
+            if key[0] == "time_series":
+                time_series_files.append((key[1:], rel_path))
+                changes["time_series"].append(key[1:])
+                if key[3] == "ClimateData":
+                    technology_selection.add(key[1:3])
+            elif key[0] == "energybalance_options":
+                energybalance_periods.add(investment_period)
+            elif key[0] == "technology_list":
+                technology_selection.add(key[1:3])
+            elif key[0] == "technology":
+                _, _, node, name = key
+                for technology, tec_data in self.technology_data[investment_period][
+                    node
+                ].items():
+                    if name in (tec_data.name, tec_data.component_options.ccs_type):
+                        technology_selection.add((investment_period, node, technology))
+            elif key[0] == "networks":
+                network_periods.add(investment_period)
+
+        # Time series
+        if time_series_files and not self._update_time_series(time_series_files):
+            return self._reload_data(changes)
+
+        # Energy balance options, technologies and networks
+        if energybalance_periods:
+            self._read_energybalance_options(sorted(energybalance_periods))
+        technology_periods = sorted({key[0] for key in technology_selection})
+        if technology_periods:
+            self._read_technology_data(technology_periods, technology_selection)
+        if network_periods:
+            self._read_network_data(sorted(network_periods))
+        if changes["monte_carlo"]:
+            if self.model_config["optimization"]["monte_carlo"]["N"]["value"] > 0:
+                self._read_monte_carlo()
+
+        # Clustering/Averaging algorithms
+        aggregated_periods = sorted(
+            {key[0] for key in changes["time_series"]} | set(technology_periods)
+        )
+        clustered_periods = aggregated_periods
+        if aggregated_periods:
+            typicaldays_config = self.model_config["optimization"]["typicaldays"]
+            if typicaldays_config["N"]["value"] != 0:
+                # All investment periods share the number of typical days
+                if typicaldays_config["N"]["value"] == "auto" and not self.lazy_loading:
+                    nr_typical_days = self.nr_typical_days
+                    self.nr_typical_days = self._select_nr_typical_days()
+                    if self.nr_typical_days != nr_typical_days:
+                        clustered_periods = list(self.topology["investment_periods"])
+                self._cluster_data(clustered_periods)
+            if self.model_config["optimization"]["timestaging"]["value"] != 0:
+                self._average_data(aggregated_periods)
+
+        for investment_period in invalidated_periods:
+            self._invalidate_investment_period(investment_period)
+
+        for key in sorted(technology_selection):
+            if len(key) == 3:
+                changes["technologies"].append(key)
+            else:
+                changes["technologies"].extend(
+                    key + (technology,)
+                    for technology in self.technology_data[key[0]][key[1]]
+                )
+        changes["networks"] = sorted(network_periods)
+        changes["energybalance_options"] = sorted(energybalance_periods)
+        changes["investment_periods"] = [
+            investment_period
+            for investment_period in self.topology["investment_periods"]
+            if investment_period
+            in set(clustered_periods)
+            | network_periods
+            | energybalance_periods
+            | invalidated_periods
+        ]
+        self.file_fingerprints = fingerprints
+
+        log.info(
+            f"Refreshed {len(changes['files'])} changed files, affected investment "
+            f"periods: {changes['investment_periods']}"
+        )
+        return changes
+
+    def _reload_data(self, changes: dict) -> dict:
+        """
+        Reads all data again
+
+        :param dict changes: change set, see :meth:`refresh`
+        :return: change set with full_reload set and all investment periods affected
+        :rtype: dict
+        """
+        log.info("Input data changed globally, reading all data again")
+        self.time_series = {}
+        self.energybalance_options = {}
+        self.technology_data = {}
+        self.network_data = {}
+        self.k_means_specs = {}
+        self.averaged_specs = {}
+        self.monte_carlo_specs = {}
+        self.nr_typical_days = None
+        self.lazy_loading = False
+        self.read_data()
+        changes["full_reload"] = True
+        changes["investment_periods"] = list(self.topology["investment_periods"])
+        return changes
+
+    def _update_time_series(self, files: list) -> bool:
+        """
+        Re-reads time series files and writes them to the full resolution time series
+
+        :param list files: list of tuples (column prefix, path relative to
+            data_path) to read
+        :return: False, if the columns of a file changed and the time series need to
+            be read again completely
+        :rtype: bool
+        """
+        values, columns, _ = self.input_data_source.read_time_series(
+            files,
+            get_nr_workers(self.model_config["data_management"]["nr_workers"]["value"]),
+        )
+        values = values[self.start_period : self.end_period]
+        columns = pd.MultiIndex.from_tuples(columns)
+        if len(values) != len(self.topology["time_index"]["full"]):
+            return False
+
+        if self.lazy_loading:
+            investment_periods = columns.get_level_values(0).unique()
+            for investment_period in investment_periods:
+                selected = columns.get_level_values(0) == investment_period
+                time_series = self._write_columns(
+                    self.time_series["full"][investment_period],
+                    columns[selected].droplevel(0),
+                    values[:, selected],
+                    f"full_{investment_period}",
+                )
+                if time_series is None:
+                    return False
+                self.time_series["full"][investment_period] = time_series
+        else:
+            time_series = self._write_columns(
+                self.time_series["full"], columns, values, "full"
+            )
+            if time_series is None:
+                return False
+            self.time_series["full"] = time_series
+        return True
+
+    def _write_columns(
+        self, time_series: pd.DataFrame, columns, values: np.ndarray, name: str
+    ):
+        """
+        Overwrites columns of a time series data frame
+
+        The data frame is changed in place. If it is memory-mapped (and thus read
+        only), a copy is changed and written to the time series store.
+
+        :param pd.DataFrame time_series: time series to write to
+        :param columns: columns to overwrite
+        :param np.ndarray values: new values of the columns
+        :param str name: name of the time series in the store
+        :return: time series with overwritten columns or None if a column does not
+            exist
+        :rtype: pd.DataFrame
+        """
+        indexer = time_series.columns.get_indexer(columns)
+        if (indexer < 0).any():
+            return None
+        store = self.get_time_series_store()
+        if store is not None:
+            time_series = time_series.copy()
+        time_series.iloc[:, indexer] = values
+        if store is not None:
+            time_series = store.store_frame(name, time_series)
+        return time_series
+
+    def _invalidate_investment_period(self, investment_period: str):
+        """
+        Removes all data of an investment period, so that it is read again when it is
+        accessed next (only with lazy loading)
+
+        :param str investment_period: investment period to invalidate
+        """
+        containers = [
+            self.energybalance_options,
+            self.technology_data,
+            self.network_data,
+            self.k_means_specs,
+            self.averaged_specs,
+        ] + list(self.time_series.values())
+        for container in containers:
+            container.pop(investment_period, None)
+            container.released.discard(investment_period)
+
+    def _get_input_files(self) -> dict:
+        """
+        Lists all input files that are read from the input data folder
+
+        :return: dict with the paths relative to data_path (as posix) as keys and a
+            tuple describing the data the file belongs to as values
+        :rtype: dict
+        """
+        files = {}
+
+        def add_file(rel_path, key: tuple):
+            files[Path(rel_path).as_posix()] = key
+
+        for file_name in ["Topology.json", "ConfigModel.json", "NodeLocations.csv"]:
+            add_file(file_name, ("global",))
+        source = self.input_data_source
+        if source.exists("MonteCarlo.csv"):
+            add_file("MonteCarlo.csv", ("monte_carlo",))
+        for prefix, rel_path in self._get_time_series_files():
+            add_file(rel_path, ("time_series",) + tuple(prefix))
+
+        for investment_period in self.topology["investment_periods"]:
+            for node in self.topology["nodes"]:
+                node_path = Path(investment_period) / "node_data" / node
+                add_file(
+                    node_path / "carrier_data" / "EnergybalanceOptions.json",
+                    ("energybalance_options", investment_period),
+                )
+                add_file(
+                    node_path / "Technologies.json",
+                    ("technology_list", investment_period, node),
+                )
+                for rel_path in source.list_files(node_path / "technology_data"):
+                    if rel_path.endswith(".json"):
+                        add_file(
+                            rel_path,
+                            (
+                                "technology",
+                                investment_period,
+                                node,
+                                Path(rel_path).stem,
+                            ),
+                        )
+            add_file(
+                Path(investment_period) / "Networks.json",
+                ("networks", investment_period),
+            )
+            for folder in ["network_data", "network_topology"]:
+                for rel_path in source.list_files(Path(investment_period) / folder):
+                    add_file(rel_path, ("networks", investment_period))
+        return files
+
+    def _initialize_lazy_loading(self):
+        """
+        Initializes the containers of all investment period data for lazy loading
+
+        The containers are :class:`InvestmentPeriodData` dictionaries that read an
+        investment period when it is first accessed.
+        """
+        self.lazy_loading = True
+        load = self._read_investment_period
+        self.energybalance_options = InvestmentPeriodData(load)
+        self.technology_data = InvestmentPeriodData(load)
+        self.network_data = InvestmentPeriodData(load)
+        self.k_means_specs = InvestmentPeriodData(load)
+        self.averaged_specs = InvestmentPeriodData(load)
+        self.time_series = {"full": InvestmentPeriodData(load)}
+        if self.model_config["optimization"]["typicaldays"]["N"]["value"] != 0:
+            self.time_series["clustered"] = InvestmentPeriodData(load)
+        if self.model_config["optimization"]["timestaging"]["value"] != 0:
+            self.time_series["averaged"] = InvestmentPeriodData(load)
+
+    def _read_investment_period(self, investment_period: str):
+        """
+        Reads, fits and aggregates all data of an investment period
+
+        Used for lazy loading: reads time series, energy balance options,
+        technology data and network data of the investment period and clusters or
+        averages them, if specified in the model configuration.
+
+        :param str investment_period: investment period to read
+        """
+        if investment_period not in self.topology["investment_periods"]:
+            raise Exception(
+                f"Investment period {investment_period} is not defined in the topology"
+            )
+        log.info(f"Reading data of investment period {investment_period}")
+        investment_periods = [investment_period]
+        self._read_time_series(investment_periods)
+        self._read_energybalance_options(investment_periods)
+        self._read_technology_data(investment_periods)
+        self._read_network_data(investment_periods)
+
         if self.model_config["optimization"]["typicaldays"]["N"]["value"] != 0:
-            self._cluster_data()
+            self._cluster_data(investment_periods)
         if self.model_config["optimization"]["timestaging"]["value"] != 0:
-            self._average_data()
+            self._average_data(investment_periods)
+
+    def release_investment_period(self, investment_period: str):
+        """
+        Releases the time series and time dependent technology performances of an
+        investment period
+
+        Only possible with lazy loading. The time series of all aggregation models
+        and the time dependent coefficients of all technologies of the investment
+        period are deleted, except for the coefficients used in the model
+        (time_dependent_used), which are required to write the results.
+        Technologies, networks and clustering specifications are kept. Accessing the
+        time series of a released investment period raises an exception.
+
+        :param str investment_period: investment period to release
+        """
+        if not self.lazy_loading:
+            raise Exception("Data can only be released with lazy loading")
+        for time_series in self.time_series.values():
+            time_series.release(investment_period)
+        for technologies in self.technology_data.get(investment_period, {}).values():
+            for tec_data in technologies.values():
+                for component in [tec_data, tec_data.ccs_component]:
+                    if component is not None:
+                        component.processed_coeff.time_dependent_full = {}
+                        component.processed_coeff.time_dependent_clustered = {}
+                        component.processed_coeff.time_dependent_averaged = {}
+        log.info(f"Released data of investment period {investment_period}")
 
     def _read_topology(self):
         """
         Reads topology
         """
         # Open json
-        with open(self.data_path / "Topology.json") as json_file:
-            self.topology = json.load(json_file)
+        self.topology = self.input_data_source.read_json("Topology.json")
 
         # Process timesteps
         self.topology["time_index"] = {}
@@ -156,139 +599,244 @@ class DataHandle:
         Reads model configuration
         """
         # Open json
-        with open(self.data_path / "ConfigModel.json") as json_file:
-            self.model_config = json.load(json_file)
+        self.model_config = self.input_data_source.read_json("ConfigModel.json")
+
+        # Settings missing in the configuration are set to their default value
+        self.model_config = complete_model_config(
+            self.model_config, initialize_configuration_templates()
+        )
 
         # Log success
         log_msg = "Model Configuration read successfully"
         log.info(log_msg)
         log.debug("Model Configuration used: " + json.dumps(self.model_config))
 
-    def _read_time_series(self):
+    def _read_time_series(self, investment_periods: list = None):
         """
         Reads all time-series data and shortens time series accordingly
-        """
-
-        def replace_nan_in_list(ls: list) -> list:
-            """
-            Replaces nan with zeros and writes warning to logger
-
-            :param list ls: List
-            :return list: returns list with nan replaces by zero
-            :rtype: list
-            """
-            if any(np.isnan(x) for x in ls):
-                ls = [0 if np.isnan(x) else x for x in ls]
-                log.debug(
-                    f"Found NaN values in data for investment period {investment_period},"
-                    f" node {node}, key1 {var}, carrier {carrier}, key2 {key}."
-                    f" Replaced with zeros."
-                )
-                return ls
-            else:
-                return ls
 
-        # Initialize data dict
-        data = {}
+        The files are read in parallel with the number of workers specified in the
+        model configuration. If caching of time series is enabled, the data is read
+        from the binary cache and only changed files are read from the input data
+        folder (not used for case bundles, which are binary already). If a
+        memory-mapped time series store is used, the time series are written to the
+        store. With lazy loading, the time series are stored per investment period.
 
-        # Loop through all investment_periods and nodes
-        for investment_period in self.topology["investment_periods"]:
-            for node in self.topology["nodes"]:
-
-                # Carbon Costs
-                var = "CarbonCost"
-                carrier = "global"
-                carbon_cost = pd.read_csv(
-                    self.data_path
-                    / investment_period
-                    / "node_data"
-                    / node
-                    / "CarbonCost.csv",
-                    sep=";",
-                    index_col=0,
-                ).to_dict(orient="list")
-                for key in carbon_cost.keys():
-                    data[(investment_period, node, var, carrier, key)] = (
-                        replace_nan_in_list(carbon_cost[key])
-                    )
-
-                # Climate Data
-                var = "ClimateData"
-                carrier = "global"
-                climate_data = pd.read_csv(
-                    self.data_path
-                    / investment_period
-                    / "node_data"
-                    / node
-                    / "ClimateData.csv",
-                    sep=";",
-                    index_col=0,
-                ).to_dict(orient="list")
-                for key in climate_data.keys():
-                    data[(investment_period, node, var, carrier, key)] = (
-                        replace_nan_in_list(climate_data[key])
-                    )
+        :param list investment_periods: investment periods to read (default: all)
+        """
+        if investment_periods is None:
+            investment_periods = self.topology["investment_periods"]
+        files = self._get_time_series_files(investment_periods)
+        nr_workers = get_nr_workers(
+            self.model_config["data_management"]["nr_workers"]["value"]
+        )
 
-                # Carrier Data
-                var = "CarrierData"
-                carrier = "global"
-                for carrier in self.topology["carriers"]:
-                    carrier_data = pd.read_csv(
-                        self.data_path
-                        / investment_period
-                        / "node_data"
-                        / node
-                        / "carrier_data"
-                        / (carrier + ".csv"),
-                        sep=";",
-                        index_col=0,
-                    ).to_dict(orient="list")
-                    for key in carrier_data.keys():
-                        data[(investment_period, node, var, carrier, key)] = (
-                            replace_nan_in_list(carrier_data[key])
-                        )
+        source = self.input_data_source
+        if self.model_config["data_management"]["cache_time_series"][
+            "value"
+        ] and isinstance(source, InputFolder):
+            cache = TimeSeriesCache(self._get_cache_path() / "time_series")
+            values, columns = cache.read(source.path, files, nr_workers)
+        else:
+            values, columns, _ = source.read_time_series(files, nr_workers)
+        data = pd.DataFrame(
+            values, columns=pd.MultiIndex.from_tuples(columns), copy=False
+        )
 
-        # Post-process data dict to dataframe and shorten
-        data = pd.DataFrame(data)
+        # Shorten and set index
         data = data.iloc[self.start_period : self.end_period]
         data.index = self.topology["time_index"]["full"]
         data.columns.set_names(
             ["InvestmentPeriod", "Node", "Key1", "Carrier", "Key2"], inplace=True
         )
-        self.time_series["full"] = data
+        store = self.get_time_series_store()
+        if self.lazy_loading:
+            for investment_period in investment_periods:
+                period_data = data[investment_period]
+                if store is not None:
+                    period_data = store.store_frame(
+                        f"full_{investment_period}", period_data
+                    )
+                self.time_series["full"][investment_period] = period_data
+        else:
+            if store is not None:
+                data = store.store_frame("full", data)
+            self.time_series["full"] = data
 
         # Log success
         log_msg = "Time series read successfully"
         log.info(log_msg)
 
+    def get_climate_data(self, investment_period: str, node: str) -> pd.DataFrame:
+        """
+        Returns the full resolution climate data of a node
+
+        With lazy loading, the climate data of a released investment period is read
+        again from the input data (only for this node).
+
+        :param str investment_period: investment period
+        :param str node: node
+        :return: climate data of the node
+        :rtype: pd.DataFrame
+        """
+        time_series = self.time_series["full"]
+        if not (self.lazy_loading and investment_period in time_series.released):
+            return time_series[investment_period][node]["ClimateData"]["global"]
+
+        values, columns, _ = self.input_data_source.read_time_series(
+            [
+                (
+                    (investment_period, node, "ClimateData", "global"),
+                    Path(investment_period) / "node_data" / node / "ClimateData.csv",
+                )
+            ]
+        )
+        data = pd.DataFrame(values, columns=pd.MultiIndex.from_tuples(columns))
+        data = data.iloc[self.start_period : self.end_period]
+        data.index = self.topology["time_index"]["full"]
+        return data[investment_period][node]["ClimateData"]["global"]
+
+    def _get_time_series_files(self, investment_periods: list = None) -> list:
+        """
+        Lists all time series files of the input data folder
+
+        The order of the list determines the order of the columns in the time
+        series data frame.
+
+        :param list investment_periods: investment periods to list files for
+            (default: all)
+        :return: list of tuples (column prefix, path relative to data_path). The
+            column prefix is (investment period, node, key1, carrier)
+        :rtype: list
+        """
+        if investment_periods is None:
+            investment_periods = self.topology["investment_periods"]
+        files = []
+        for investment_period in investment_periods:
+            for node in self.topology["nodes"]:
+                node_path = Path(investment_period) / "node_data" / node
+                files.append(
+                    (
+                        (investment_period, node, "CarbonCost", "global"),
+                        node_path / "CarbonCost.csv",
+                    )
+                )
+                files.append(
+                    (
+                        (investment_period, node, "ClimateData", "global"),
+                        node_path / "ClimateData.csv",
+                    )
+                )
+                for carrier in self.topology["carriers"]:
+                    files.append(
+                        (
+                            (investment_period, node, "CarrierData", carrier),
+                            node_path / "carrier_data" / (carrier + ".csv"),
+                        )
+                    )
+        return files
+
+    def get_technology_fit_cache(self):
+        """
+        Returns the cache of fitted technologies
+
+        :return: cache of fitted technologies or None if caching is disabled
+        :rtype: TechnologyFitCache
+        """
+        config = self.model_config["data_management"]
+        if not config["cache_technology_fits"]["value"]:
+            return None
+        if self.technology_fit_cache is None:
+            self.technology_fit_cache = TechnologyFitCache(
+                self._get_cache_path() / "technology_fits",
+                config["cache_size_limit"]["value"],
+            )
+        return self.technology_fit_cache
+
+    def get_clustering_cache(self):
+        """
+        Returns the cache of clustered time series
+
+        :return: cache of clustered time series or None if caching is disabled
+        :rtype: ClusteringCache
+        """
+        config = self.model_config["data_management"]
+        if not config["cache_clustering"]["value"]:
+            return None
+        if self.clustering_cache is None:
+            self.clustering_cache = ClusteringCache(
+                self._get_cache_path() / "clustering",
+                config["cache_size_limit"]["value"],
+            )
+        return self.clustering_cache
+
+    def get_time_series_store(self):
+        """
+        Returns the store for memory-mapped time series
+
+        :return: store for memory-mapped time series or None if time series are kept
+            in memory
+        :rtype: MemoryMappedStore
+        """
+        store = self.model_config["data_management"]["time_series_store"]["value"]
+        if store == "memory":
+            return None
+        elif store != "memmap":
+            raise Exception(f"Time series store {store} is not available")
+        if self.time_series_store is None:
+            self.time_series_store = MemoryMappedStore(
+                self._get_cache_path() / "time_series_store"
+            )
+        return self.time_series_store
+
+    def _get_cache_path(self) -> Path:
+        """
+        Returns the folder to write cached data to
+
+        By default, this is the folder .cache in the input data folder (or next to
+        the case bundle).
+
+        :return: cache folder
+        :rtype: Path
+        """
+        cache_path = self.model_config["data_management"]["cache_path"]["value"]
+        if cache_path == -1:
+            if isinstance(self.input_data_source, InputFolder):
+                return self.data_path / ".cache"
+            return self.data_path.parent / ".cache"
+        else:
+            return Path(cache_path)
+
     def _read_node_locations(self):
         """
         Reads node locations
         """
-        self.node_locations = pd.read_csv(
-            (self.data_path / "NodeLocations.csv"), index_col=0, sep=";"
+        self.node_locations = self.input_data_source.read_csv(
+            "NodeLocations.csv", index_col=0, sep=";"
         )
 
         # Log success
         log_msg = "Node Locations read successfully"
         log.info(log_msg)
 
-    def _read_energybalance_options(self):
+    def _read_energybalance_options(self, investment_periods: list = None):
         """
         Reads energy balance options
+
+        :param list investment_periods: investment periods to read (default: all)
         """
-        for investment_period in self.topology["investment_periods"]:
+        if investment_periods is None:
+            investment_periods = self.topology["investment_periods"]
+        for investment_period in investment_periods:
             self.energybalance_options[investment_period] = {}
             for node in self.topology["nodes"]:
-                with open(
-                    self.data_path
-                    / investment_period
+                energybalance_options = self.input_data_source.read_json(
+                    Path(investment_period)
                     / "node_data"
                     / node
                     / "carrier_data"
                     / "EnergybalanceOptions.json"
-                ) as json_file:
-                    energybalance_options = json.load(json_file)
+                )
                 self.energybalance_options[investment_period][
                     node
                 ] = energybalance_options
@@ -297,108 +845,157 @@ class DataHandle:
         log_msg = "Energy balance options read successfully"
         log.info(log_msg)
 
-    def _read_technology_data(self):
+    def _read_technology_data(
+        self, investment_periods: list = None, selection: set = None
+    ):
         """
         Reads all technology data and fits it
 
-        :param str aggregation_model: specifies the aggregation type and thus the dict key to write the data to
+        The technologies are fitted in parallel with the number of workers
+        specified in the model configuration.
+
+        :param list investment_periods: investment periods to read (default: all)
+        :param set selection: if given, only the technologies at the nodes
+            (investment period, node) and the technologies (investment period, node,
+            technology) in the set are read, all other technologies are kept
         """
+        if investment_periods is None:
+            investment_periods = self.topology["investment_periods"]
+
+        def is_selected(investment_period, node, technology=None):
+            if selection is None or (investment_period, node) in selection:
+                return True
+            if technology is None:
+                return any(key[:2] == (investment_period, node) for key in selection)
+            return (investment_period, node, technology) in selection
+
         # Technology data always fitted based on full resolution
         aggregation_model = "full"
 
         # Initialize technology_data dict
         technology_data = {}
+        fitting_jobs = []
+        fitting_keys = []
 
         # Loop through all investment_periods and nodes
-        for investment_period in self.topology["investment_periods"]:
+        for investment_period in investment_periods:
             technology_data[investment_period] = {}
             for node in self.topology["nodes"]:
+                if not is_selected(investment_period, node):
+                    continue
                 technology_data[investment_period][node] = {}
 
                 # Get technologies at node
-                with open(
-                    self.data_path
-                    / investment_period
-                    / "node_data"
-                    / node
-                    / "Technologies.json"
-                ) as json_file:
-                    technologies_at_node = json.load(json_file)
+                technologies_at_node = self.input_data_source.read_json(
+                    Path(investment_period) / "node_data" / node / "Technologies.json"
+                )
 
                 # New technologies
                 for technology in technologies_at_node["new"]:
+                    if not is_selected(investment_period, node, technology):
+                        continue
                     tec_data = read_tec_data(
                         technology,
-                        self.data_path
-                        / investment_period
+                        Path(investment_period)
                         / "node_data"
                         / node
                         / "technology_data",
+                        self.input_data_source,
                     )
-                    tec_data.fit_technology_performance(
-                        self.time_series[aggregation_model][investment_period][node][
-                            "ClimateData"
-                        ]["global"],
-                        self.node_locations.loc[node, :],
-                    )
-                    technology_data[investment_period][node][technology] = tec_data
+                    fitting_jobs.append((tec_data, investment_period, node))
+                    fitting_keys.append((investment_period, node, technology))
 
                 # Existing technologies
                 for technology in technologies_at_node["existing"]:
+                    if not is_selected(
+                        investment_period, node, technology + "_existing"
+                    ):
+                        continue
                     tec_data = read_tec_data(
                         technology,
-                        self.data_path
-                        / investment_period
+                        Path(investment_period)
                         / "node_data"
                         / node
                         / "technology_data",
+                        self.input_data_source,
                     )
                     tec_data.existing = 1
                     tec_data.input_parameters.size_initial = technologies_at_node[
                         "existing"
                     ][technology]
-                    tec_data.fit_technology_performance(
-                        self.time_series[aggregation_model][investment_period][node][
-                            "ClimateData"
-                        ]["global"],
-                        self.node_locations.loc[node, :],
+                    fitting_jobs.append((tec_data, investment_period, node))
+                    fitting_keys.append(
+                        (investment_period, node, technology + "_existing")
                     )
-                    technology_data[investment_period][node][
-                        technology + "_existing"
-                    ] = tec_data
 
-        self.technology_data = technology_data
+        # Fit technologies
+        climate_data = {
+            investment_period: {
+                node: self.time_series[aggregation_model][investment_period][node][
+                    "ClimateData"
+                ]["global"]
+                for node in self.topology["nodes"]
+            }
+            for investment_period in investment_periods
+        }
+        fitted_technologies = fit_technologies(
+            fitting_jobs,
+            climate_data,
+            self.node_locations,
+            get_nr_workers(self.model_config["data_management"]["nr_workers"]["value"]),
+            self.get_technology_fit_cache(),
+        )
+        for (investment_period, node, technology), tec_data in zip(
+            fitting_keys, fitted_technologies
+        ):
+            technology_data[investment_period][node][technology] = tec_data
+
+        for investment_period in investment_periods:
+            if selection is None:
+                self.technology_data[investment_period] = technology_data[
+                    investment_period
+                ]
+                continue
+            for node, technologies in technology_data[investment_period].items():
+                if (investment_period, node) in selection:
+                    self.technology_data[investment_period][node] = technologies
+                else:
+                    self.technology_data[investment_period][node].update(technologies)
 
         # Log success
         log_msg = "Technology data read successfully"
         log.info(log_msg)
 
-    def _read_network_data(self):
+    def _read_network_data(self, investment_periods: list = None):
         """
         Reads all network data
+
+        :param list investment_periods: investment periods to read (default: all)
         """
+        if investment_periods is None:
+            investment_periods = self.topology["investment_periods"]
 
         # Loop through all investment_periods and nodes
-        for investment_period in self.topology["investment_periods"]:
+        for investment_period in investment_periods:
             self.network_data[investment_period] = {}
 
             # Get all networks in period
-            with open(
-                self.data_path / investment_period / "Networks.json"
-            ) as json_file:
-                networks = json.load(json_file)
+            networks = self.input_data_source.read_json(
+                Path(investment_period) / "Networks.json"
+            )
 
             # New networks
             for network in networks["new"]:
                 netw_data = open_json(
-                    network, self.data_path / investment_period / "network_data"
+                    network,
+                    Path(investment_period) / "network_data",
+                    self.input_data_source,
                 )
 
                 netw_data["name"] = network
                 netw_data = Network(netw_data)
-                netw_data.connection = pd.read_csv(
-                    self.data_path
-                    / investment_period
+                netw_data.connection = self.input_data_source.read_csv(
+                    Path(investment_period)
                     / "network_topology"
                     / "new"
                     / network
@@ -406,9 +1003,8 @@ class DataHandle:
                     sep=";",
                     index_col=0,
                 )
-                netw_data.distance = pd.read_csv(
-                    self.data_path
-                    / investment_period
+                netw_data.distance = self.input_data_source.read_csv(
+                    Path(investment_period)
                     / "network_topology"
                     / "new"
                     / network
@@ -417,17 +1013,15 @@ class DataHandle:
                     index_col=0,
                 )
 
-                if os.path.isfile(
-                    self.data_path
-                    / investment_period
+                if self.input_data_source.exists(
+                    Path(investment_period)
                     / "network_topology"
                     / "new"
                     / network
                     / "size_max_arcs.csv"
                 ):
-                    netw_data.size_max_arcs = pd.read_csv(
-                        self.data_path
-                        / investment_period
+                    netw_data.size_max_arcs = self.input_data_source.read_csv(
+                        Path(investment_period)
                         / "network_topology"
                         / "new"
                         / network
@@ -442,15 +1036,16 @@ class DataHandle:
             # Existing networks
             for network in networks["existing"]:
                 netw_data = open_json(
-                    network, self.data_path / investment_period / "network_data"
+                    network,
+                    Path(investment_period) / "network_data",
+                    self.input_data_source,
                 )
 
                 netw_data["name"] = network + "_existing"
                 netw_data = Network(netw_data)
                 netw_data.existing = 1
-                netw_data.connection = pd.read_csv(
-                    self.data_path
-                    / investment_period
+                netw_data.connection = self.input_data_source.read_csv(
+                    Path(investment_period)
                     / "network_topology"
                     / "existing"
                     / network
@@ -458,9 +1053,8 @@ class DataHandle:
                     sep=";",
                     index_col=0,
                 )
-                netw_data.distance = pd.read_csv(
-                    self.data_path
-                    / investment_period
+                netw_data.distance = self.input_data_source.read_csv(
+                    Path(investment_period)
                     / "network_topology"
                     / "existing"
                     / network
@@ -468,9 +1062,8 @@ class DataHandle:
                     sep=";",
                     index_col=0,
                 )
-                netw_data.size_initial = pd.read_csv(
-                    self.data_path
-                    / investment_period
+                netw_data.size_initial = self.input_data_source.read_csv(
+                    Path(investment_period)
                     / "network_topology"
                     / "existing"
                     / network
@@ -495,157 +1088,249 @@ class DataHandle:
             self.model_config["optimization"]["monte_carlo"]["type"]["value"]
             == "uniform_dis_from_file"
         ):
-            self.monte_carlo_specs = pd.read_csv(self.data_path / "MonteCarlo.csv")
+            self.monte_carlo_specs = self.input_data_source.read_csv("MonteCarlo.csv")
 
-    def _collect_full_res_data(self, investment_period: str) -> pd.DataFrame:
+    def _get_full_res_matrix(self, investment_period: str) -> FullResolutionMatrix:
         """
-        Collects data from time_series and technology performances and writes it to a
-        single dataframe
+        Collects data from time_series and technology performances in a single matrix
 
         time_series (demand, import, export, carbon prices,...) are stored in a
         different location then time dependent technology performances. to aggregate
-        all time series, they need to be merged into a single dataframe.
+        all time series, they are copied into one contiguous matrix, see
+        :class:`FullResolutionMatrix`. The time dependent technology performances are
+        replaced by views into this matrix. If time series are memory-mapped, the
+        matrix is memory-mapped as well.
 
         :param str investment_period: investment period to collect data for
-        :return: single data frame with all time dependent data
+        :return: matrix with all time dependent data
+        :rtype: FullResolutionMatrix
         """
-        time_series = self.time_series["full"].loc[:, investment_period]
-        time_series = pd.concat(
-            {"time_series": time_series}, names=["type_series"], axis=1
+        store = self.get_time_series_store()
+        return FullResolutionMatrix(
+            self.time_series["full"][investment_period],
+            self.technology_data[investment_period],
+            (
+                None
+                if store is None
+                else lambda shape: store.allocate(f"full_{investment_period}", shape)
+            ),
         )
 
-        # Get time dependent technology parameters
-        tec_series = {}
-        for node in self.technology_data[investment_period]:
-            for tec in self.technology_data[investment_period][node]:
-                tec_data = self.technology_data[investment_period][node][tec]
-                coeff_td = tec_data.processed_coeff.time_dependent_full
-                for series in coeff_td:
-                    if coeff_td[series].ndim > 1:
-                        count = 0
-                        for c in coeff_td[series].T:
-                            tec_series[(node, tec, series, count)] = c
-                            count += 1
-                    else:
-                        tec_series[(node, tec, series, "")] = coeff_td[series]
-
-        # Make sure dataframe is correctly formatted
-        if tec_series:
-            tec_series = pd.DataFrame(tec_series)
-            tec_series.columns.set_names(
-                ["Node", "Key1", "Carrier", "Key2"], inplace=True
-            )
-            tec_series = pd.concat(
-                {"tec_series": tec_series}, names=["type_series"], axis=1
-            )
-            tec_series.index = time_series.index
-        else:
-            tec_series = pd.DataFrame()
+    def _collect_full_res_data(self, investment_period: str) -> pd.DataFrame:
+        """
+        Collects data from time_series and technology performances and writes it to a
+        single dataframe
 
-        # full matrix
-        return pd.concat([time_series, tec_series], axis=1)
+        The dataframe is a view of the matrix returned by
+        :meth:`_get_full_res_matrix`.
 
-    def _write_aggregated_data_to_technologies(
-        self, investment_period: str, tec_series: pd.DataFrame, aggregation_model: str
-    ):
+        :param str investment_period: investment period to collect data for
+        :return: single data frame with all time dependent data
         """
-        Writes aggregated technology performances to technology classes.
-
-        After time aggregation this function writes the aggregated technology data
-        back to the time dependent coefficients of the technologies.
+        return self._get_full_res_matrix(investment_period).to_frame()
 
-        :param str investment_period: investment period to use
-        :param pd.DataFrame tec_series: aggregated technology series
+    def _select_nr_typical_days(self, investment_periods: list = None) -> int:
+        """
+        Selects the number of typical days automatically
+
+        All numbers of typical days in the range specified in the model configuration
+        are evaluated (in parallel with the number of workers specified in the model
+        configuration), see :func:`evaluate_nr_typical_days`. The smallest number
+        of typical days with an aggregation error below the threshold is selected.
+        The errors are stored in typical_days_selection and logged. They are written
+        to typical_days_selection.csv in the result folder when the model is solved.
+
+        :param list investment_periods: investment periods to evaluate (default: all)
+        :return: number of typical days
+        :rtype: int
         """
-        for node in self.technology_data[investment_period]:
-            for tec in self.technology_data[investment_period][node]:
-                tec_data = self.technology_data[investment_period][node][tec]
-                if tec_data.processed_coeff.time_dependent_full:
-                    time_dependent_coeff = tec_series[node][tec]
-                    coeff_td = {}
-                    for series in time_dependent_coeff.columns.get_level_values(0):
-                        coeff_td[series] = time_dependent_coeff[series].values
-                    if aggregation_model == "clustered":
-                        tec_data.processed_coeff.time_dependent_clustered = coeff_td
-                    elif aggregation_model == "averaged":
-                        tec_data.processed_coeff.time_dependent_averaged = coeff_td
+        typicaldays_config = self.model_config["optimization"]["typicaldays"]
+        hours_per_day = self.topology["hours_per_day"]["full"]
+        nr_segments = typicaldays_config["nr_segments"]["value"]
+        if not 0 < nr_segments < hours_per_day:
+            nr_segments = 0
+        nr_days = len(self.topology["time_index"]["full"]) // hours_per_day
+        nr_min, nr_max = typicaldays_config["auto_N_range"]["value"]
+        nr_typical_days = list(range(max(nr_min, 1), min(nr_max, nr_days) + 1))
+        if not nr_typical_days:
+            raise Exception(
+                f"The range of typical days {[nr_min, nr_max]} does not contain a "
+                f"valid number of typical days (1 to {nr_days})"
+            )
+
+        if investment_periods is None:
+            investment_periods = self.topology["investment_periods"]
+        errors = evaluate_nr_typical_days(
+            {
+                investment_period: self._collect_full_res_data(investment_period)
+                for investment_period in investment_periods
+            },
+            nr_typical_days,
+            hours_per_day,
+            get_nr_workers(self.model_config["data_management"]["nr_workers"]["value"]),
+            self.model_config["data_management"]["aggregation_engine"]["value"],
+            typicaldays_config["cluster_method"]["value"],
+            typicaldays_config["column_weights"]["value"],
+            nr_segments,
+        )
+        nr_clusters = select_nr_typical_days(
+            errors,
+            typicaldays_config["auto_error_metric"]["value"],
+            typicaldays_config["auto_error_threshold"]["value"],
+        )
+
+        # Report
+        report = errors.copy()
+        report.columns = ["/".join(str(label) for label in col) for col in errors]
+        report.insert(0, "Mean", errors.mean(axis=1))
+        self.typical_days_selection = report
+        log.info(
+            "Mean aggregation errors of the numbers of typical days:\n"
+            + report["Mean"].unstack("Metric").to_string()
+        )
 
-    def _cluster_data(self):
+        log.info(f"Selected {nr_clusters} typical days")
+        return nr_clusters
+
+    def _cluster_data(self, investment_periods: list = None):
         """
         Cluster full resolution input data
 
-        Uses the package tsam to cluster all time-dependent input data (time series
-        and time dependent technology performance).
+        If the number of typical days is set to 'auto', it is selected with
+        :meth:`_select_nr_typical_days` on the first call and stored in
+        nr_typical_days, the model configuration keeps 'auto'. With lazy loading,
+        it is selected based on the first investment period that is read and fixed
+        afterwards. Without lazy loading, :meth:`refresh` selects it again.
+
+        Clusters all time-dependent input data (time series and time dependent
+        technology performance) with the aggregation engine (tsam or internal) and
+        cluster method specified in the model configuration. If a number of segments
+        is specified, the hours of each typical day are merged to segments of
+        variable duration. Investment periods are clustered in parallel with the
+        number of workers specified in the model configuration. If caching of
+        clustering results is enabled, unchanged investment periods are read from
+        the cache. If time series are memory-mapped, the clustered data is written
+        to the store as well. If there are fewer distinct days than typical days,
+        the number of typical days (and the clustered time index) is reduced to the
+        number of typical days returned by the clustering. All investment periods
+        need to have the same number of typical days.
+
+        :param list investment_periods: investment periods to cluster (default: all)
         """
-        nr_clusters = self.model_config["optimization"]["typicaldays"]["N"]["value"]
+        if investment_periods is None:
+            investment_periods = self.topology["investment_periods"]
+        typicaldays_config = self.model_config["optimization"]["typicaldays"]
         hours_per_day = self.topology["hours_per_day"]["full"]
+        nr_segments = typicaldays_config["nr_segments"]["value"]
+        if not 0 < nr_segments < hours_per_day:
+            nr_segments = 0
+        if typicaldays_config["N"]["value"] != "auto":
+            self.nr_typical_days = typicaldays_config["N"]["value"]
+        elif self.nr_typical_days is None:
+            self.nr_typical_days = self._select_nr_typical_days(investment_periods)
+        nr_clusters = self.nr_typical_days
+        nr_timesteps_per_day = nr_segments if nr_segments else hours_per_day
+
+        # Cluster to typical days
+        full_res_matrices = {
+            investment_period: self._get_full_res_matrix(investment_period)
+            for investment_period in investment_periods
+        }
+        clustering_results = cluster_investment_periods(
+            {
+                investment_period: matrix.to_frame()
+                for investment_period, matrix in full_res_matrices.items()
+            },
+            nr_clusters,
+            hours_per_day,
+            get_nr_workers(self.model_config["data_management"]["nr_workers"]["value"]),
+            self.get_clustering_cache(),
+            self.model_config["data_management"]["aggregation_engine"]["value"],
+            typicaldays_config["cluster_method"]["value"],
+            typicaldays_config["column_weights"]["value"],
+            nr_segments,
+        )
 
-        self.topology["time_index"]["clustered"] = range(0, nr_clusters * hours_per_day)
-
-        clustered_resolution = {}
-        for investment_period in self.topology["investment_periods"]:
-            self.k_means_specs[investment_period] = {}
-            self.k_means_specs[investment_period]["sequence"] = []
-            self.k_means_specs[investment_period]["factors"] = []
-
-            full_res_data_matrix = self._collect_full_res_data(investment_period)
-
-            # Cluster to typical days
-            aggregation = tsam.TimeSeriesAggregation(
-                full_res_data_matrix,
-                noTypicalPeriods=nr_clusters,
-                hoursPerPeriod=hours_per_day,
-                noSegments=hours_per_day,
-                clusterMethod="k_means",
+        # Clustering returns fewer typical days, if there are fewer distinct days
+        nr_typical_periods = {
+            investment_period: len(
+                clustering_results[investment_period]["typical_periods"].index.unique(
+                    level=0
+                )
             )
-
-            typPeriods = aggregation.createTypicalPeriods()
-
-            # Determine help variables
-            cluster_order = aggregation._clusterOrder
-            cluster_no_occ = aggregation._clusterPeriodNoOccur
-            clustered_index = typPeriods.index
-            clustered_index = clustered_index.set_names(["Day", "Hour"])
-            clustered_index = clustered_index.to_frame().reset_index(drop=True)
-            clustered_index = clustered_index["Day"].reset_index()
-            clustered_index["index"] = clustered_index["index"] + 1
-
-            # Determine Sequence
-            for d in cluster_order:
-                self.k_means_specs[investment_period]["sequence"].extend(
-                    (clustered_index[clustered_index["Day"] == d]["index"].to_list())
+            for investment_period in investment_periods
+        }
+        for investment_period in self.k_means_specs:
+            if investment_period not in investment_periods:
+                nr_typical_periods[investment_period] = (
+                    len(self.topology["time_index"]["clustered"])
+                    // nr_timesteps_per_day
                 )
-
-            # Determine Factors (how many times does a clustered hour occur)
-            self.k_means_specs[investment_period]["factors"] = (
-                clustered_index["Day"].map(cluster_no_occ).to_list()
+        if len(set(nr_typical_periods.values())) > 1:
+            raise Exception(
+                f"The investment periods are clustered to different numbers of "
+                f"typical days {nr_typical_periods}, as some of them have less than "
+                f"{nr_clusters} distinct days. Reduce the number of typical days."
             )
+        nr_clusters_found = nr_typical_periods[investment_periods[0]]
+        if nr_clusters_found < nr_clusters:
+            log.warning(
+                f"Only {nr_clusters_found} distinct days exist, the number of typical "
+                f"days is reduced from {nr_clusters} to {nr_clusters_found}"
+            )
+        self.nr_typical_days = nr_clusters_found
+        self.topology["time_index"]["clustered"] = range(
+            0, nr_clusters_found * nr_timesteps_per_day
+        )
 
-            # Write time series
-            typPeriods = typPeriods.reset_index()
-            clustered_resolution[investment_period] = typPeriods["time_series"]
-
-            # Write technology performance
-            if "tec_series" in typPeriods:
-                self._write_aggregated_data_to_technologies(
-                    investment_period, typPeriods["tec_series"], "clustered"
+        store = self.get_time_series_store()
+        clustered_resolution = {}
+        for investment_period in investment_periods:
+            typPeriods = clustering_results[investment_period]["typical_periods"]
+            sequence, factors = get_typical_day_sequence(
+                typPeriods.index.get_level_values(0).to_numpy(),
+                clustering_results[investment_period]["cluster_order"],
+                clustering_results[investment_period]["cluster_no_occ"],
+                clustering_results[investment_period]["segment_durations"],
+            )
+            self.k_means_specs[investment_period] = {
+                "sequence": sequence,
+                "factors": factors,
+                "durations": clustering_results[investment_period]["segment_durations"],
+            }
+
+            # Write time series and technology performance
+            matrix = full_res_matrices[investment_period]
+            aggregated_values = matrix.align(typPeriods)
+            clustered_resolution[investment_period] = matrix.get_time_series(
+                aggregated_values
+            )
+            if store is not None:
+                aggregated_values = store.store_array(
+                    f"clustered_{investment_period}", aggregated_values
                 )
+            matrix.write_aggregated_data(aggregated_values, "clustered")
 
-        self.time_series["clustered"] = pd.concat(
-            clustered_resolution, names=["InvestmentPeriod"], axis=1
-        )
+        self._write_aggregated_time_series("clustered", clustered_resolution)
 
         # Log success
         log_msg = "Clustered data successfully"
         log.info(log_msg)
 
-    def _average_data(self):
+    def _average_data(self, investment_periods: list = None):
         """
         Averages full resolution input data
 
-        Uses the package tsam to average all time-dependent input data (time series
-        and time dependent technology performance).
+        Averages all time-dependent input data (time series and time dependent
+        technology performance) with the aggregation engine (tsam or internal)
+        specified in the model configuration. If time series are memory-mapped, the
+        averaged data is written to the store as well.
+
+        :param list investment_periods: investment periods to average (default: all)
         """
+        if investment_periods is None:
+            investment_periods = self.topology["investment_periods"]
+        engine = self.model_config["data_management"]["aggregation_engine"]["value"]
         nr_timesteps_averaged = self.model_config["optimization"]["timestaging"][
             "value"
         ]
@@ -657,40 +1342,87 @@ class DataHandle:
             0, int(nr_timesteps_full / nr_timesteps_averaged)
         )
 
+        store = self.get_time_series_store()
         averaged_resolution = {}
-        for investment_period in self.topology["investment_periods"]:
+        for investment_period in investment_periods:
             self.averaged_specs[investment_period] = {}
             self.averaged_specs[investment_period][
                 "nr_timesteps_averaged"
             ] = nr_timesteps_averaged
 
-            full_res_data_matrix = self._collect_full_res_data(investment_period)
+            matrix = self._get_full_res_matrix(investment_period)
+            full_res_data_matrix = matrix.to_frame()
+
+            # Average timesteps
+            if engine == "tsam":
+                aggregation = tsam.TimeSeriesAggregation(
+                    full_res_data_matrix,
+                    noTypicalPeriods=int(nr_timesteps_full / nr_timesteps_averaged),
+                    hoursPerPeriod=1,
+                    noSegments=1,
+                    resolution=resolution_full,
+                    clusterMethod="averaging",
+                )
+                aggregated_values = matrix.align(aggregation.createTypicalPeriods())
+            elif engine == "internal":
+                aggregated_values = average_time_series(
+                    matrix.values, int(nr_timesteps_full / nr_timesteps_averaged)
+                )
+            else:
+                raise Exception(f"Aggregation engine {engine} is not available")
 
-            # Cluster to typical days
-            aggregation = tsam.TimeSeriesAggregation(
-                full_res_data_matrix,
-                noTypicalPeriods=int(nr_timesteps_full / nr_timesteps_averaged),
-                hoursPerPeriod=1,
-                noSegments=1,
-                resolution=resolution_full,
-                clusterMethod="averaging",
+            # Write time series and technology performance
+            averaged_resolution[investment_period] = matrix.get_time_series(
+                aggregated_values, self.topology["time_index"]["averaged"]
             )
-
-            typPeriods = aggregation.createTypicalPeriods()
-
-            typPeriods.index = self.topology["time_index"]["averaged"]
-            averaged_resolution[investment_period] = typPeriods["time_series"]
-
-            # Write technology performance
-            if "tec_series" in typPeriods:
-                self._write_aggregated_data_to_technologies(
-                    investment_period, typPeriods["tec_series"], "averaged"
+            if store is not None:
+                aggregated_values = store.store_array(
+                    f"averaged_{investment_period}", aggregated_values
                 )
+            matrix.write_aggregated_data(aggregated_values, "averaged")
 
-        self.time_series["averaged"] = pd.concat(
-            averaged_resolution, names=["InvestmentPeriod"], axis=1
-        )
+        self._write_aggregated_time_series("averaged", averaged_resolution)
 
         # Log success
         log_msg = "Averaged data successfully"
         log.info(log_msg)
+
+    def _write_aggregated_time_series(
+        self, aggregation_model: str, aggregated_time_series: dict
+    ):
+        """
+        Writes aggregated time series of investment periods to time_series
+
+        Without lazy loading, the time series of all investment periods are merged to
+        a single data frame (investment periods that are not passed are taken from
+        the existing time series). If time series are memory-mapped, they are
+        written to the store.
+
+        :param str aggregation_model: clustered or averaged
+        :param dict aggregated_time_series: aggregated time series per investment
+            period
+        """
+        store = self.get_time_series_store()
+        if self.lazy_loading:
+            for investment_period, time_series in aggregated_time_series.items():
+                if store is not None:
+                    time_series = store.store_frame(
+                        f"{aggregation_model}_{investment_period}", time_series
+                    )
+                self.time_series[aggregation_model][investment_period] = time_series
+        else:
+            if aggregation_model in self.time_series:
+                aggregated_time_series = {
+                    investment_period: (
+                        aggregated_time_series[investment_period]
+                        if investment_period in aggregated_time_series
+                        else self.time_series[aggregation_model][investment_period]
+                    )
+                    for investment_period in self.topology["investment_periods"]
+                }
+            time_series = pd.concat(
+                aggregated_time_series, names=["InvestmentPeriod"], axis=1
+            )
+            if store is not None:
+                time_series = store.store_frame(aggregation_model, time_series)
+            self.time_series[aggregation_model] = time_series
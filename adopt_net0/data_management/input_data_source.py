@@ -0,0 +1,138 @@
+import json
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .case_bundle import CaseBundle
+from .input_fingerprints import get_file_fingerprints
+from .time_series_reader import read_time_series_files
+
+
+class InputFolder:
+    """
+    Input data stored in a folder structure
+
+    The folder structure is created with create_input_data_folder_template. All
+    paths passed to the methods are relative to the input data folder. A
+    :class:`CaseBundle` provides the same methods for input data packed into a
+    single file.
+
+    :param Path path: input data folder
+    """
+
+    def __init__(self, path: Path):
+        """
+        Constructor
+
+        :param Path path: input data folder
+        """
+        self.path = Path(path)
+
+    def exists(self, rel_path: Path | str) -> bool:
+        """
+        Checks if a file or folder exists
+
+        :param Path, str rel_path: path relative to the input data folder
+        :return: True if the file or folder exists
+        :rtype: bool
+        """
+        return (self.path / rel_path).exists()
+
+    def read_json(self, rel_path: Path | str) -> dict:
+        """
+        Reads a json file
+
+        :param Path, str rel_path: path relative to the input data folder
+        :return: content of the json file
+        :rtype: dict
+        """
+        with open(self.path / rel_path) as json_file:
+            return json.load(json_file)
+
+    def read_csv(self, rel_path: Path | str, **kwargs) -> pd.DataFrame:
+        """
+        Reads a csv file
+
+        :param Path, str rel_path: path relative to the input data folder
+        :param kwargs: keyword arguments passed to pd.read_csv
+        :return: content of the csv file
+        :rtype: pd.DataFrame
+        """
+        return pd.read_csv(self.path / rel_path, **kwargs)
+
+    def find_file(self, rel_path: Path | str, file_name: str):
+        """
+        Searches a folder and its subfolders (top-down) for a file
+
+        :param Path, str rel_path: folder relative to the input data folder
+        :param str file_name: name of the file
+        :return: path of the first file found relative to the input data folder or
+            None if there is no such file
+        :rtype: Path
+        """
+        for path, _, files in os.walk(self.path / rel_path):
+            if file_name in files:
+                return (Path(path) / file_name).relative_to(self.path)
+        return None
+
+    def list_files(self, rel_path: Path | str) -> list:
+        """
+        Lists all files in a folder and its subfolders
+
+        :param Path, str rel_path: folder relative to the input data folder
+        :return: sorted list of file paths relative to the input data folder (as
+            posix)
+        :rtype: list
+        """
+        return sorted(
+            file_path.relative_to(self.path).as_posix()
+            for file_path in (self.path / rel_path).rglob("*")
+            if file_path.is_file()
+        )
+
+    def read_time_series(self, files: list, nr_workers: int = 1) -> (
+        np.ndarray,
+        list,
+        list,
+    ):
+        """
+        Reads time series files into one 2-D float64 array, see
+        :func:`read_time_series_files`
+
+        :param list files: list of tuples (column prefix, path relative to the input
+            data folder) in the order the columns should be returned
+        :param int nr_workers: number of threads used to read the files
+        :return: array with all time series, list of column tuples and list of
+            column names per file
+        :rtype: tuple
+        """
+        return read_time_series_files(self.path, files, nr_workers)
+
+    def get_fingerprints(self, rel_paths: list, previous: dict = None) -> dict:
+        """
+        Returns the fingerprints of files, see :func:`get_file_fingerprints`
+
+        :param list rel_paths: paths relative to the input data folder (as posix)
+        :param dict previous: previous fingerprints to reuse hashes from
+        :return: fingerprints of the files
+        :rtype: dict
+        """
+        return get_file_fingerprints(self.path, rel_paths, previous)
+
+
+def get_input_data_source(path):
+    """
+    Returns the input data source for a path
+
+    :param path: input data folder, case bundle file (see
+        :func:`export_case_bundle`) or an input data source
+    :return: input data source
+    :rtype: InputFolder | CaseBundle
+    """
+    if isinstance(path, (InputFolder, CaseBundle)):
+        return path
+    path = Path(path)
+    if path.is_file():
+        return CaseBundle(path)
+    return InputFolder(path)
@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+from .time_series_cache import hash_file
+
+
+def get_file_fingerprints(
+    data_path: Path, rel_paths: list, previous: dict = None
+) -> dict:
+    """
+    Calculates the fingerprints of input data files
+
+    A fingerprint consists of the modification time, the size and the sha256 hash of
+    the content of a file. The hash of a previous fingerprint is reused if the
+    modification time and size of the file did not change.
+
+    :param Path data_path: input data folder
+    :param list rel_paths: paths of the files relative to data_path (as posix)
+    :param dict previous: previous fingerprints to reuse hashes from
+    :return: fingerprints as {path: {"mtime_ns", "size", "sha256"}}
+    :rtype: dict
+    """
+    if previous is None:
+        previous = {}
+    fingerprints = {}
+    for rel_path in rel_paths:
+        file_path = Path(data_path) / rel_path
+        stat = os.stat(file_path)
+        fingerprint = previous.get(rel_path)
+        if (
+            fingerprint is None
+            or stat.st_mtime_ns != fingerprint["mtime_ns"]
+            or stat.st_size != fingerprint["size"]
+        ):
+            fingerprint = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": hash_file(file_path),
+            }
+        fingerprints[rel_path] = fingerprint
+    return fingerprints
+
+
+def get_changed_files(previous: dict, current: dict) -> list:
+    """
+    Compares two sets of fingerprints
+
+    :param dict previous: previous fingerprints, see :func:`get_file_fingerprints`
+    :param dict current: current fingerprints
+    :return: sorted list of files that were added, removed or whose content changed
+    :rtype: list
+    """
+    return sorted(
+        rel_path
+        for rel_path in set(previous) | set(current)
+        if rel_path not in previous
+        or rel_path not in current
+        or previous[rel_path]["sha256"] != current[rel_path]["sha256"]
+    )
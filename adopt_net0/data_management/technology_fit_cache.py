@@ -0,0 +1,190 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from ..components.technologies.genericTechnologies.res import Res
+
+import logging
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+TECHNOLOGY_SOURCE_PATH = Path(__file__).parent.parent / "components" / "technologies"
+
+
+def _to_serializable(obj):
+    """
+    Converts objects that cannot be serialized to json
+
+    :param obj: object to convert
+    :return: json serializable representation of obj
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    elif hasattr(obj, "__dict__"):
+        return vars(obj)
+    else:
+        return str(obj)
+
+
+def hash_node_data(climate_data: pd.DataFrame, location: pd.Series) -> str:
+    """
+    Calculates a hash of the climate data and location of a node
+
+    :param pd.DataFrame climate_data: climate data used for fitting
+    :param pd.Series location: location of node
+    :return: hex digest of climate data and location
+    :rtype: str
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps([str(c) for c in climate_data.columns]).encode())
+    sha.update(pd.util.hash_pandas_object(climate_data.index).to_numpy().tobytes())
+    sha.update(np.ascontiguousarray(climate_data.to_numpy(dtype=np.float64)).tobytes())
+    sha.update(
+        json.dumps(
+            location.to_dict(), default=_to_serializable, sort_keys=True
+        ).encode()
+    )
+    return sha.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def get_code_version() -> str:
+    """
+    Returns the version of adopt_net0
+
+    If the package is not installed (e.g. when running from source), a hash of the
+    source code of the technologies is returned instead.
+
+    :return: version of the code fitting technologies
+    :rtype: str
+    """
+    try:
+        return version("adopt_net0")
+    except PackageNotFoundError:
+        sha = hashlib.sha256()
+        for path in sorted(TECHNOLOGY_SOURCE_PATH.rglob("*.py")):
+            sha.update(path.relative_to(TECHNOLOGY_SOURCE_PATH).as_posix().encode())
+            sha.update(path.read_bytes())
+        return sha.hexdigest()
+
+
+def get_technology_fit_key(technology, node_data_hash: str) -> str:
+    """
+    Calculates the key of a technology fit
+
+    The key is a hash of the (unfitted) technology data and the hash of the climate
+    data and location of the node, see :func:`hash_node_data`. It includes the
+    version of adopt_net0 (see :func:`get_code_version`) and, for renewable
+    technologies, the version of pvlib, such that fits of other versions are not
+    used.
+
+    :param technology: unfitted technology
+    :param str node_data_hash: hash of climate data and location of the node
+    :return: hex digest identifying the fit
+    :rtype: str
+    """
+    sha = hashlib.sha256()
+    sha.update(str(CACHE_VERSION).encode())
+    sha.update(get_code_version().encode())
+    if isinstance(technology, Res):
+        sha.update(version("pvlib").encode())
+    sha.update(type(technology).__name__.encode())
+    sha.update(
+        json.dumps(vars(technology), default=_to_serializable, sort_keys=True).encode()
+    )
+    sha.update(node_data_hash.encode())
+    return sha.hexdigest()
+
+
+class TechnologyFitCache:
+    """
+    Content-addressed on-disk cache for fitted technologies
+
+    Each fitted technology (including its processed coefficients, bounds and CCS
+    component) is stored as a pickle named by its key, see
+    :func:`get_technology_fit_key`. If the size of the cache exceeds the size limit,
+    the least recently used fits are deleted. The size limit is also enforced when
+    the cache is opened.
+
+    :param Path cache_path: folder to store the cache in
+    :param float size_limit: maximum size of the cache in MB
+    """
+
+    name = "Technology fit cache"
+
+    def __init__(self, cache_path: Path, size_limit: float):
+        """
+        Constructor
+
+        :param Path cache_path: folder to store the cache in
+        :param float size_limit: maximum size of the cache in MB
+        """
+        self.cache_path = Path(cache_path)
+        self.size_limit = size_limit * 1e6
+        self.hits = 0
+        self.misses = 0
+        self._evict()
+
+    def get(self, key: str):
+        """
+        Returns a fitted technology from the cache
+
+        :param str key: key of the fit
+        :return: fitted technology or None if the fit is not in the cache
+        """
+        file_path = self.cache_path / f"{key}.pkl"
+        try:
+            with open(file_path, "rb") as f:
+                technology = pickle.load(f)
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        os.utime(file_path)
+        self.hits += 1
+        return technology
+
+    def put(self, key: str, technology):
+        """
+        Writes a fitted technology to the cache and evicts old fits if required
+
+        :param str key: key of the fit
+        :param technology: fitted technology
+        """
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path / f"{key}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(technology, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path / f"{key}.pkl")
+        self._evict()
+
+    def _evict(self):
+        """
+        Deletes least recently used fits until the cache is within its size limit
+        """
+        if not self.cache_path.exists():
+            return
+        files = [(f, f.stat()) for f in self.cache_path.glob("*.pkl")]
+        size = sum(stat.st_size for _, stat in files)
+        if size <= self.size_limit:
+            return
+        for file, stat in sorted(files, key=lambda f: f[1].st_mtime_ns):
+            if size <= self.size_limit:
+                break
+            file.unlink()
+            size -= stat.st_size
+            log.debug(f"Removed {file.name} from {self.name.lower()}")
+
+    def log_statistics(self):
+        """
+        Writes hits and misses of the cache to the log
+        """
+        log.info(f"{self.name}: {self.hits} hits, {self.misses} misses")
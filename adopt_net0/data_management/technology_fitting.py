@@ -0,0 +1,258 @@
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import numpy as np
+import pandas as pd
+
+from ..components.technologies.genericTechnologies.res import (
+    Res,
+    calculate_pv_capacity_factors,
+    calculate_wt_capacity_factors,
+)
+from .technology_fit_cache import (
+    TechnologyFitCache,
+    get_technology_fit_key,
+    hash_node_data,
+)
+import logging
+
+log = logging.getLogger(__name__)
+
+# Data shared with worker processes, set once per worker by _initialize_worker
+_climate_data = {}
+_node_locations = None
+
+
+def _initialize_worker(climate_data: dict, node_locations: pd.DataFrame):
+    """
+    Stores climate data and node locations in a worker process
+
+    :param dict climate_data: climate data as {investment_period: {node: pd.DataFrame}}
+    :param pd.DataFrame node_locations: node locations
+    """
+    global _climate_data, _node_locations
+    _climate_data = climate_data
+    _node_locations = node_locations
+
+
+def _fit(job: tuple, climate_data: dict, node_locations: pd.DataFrame):
+    """
+    Fits a technology
+
+    :param tuple job: (technology, investment_period, node)
+    :param dict climate_data: climate data as {investment_period: {node: pd.DataFrame}}
+    :param pd.DataFrame node_locations: node locations
+    :return: fitted technology
+    """
+    technology, investment_period, node = job
+    technology.fit_technology_performance(
+        climate_data[investment_period][node], node_locations.loc[node, :]
+    )
+    return technology
+
+
+def _fit_technology(job: tuple):
+    """
+    Fits a technology in a worker process
+
+    :param tuple job: (technology, investment_period, node)
+    :return: fitted technology
+    """
+    return _fit(job, _climate_data, _node_locations)
+
+
+def _fit_res_technologies(
+    jobs: list, climate_data: dict, node_locations: pd.DataFrame
+) -> dict:
+    """
+    Fits renewable technologies, calculating capacity factors for all nodes at once
+
+    Technologies are grouped by investment period and the parameters determining
+    their capacity factors (e.g. PV module, tilt and azimuth or wind turbine type),
+    see :meth:`Res.get_capacity_factor_group`. For each group with more than one
+    node, the capacity factors of all nodes are calculated with one call of
+    :func:`calculate_pv_capacity_factors` or :func:`calculate_wt_capacity_factors`.
+
+    :param list jobs: list of tuples (technology, investment_period, node)
+    :param dict climate_data: climate data as {investment_period: {node: pd.DataFrame}}
+    :param pd.DataFrame node_locations: node locations
+    :return: fitted technologies as {index of job: technology}
+    :rtype: dict
+    """
+    groups = {}
+    for idx, (technology, investment_period, _) in enumerate(jobs):
+        if isinstance(technology, Res):
+            group = technology.get_capacity_factor_group()
+            if group is not None:
+                groups.setdefault((investment_period, group), []).append(idx)
+
+    fitted = {}
+    for (investment_period, group), indices in groups.items():
+        if len(indices) < 2:
+            continue
+        nodes = [jobs[idx][2] for idx in indices]
+        node_climate_data = [climate_data[investment_period][node] for node in nodes]
+        technology = jobs[indices[0]][0]
+        if group[0] == "Photovoltaic":
+            capacity_factors = calculate_pv_capacity_factors(
+                node_climate_data,
+                [node_locations.loc[node, :] for node in nodes],
+                technology.get_pv_system_data(),
+            )
+        else:
+            capacity_factors = calculate_wt_capacity_factors(
+                node_climate_data, technology.name, technology.get_hubheight()
+            )
+        log.info(
+            f"Calculated capacity factors of {technology.name} for {len(nodes)} "
+            f"nodes at once"
+        )
+        for column, idx in enumerate(indices):
+            technology, _, node = jobs[idx]
+            technology.fit_technology_performance(
+                climate_data[investment_period][node],
+                node_locations.loc[node, :],
+                capacity_factor=capacity_factors[:, column],
+            )
+            fitted[idx] = technology
+
+    return fitted
+
+
+def _share_arrays(obj, memo: dict, visited: set):
+    """
+    Registers all arrays and pandas objects contained in obj in a deepcopy memo
+
+    Objects registered in the memo are not copied by copy.deepcopy, but shared
+    between the original and the copy.
+
+    :param obj: object to search for arrays
+    :param dict memo: memo passed to copy.deepcopy
+    :param set visited: ids of objects that have already been searched
+    """
+    if id(obj) in visited:
+        return
+    visited.add(id(obj))
+    if isinstance(obj, (np.ndarray, pd.DataFrame, pd.Series, pd.Index)):
+        memo[id(obj)] = obj
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _share_arrays(value, memo, visited)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _share_arrays(value, memo, visited)
+    elif hasattr(obj, "__dict__"):
+        _share_arrays(vars(obj), memo, visited)
+
+
+def copy_fitted_technology(technology):
+    """
+    Copies a fitted technology
+
+    All attributes are copied, except for numpy arrays and pandas objects (e.g. the
+    fitted time dependent coefficients and bounds), which are shared between the
+    original and the copy. These must thus not be modified in place.
+
+    :param technology: fitted technology
+    :return: copy of fitted technology
+    """
+    memo = {}
+    _share_arrays(technology, memo, set())
+    return copy.deepcopy(technology, memo)
+
+
+def fit_technologies(
+    jobs: list,
+    climate_data: dict,
+    node_locations: pd.DataFrame,
+    nr_workers: int = 1,
+    cache: TechnologyFitCache = None,
+) -> list:
+    """
+    Fits the performance of technologies, possibly in parallel
+
+    Identical technologies (same technology data, climate data and location) are
+    only fitted once. Their copies share the fitted coefficient arrays, see
+    :func:`copy_fitted_technology`.
+
+    Capacity factors of renewable technologies are calculated for all nodes at once,
+    see :func:`_fit_res_technologies`. If more than one worker is used, the other
+    technologies are fitted in a process pool.
+    Climate data and node locations are send to each worker once when the worker is
+    started. The fitted technologies are returned in the order of the jobs.
+
+    If a cache is passed, fits are read from the cache where possible and new
+    fits are written to it.
+
+    :param list jobs: list of tuples (technology, investment_period, node)
+    :param dict climate_data: climate data as {investment_period: {node: pd.DataFrame}}
+    :param pd.DataFrame node_locations: node locations
+    :param int nr_workers: number of processes to use. If 1, all technologies are
+        fitted serially in the current process
+    :param TechnologyFitCache cache: cache of fitted technologies
+    :return: list of fitted technologies
+    :rtype: list
+    """
+    fitted = [None] * len(jobs)
+
+    # Identify identical technologies
+    node_data_hashes = {}
+    for _, investment_period, node in jobs:
+        if (investment_period, node) not in node_data_hashes:
+            node_data_hashes[(investment_period, node)] = hash_node_data(
+                climate_data[investment_period][node], node_locations.loc[node, :]
+            )
+    keys = [
+        get_technology_fit_key(technology, node_data_hashes[(investment_period, node)])
+        for technology, investment_period, node in jobs
+    ]
+    unique = {}
+    for idx, key in enumerate(keys):
+        unique.setdefault(key, idx)
+
+    # Read from cache
+    if cache is not None:
+        for idx in unique.values():
+            fitted[idx] = cache.get(keys[idx])
+    to_fit = [idx for idx in unique.values() if fitted[idx] is None]
+
+    # Fit renewable technologies of all nodes at once
+    for job_idx, technology in _fit_res_technologies(
+        [jobs[idx] for idx in to_fit], climate_data, node_locations
+    ).items():
+        fitted[to_fit[job_idx]] = technology
+
+    # Fit
+    remaining = [idx for idx in to_fit if fitted[idx] is None]
+    if nr_workers == 1 or len(remaining) <= 1:
+        for idx in remaining:
+            fitted[idx] = _fit(jobs[idx], climate_data, node_locations)
+    else:
+        nr_workers = min(nr_workers, len(remaining))
+        log.info(f"Fitting {len(remaining)} technologies with {nr_workers} processes")
+        with ProcessPoolExecutor(
+            max_workers=nr_workers,
+            initializer=_initialize_worker,
+            initargs=(climate_data, node_locations),
+        ) as executor:
+            for idx, technology in zip(
+                remaining,
+                executor.map(_fit_technology, [jobs[idx] for idx in remaining]),
+            ):
+                fitted[idx] = technology
+
+    # Write to cache
+    if cache is not None:
+        for idx in to_fit:
+            cache.put(keys[idx], fitted[idx])
+        cache.log_statistics()
+
+    # Copy identical technologies
+    if len(unique) < len(jobs):
+        log.info(
+            f"Fitted {len(unique)} unique technologies for {len(jobs)} technologies"
+        )
+    for idx, key in enumerate(keys):
+        if fitted[idx] is None:
+            fitted[idx] = copy_fitted_technology(fitted[unique[key]])
+
+    return fitted
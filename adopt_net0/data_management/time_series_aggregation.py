@@ -0,0 +1,442 @@
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster, linkage
+
+import logging
+
+log = logging.getLogger(__name__)
+
+RESCALE_TOLERANCE = 1e-6
+RESCALE_MAX_ITERATIONS = 20
+
+
+def get_column_weights(columns: pd.Index, column_weights: dict) -> np.ndarray:
+    """
+    Calculates the weight of each column for clustering
+
+    The weight of a column is the product of the weights of all its labels (e.g.
+    node, carrier or name of the time series). Labels that are not contained in
+    column_weights have a weight of 1.
+
+    :param pd.Index columns: columns of the data to cluster
+    :param dict column_weights: weights as {label: weight}
+    :return: weight of each column
+    :rtype: np.ndarray
+    """
+    weights = np.ones(len(columns))
+    if not column_weights:
+        return weights
+    for idx, column in enumerate(columns):
+        labels = column if isinstance(column, tuple) else (column,)
+        for label in labels:
+            weights[idx] *= column_weights.get(label, 1)
+    return weights
+
+
+def average_time_series(values: np.ndarray, nr_periods: int) -> np.ndarray:
+    """
+    Averages consecutive timesteps to nr_periods periods
+
+    All periods have the same length (number of timesteps divided by nr_periods,
+    rounded down). Remaining timesteps are added to the last period.
+
+    :param np.ndarray values: time series as (timesteps x columns) array
+    :param int nr_periods: number of periods to average to
+    :return: averaged time series as (nr_periods x columns) array
+    :rtype: np.ndarray
+    """
+    nr_timesteps = values.shape[0]
+    period_length = nr_timesteps // nr_periods
+    averaged = (
+        values[: period_length * nr_periods]
+        .reshape(nr_periods, period_length, values.shape[1])
+        .mean(axis=1)
+    )
+    if nr_timesteps % nr_periods:
+        averaged[-1] = values[period_length * (nr_periods - 1) :].mean(axis=0)
+    return averaged
+
+
+def _normalize(values: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Normalizes each column to the range [0, 1]
+
+    :param np.ndarray values: time series as (timesteps x columns) array
+    :return: normalized values, minimum and range of each column
+    :rtype: tuple
+    """
+    minimum = values.min(axis=0)
+    value_range = values.max(axis=0) - minimum
+    value_range[value_range == 0] = 1
+    return (values - minimum) / value_range, minimum, value_range
+
+
+def _squared_distances(profiles: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """
+    Calculates the squared euclidean distances between profiles and centers
+
+    :param np.ndarray profiles: (profiles x features) array
+    :param np.ndarray centers: (centers x features) array
+    :return: (profiles x centers) array of squared distances
+    :rtype: np.ndarray
+    """
+    distances = (
+        (profiles**2).sum(axis=1)[:, np.newaxis]
+        - 2 * profiles @ centers.T
+        + (centers**2).sum(axis=1)[np.newaxis, :]
+    )
+    return np.maximum(distances, 0)
+
+
+def _initialize_centers(
+    distances: np.ndarray, nr_clusters: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Selects initial cluster centers with the k-means++ scheme
+
+    :param np.ndarray distances: (profiles x profiles) array of squared distances
+    :param int nr_clusters: number of clusters
+    :param np.random.Generator rng: random number generator
+    :return: indices of the profiles used as initial centers
+    :rtype: np.ndarray
+    """
+    nr_profiles = distances.shape[0]
+    centers = [rng.integers(nr_profiles)]
+    closest = distances[centers[0]].copy()
+    for _ in range(1, nr_clusters):
+        total = closest.sum()
+        if total > 0:
+            center = rng.choice(nr_profiles, p=closest / total)
+        else:
+            center = rng.choice(np.setdiff1d(np.arange(nr_profiles), centers))
+        centers.append(center)
+        closest = np.minimum(closest, distances[center])
+    return np.array(centers)
+
+
+def _k_means(
+    profiles: np.ndarray,
+    nr_clusters: int,
+    rng: np.random.Generator,
+    nr_starts: int = 10,
+    max_iterations: int = 300,
+) -> np.ndarray:
+    """
+    Clusters profiles with Lloyd's k-means algorithm and k-means++ initialization
+
+    :param np.ndarray profiles: (profiles x features) array
+    :param int nr_clusters: number of clusters
+    :param np.random.Generator rng: random number generator
+    :param int nr_starts: number of starts, the best result is returned
+    :param int max_iterations: maximum number of iterations per start
+    :return: cluster of each profile
+    :rtype: np.ndarray
+    """
+    nr_profiles = profiles.shape[0]
+    distances = _squared_distances(profiles, profiles)
+    best_labels = None
+    best_inertia = np.inf
+    for _ in range(nr_starts):
+        centers = profiles[_initialize_centers(distances, nr_clusters, rng)]
+        labels = None
+        for _ in range(max_iterations):
+            center_distances = _squared_distances(profiles, centers)
+            new_labels = center_distances.argmin(axis=1)
+            if labels is not None and np.array_equal(labels, new_labels):
+                break
+            labels = new_labels
+            counts = np.bincount(labels, minlength=nr_clusters)
+            membership = np.zeros((nr_clusters, nr_profiles))
+            membership[labels, np.arange(nr_profiles)] = 1
+            centers = membership @ profiles
+            # Empty clusters get the profile farthest from its center
+            for cluster in np.flatnonzero(counts == 0):
+                farthest = center_distances[np.arange(nr_profiles), labels].argmax()
+                centers[cluster] = profiles[farthest]
+                center_distances[farthest, :] = 0
+                counts[cluster] = 1
+            centers = centers / counts[:, np.newaxis]
+        inertia = _squared_distances(profiles, centers)[
+            np.arange(nr_profiles), labels
+        ].sum()
+        if inertia < best_inertia:
+            best_inertia = inertia
+            best_labels = labels
+    return best_labels
+
+
+def _k_medoids(
+    profiles: np.ndarray,
+    nr_clusters: int,
+    rng: np.random.Generator,
+    nr_starts: int = 10,
+    max_iterations: int = 100,
+) -> np.ndarray:
+    """
+    Clusters profiles with the alternating k-medoids algorithm
+
+    If there are fewer distinct profiles than clusters, fewer clusters are returned.
+
+    :param np.ndarray profiles: (profiles x features) array
+    :param int nr_clusters: number of clusters
+    :param np.random.Generator rng: random number generator
+    :param int nr_starts: number of starts, the best result is returned
+    :param int max_iterations: maximum number of iterations per start
+    :return: cluster of each profile
+    :rtype: np.ndarray
+    """
+    squared_distances = _squared_distances(profiles, profiles)
+    distances = np.sqrt(squared_distances)
+    best_labels = None
+    best_cost = np.inf
+    for _ in range(nr_starts):
+        medoids = _initialize_centers(squared_distances, nr_clusters, rng)
+        for _ in range(max_iterations):
+            labels = distances[:, medoids].argmin(axis=1)
+            new_medoids = medoids.copy()
+            for cluster in range(nr_clusters):
+                members = np.flatnonzero(labels == cluster)
+                # Clusters with a medoid equal to another medoid remain empty and
+                # are dropped
+                if not members.size:
+                    continue
+                new_medoids[cluster] = members[
+                    distances[np.ix_(members, members)].sum(axis=1).argmin()
+                ]
+            if np.array_equal(medoids, new_medoids):
+                break
+            medoids = new_medoids
+        labels = distances[:, medoids].argmin(axis=1)
+        cost = distances[np.arange(len(labels)), medoids[labels]].sum()
+        if cost < best_cost:
+            best_cost = cost
+            best_labels = labels
+    return best_labels
+
+
+def _hierarchical(profiles: np.ndarray, nr_clusters: int) -> np.ndarray:
+    """
+    Clusters profiles with agglomerative clustering (Ward linkage)
+
+    :param np.ndarray profiles: (profiles x features) array
+    :param int nr_clusters: number of clusters
+    :return: cluster of each profile
+    :rtype: np.ndarray
+    """
+    return fcluster(linkage(profiles, method="ward"), nr_clusters, "maxclust") - 1
+
+
+def _medoids(profiles: np.ndarray, labels: np.ndarray, nr_clusters: int) -> np.ndarray:
+    """
+    Returns the medoid (profile with the smallest sum of distances to all other
+    profiles of the cluster) of each cluster
+
+    :param np.ndarray profiles: (profiles x features) array
+    :param np.ndarray labels: cluster of each profile
+    :param int nr_clusters: number of clusters
+    :return: index of the medoid of each cluster
+    :rtype: np.ndarray
+    """
+    medoids = np.empty(nr_clusters, dtype=int)
+    for cluster in range(nr_clusters):
+        members = np.flatnonzero(labels == cluster)
+        distances = np.sqrt(_squared_distances(profiles[members], profiles[members]))
+        medoids[cluster] = members[distances.sum(axis=1).argmin()]
+    return medoids
+
+
+def _rescale(
+    typical_profiles: np.ndarray,
+    day_profiles: np.ndarray,
+    occurrences: np.ndarray,
+) -> np.ndarray:
+    """
+    Rescales normalized typical days, such that the mean of each column equals the
+    mean of the original data
+
+    Values are kept within the range of the original data, so that the rescaling
+    is repeated until the deviation is below a tolerance.
+
+    :param np.ndarray typical_profiles: normalized typical days as (clusters x hours
+        x columns) array
+    :param np.ndarray day_profiles: normalized days as (days x hours x columns)
+        array
+    :param np.ndarray occurrences: number of occurrences of each typical day
+    :return: rescaled typical days
+    :rtype: np.ndarray
+    """
+    sum_original = day_profiles.sum(axis=(0, 1))
+    for _ in range(RESCALE_MAX_ITERATIONS):
+        sum_typical = np.einsum("k,khc->c", occurrences, typical_profiles)
+        deviation = np.abs(sum_original - sum_typical)
+        to_scale = (deviation > sum_original * RESCALE_TOLERANCE) & (sum_typical > 0)
+        if not to_scale.any():
+            break
+        typical_profiles[:, :, to_scale] *= (
+            sum_original[to_scale] / sum_typical[to_scale]
+        )
+        np.clip(typical_profiles, 0, 1, out=typical_profiles)
+    return typical_profiles
+
+
+def cluster_days(
+    values: np.ndarray,
+    nr_clusters: int,
+    hours_per_day: int,
+    cluster_method: str = "k_means",
+    weights: np.ndarray = None,
+    seed: int = 0,
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Clusters days to typical days
+
+    All columns are normalized to [0, 1] and multiplied by their weight. The days
+    (profiles of all columns over hours_per_day timesteps) are then clustered with
+    k-means (typical day is the mean of the cluster), k-medoids or hierarchical
+    clustering with Ward linkage (typical day is the medoid of the cluster). Typical
+    days are rescaled, such that the mean of each column is preserved. Clusters are
+    numbered in the order of their first occurrence.
+
+    :param np.ndarray values: time series as (timesteps x columns) array
+    :param int nr_clusters: number of typical days
+    :param int hours_per_day: number of timesteps per day
+    :param str cluster_method: k_means, k_medoids or hierarchical
+    :param np.ndarray weights: weight of each column (default: 1)
+    :param int seed: seed of the random number generator
+    :return: typical days as (nr_clusters * hours_per_day x columns) array, typical
+        day of each day and number of occurrences of each typical day
+    :rtype: tuple
+    """
+    nr_timesteps, nr_columns = values.shape
+    if nr_timesteps % hours_per_day:
+        raise Exception(
+            f"The number of timesteps ({nr_timesteps}) is not a multiple of the "
+            f"number of hours per day ({hours_per_day})"
+        )
+    nr_days = nr_timesteps // hours_per_day
+    if nr_clusters > nr_days:
+        raise Exception(
+            f"The number of typical days ({nr_clusters}) is larger than the number "
+            f"of days ({nr_days})"
+        )
+    if weights is None:
+        weights = np.ones(nr_columns)
+
+    normalized, minimum, value_range = _normalize(values)
+    day_profiles = normalized.reshape(nr_days, hours_per_day, nr_columns)
+    profiles = (day_profiles * weights).reshape(nr_days, -1)
+
+    rng = np.random.default_rng(seed)
+    if cluster_method == "k_means":
+        labels = _k_means(profiles, nr_clusters, rng)
+    elif cluster_method == "k_medoids":
+        labels = _k_medoids(profiles, nr_clusters, rng)
+    elif cluster_method == "hierarchical":
+        labels = _hierarchical(profiles, nr_clusters)
+    else:
+        raise Exception(f"Cluster method {cluster_method} is not available")
+
+    # Number clusters in order of first occurrence
+    _, first_occurrence = np.unique(labels, return_index=True)
+    order = np.argsort(first_occurrence)
+    renumber = np.empty(len(order), dtype=int)
+    renumber[np.unique(labels)[order]] = np.arange(len(order))
+    cluster_order = renumber[labels]
+    nr_clusters = len(order)
+    occurrences = np.bincount(cluster_order, minlength=nr_clusters)
+
+    # Representation
+    if cluster_method == "k_means":
+        membership = np.zeros((nr_clusters, nr_days))
+        membership[cluster_order, np.arange(nr_days)] = 1
+        typical_profiles = np.einsum(
+            "kd,dhc->khc", membership / occurrences[:, np.newaxis], day_profiles
+        )
+    else:
+        typical_profiles = day_profiles[
+            _medoids(profiles, cluster_order, nr_clusters)
+        ].copy()
+    typical_profiles = _rescale(typical_profiles, day_profiles, occurrences)
+
+    typical_values = (
+        typical_profiles.reshape(nr_clusters * hours_per_day, nr_columns) * value_range
+        + minimum
+    )
+    return typical_values, cluster_order, occurrences
+
+
+def _segment_profile(profile: np.ndarray, nr_segments: int) -> np.ndarray:
+    """
+    Merges adjacent timesteps of a profile to segments
+
+    Starting with one segment per timestep, the two adjacent segments with the
+    smallest increase in the sum of squared deviations from the segment means (Ward
+    criterion) are merged until nr_segments segments remain.
+
+    :param np.ndarray profile: (timesteps x features) array
+    :param int nr_segments: number of segments
+    :return: number of timesteps of each segment
+    :rtype: np.ndarray
+    """
+    sizes = np.ones(profile.shape[0])
+    means = profile.astype(float)
+    while len(sizes) > nr_segments:
+        costs = (
+            sizes[:-1]
+            * sizes[1:]
+            / (sizes[:-1] + sizes[1:])
+            * ((means[:-1] - means[1:]) ** 2).sum(axis=1)
+        )
+        merge = costs.argmin()
+        size = sizes[merge] + sizes[merge + 1]
+        means[merge] = (
+            sizes[merge] * means[merge] + sizes[merge + 1] * means[merge + 1]
+        ) / size
+        sizes[merge] = size
+        means = np.delete(means, merge + 1, axis=0)
+        sizes = np.delete(sizes, merge + 1)
+    return sizes.astype(int)
+
+
+def segment_typical_days(
+    typical_values: np.ndarray,
+    hours_per_day: int,
+    nr_segments: int,
+    weights: np.ndarray = None,
+) -> (np.ndarray, np.ndarray):
+    """
+    Reduces the timesteps of each typical day to segments of variable duration
+
+    Adjacent timesteps of a typical day are merged based on the normalized and
+    weighted profiles of all columns, see :func:`_segment_profile`. The value of a
+    segment is the mean of its timesteps, so that the sum of each column over the
+    day is preserved.
+
+    :param np.ndarray typical_values: typical days as (typical days * hours_per_day x
+        columns) array
+    :param int hours_per_day: number of timesteps per day
+    :param int nr_segments: number of segments per typical day
+    :param np.ndarray weights: weight of each column (default: 1)
+    :return: segments as (typical days * nr_segments x columns) array and duration of
+        each segment in timesteps
+    :rtype: tuple
+    """
+    nr_typical_days = typical_values.shape[0] // hours_per_day
+    if weights is None:
+        weights = np.ones(typical_values.shape[1])
+    profiles = (_normalize(typical_values)[0] * weights).reshape(
+        nr_typical_days, hours_per_day, -1
+    )
+    typical_days = typical_values.reshape(nr_typical_days, hours_per_day, -1)
+
+    segment_values = []
+    durations = []
+    for day in range(nr_typical_days):
+        segment_durations = _segment_profile(profiles[day], nr_segments)
+        segment_starts = np.concatenate(([0], np.cumsum(segment_durations)[:-1]))
+        segment_values.append(
+            np.add.reduceat(typical_days[day], segment_starts, axis=0)
+            / segment_durations[:, np.newaxis]
+        )
+        durations.append(segment_durations)
+    return np.concatenate(segment_values), np.concatenate(durations)
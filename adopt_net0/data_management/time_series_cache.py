@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import numpy as np
+
+from .time_series_reader import read_time_series_files
+import logging
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+def hash_file(file_path: Path) -> str:
+    """
+    Calculates the sha256 hash of the content of a file
+
+    :param Path file_path: path of file to hash
+    :return: hex digest of file content
+    :rtype: str
+    """
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class TimeSeriesCache:
+    """
+    Binary on-disk cache for the time series of an input data folder.
+
+    Each csv file is stored as a separate ``.npy`` array named by the hash of its
+    content. Additionally, all files of the last read are stored as a single
+    bundle, so that an unchanged input data folder is loaded with a single read.
+    An index file keeps track of the file paths, modification times and content
+    hashes. Files that changed are re-parsed and only the bundle is rebuilt.
+
+    :param Path cache_path: folder to store the cache in
+    """
+
+    def __init__(self, cache_path: Path):
+        """
+        Constructor
+
+        :param Path cache_path: folder to store the cache in
+        """
+        self.cache_path = Path(cache_path)
+        self.index_path = self.cache_path / "index.json"
+        self.bundle_path = self.cache_path / "time_series_full.npy"
+        self.index = self._read_index()
+
+    def _read_index(self) -> dict:
+        """
+        Reads the cache index or returns an empty one
+
+        :return: cache index
+        :rtype: dict
+        """
+        if self.index_path.exists():
+            with open(self.index_path) as json_file:
+                index = json.load(json_file)
+            if index.get("version") == CACHE_VERSION:
+                return index
+        return {"version": CACHE_VERSION, "files": {}, "bundle": {}}
+
+    def _write_index(self):
+        """
+        Writes the cache index to disk
+        """
+        with open(self.index_path, "w") as json_file:
+            json.dump(self.index, json_file, indent=4)
+
+    def _file_is_unchanged(self, file_path: Path, key: str) -> bool:
+        """
+        Checks if a file is unchanged compared to the cache
+
+        Modification time and size are checked first. Only if they differ, the
+        content hash is calculated and compared.
+
+        :param Path file_path: path of file
+        :param str key: key of the file in the index
+        :return: True if the cached data of the file can be used
+        :rtype: bool
+        """
+        entry = self.index["files"].get(key)
+        if entry is None:
+            return False
+        if not (self.cache_path / entry["array"]).exists():
+            return False
+        stat = os.stat(file_path)
+        if stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["size"]:
+            return True
+        if hash_file(file_path) == entry["sha256"]:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            return True
+        return False
+
+    def _cache_files(self, data_path: Path, files: list, keys: list, nr_workers: int):
+        """
+        Parses files and writes them to the cache
+
+        :param Path data_path: input data folder
+        :param list files: list of tuples (column prefix, path relative to
+            data_path) to cache
+        :param list keys: keys of the files in the index
+        :param int nr_workers: number of threads used to read the files
+        """
+        values, _, file_columns = read_time_series_files(data_path, files, nr_workers)
+        offset = 0
+        for (_, rel_path), key, columns in zip(files, keys, file_columns):
+            file_path = data_path / rel_path
+            sha = hash_file(file_path)
+            stat = os.stat(file_path)
+            array_name = f"{sha}.npy"
+            np.save(
+                self.cache_path / array_name,
+                values[:, offset : offset + len(columns)],
+            )
+            offset += len(columns)
+            self.index["files"][key] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": sha,
+                "columns": columns,
+                "array": array_name,
+            }
+
+    def read(self, data_path: Path, files: list, nr_workers: int = 1) -> (
+        np.ndarray,
+        list,
+    ):
+        """
+        Reads all time series files, using cached data where possible
+
+        :param Path data_path: input data folder
+        :param list files: list of tuples (column prefix, path relative to
+            data_path) in the order the columns should be returned
+        :param int nr_workers: number of threads used to read changed files
+        :return: 2-D array with all time series and list of column tuples
+        :rtype: tuple
+        """
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+
+        keys = [Path(rel_path).as_posix() for _, rel_path in files]
+        changed = [
+            idx
+            for idx, (key, (_, rel_path)) in enumerate(zip(keys, files))
+            if not self._file_is_unchanged(data_path / rel_path, key)
+        ]
+
+        bundle = self.index["bundle"]
+        if not changed and bundle.get("files") == keys and self.bundle_path.exists():
+            values = np.load(self.bundle_path)
+            columns = [tuple(column) for column in bundle["columns"]]
+            self._write_index()
+            log.info("Time series read from cache")
+            return values, columns
+
+        if changed:
+            log.info(
+                f"Rebuilding time series cache for {len(changed)} of "
+                f"{len(keys)} files"
+            )
+            self._cache_files(
+                data_path,
+                [files[idx] for idx in changed],
+                [keys[idx] for idx in changed],
+                nr_workers,
+            )
+
+        # Assemble bundle
+        columns = []
+        for key, (prefix, _) in zip(keys, files):
+            columns.extend(
+                [
+                    tuple(prefix) + (name,)
+                    for name in self.index["files"][key]["columns"]
+                ]
+            )
+        arrays = [
+            np.load(self.cache_path / self.index["files"][key]["array"], mmap_mode="r")
+            for key in keys
+        ]
+        nr_rows = arrays[0].shape[0] if arrays else 0
+        values = np.empty((nr_rows, len(columns)), dtype=np.float64)
+        offset = 0
+        for array in arrays:
+            values[:, offset : offset + array.shape[1]] = array
+            offset += array.shape[1]
+        del arrays
+
+        np.save(self.bundle_path, values)
+        self.index["bundle"] = {"files": keys, "columns": columns}
+        self._write_index()
+        self._remove_unused_arrays()
+
+        return values, columns
+
+    def _remove_unused_arrays(self):
+        """
+        Deletes cached arrays that are not referenced in the index anymore
+        """
+        used = {entry["array"] for entry in self.index["files"].values()}
+        used.add(self.bundle_path.name)
+        for file in self.cache_path.glob("*.npy"):
+            if file.name not in used:
+                file.unlink()
@@ -0,0 +1,493 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+from importlib.metadata import version
+import json
+import numpy as np
+import pandas as pd
+import tsam.timeseriesaggregation as tsam
+
+from .technology_fit_cache import TechnologyFitCache
+from .time_series_aggregation import (
+    cluster_days,
+    get_column_weights,
+    segment_typical_days,
+)
+import logging
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 2
+ERROR_METRICS = ["rmse", "duration_curve", "peak"]
+
+
+class ClusteringCache(TechnologyFitCache):
+    """
+    Content-addressed on-disk cache for clustered time series
+
+    Stores the typical periods (time series and technology performances), the
+    cluster order and the number of occurrences of each cluster as a pickle named
+    by its key, see :func:`get_clustering_key`. If the size of the cache exceeds
+    the size limit, the least recently used results are deleted.
+
+    :param Path cache_path: folder to store the cache in
+    :param float size_limit: maximum size of the cache in MB
+    """
+
+    name = "Clustering cache"
+
+
+def get_clustering_key(full_res_data_matrix: pd.DataFrame, settings: dict) -> str:
+    """
+    Calculates the key of a clustering result
+
+    The key is a hash of the full resolution data (values, columns and index) and
+    the clustering settings.
+
+    :param pd.DataFrame full_res_data_matrix: data to cluster
+    :param dict settings: clustering settings
+    :return: hex digest identifying the clustering result
+    :rtype: str
+    """
+    sha = hashlib.sha256()
+    sha.update(str(CACHE_VERSION).encode())
+    sha.update(version("tsam").encode())
+    sha.update(json.dumps(settings, sort_keys=True).encode())
+    sha.update(json.dumps([str(c) for c in full_res_data_matrix.columns]).encode())
+    sha.update(
+        pd.util.hash_pandas_object(full_res_data_matrix.index).to_numpy().tobytes()
+    )
+    sha.update(
+        np.ascontiguousarray(full_res_data_matrix.to_numpy(dtype=np.float64)).tobytes()
+    )
+    return sha.hexdigest()
+
+
+def cluster_time_series(
+    full_res_data_matrix: pd.DataFrame,
+    nr_clusters: int,
+    hours_per_day: int,
+    engine: str = "tsam",
+    cluster_method: str = "k_means",
+    column_weights: dict = None,
+    nr_segments: int = 0,
+) -> dict:
+    """
+    Clusters full resolution data to typical days
+
+    With the engine tsam, the data is clustered with the package tsam. With the
+    engine internal, it is clustered with :func:`cluster_days`. Both engines use the
+    same cluster methods and column weights (see :func:`get_column_weights`).
+
+    If nr_segments is larger than 0 and smaller than hours_per_day, adjacent hours of
+    each typical day are merged to nr_segments segments of variable duration (with
+    tsam or :func:`segment_typical_days`). The typical periods are then indexed by
+    typical day, segment and segment duration.
+
+    :param pd.DataFrame full_res_data_matrix: data to cluster
+    :param int nr_clusters: number of typical days
+    :param int hours_per_day: number of hours per day
+    :param str engine: tsam or internal
+    :param str cluster_method: k_means, k_medoids or hierarchical
+    :param dict column_weights: weights of the columns as {label: weight}
+    :param int nr_segments: number of segments per typical day (0: no segmentation)
+    :return: dict with typical periods (typical_periods), the cluster of each day
+        (cluster_order), the number of occurrences of each cluster (cluster_no_occ)
+        and the duration of each row of the typical periods in hours
+        (segment_durations)
+    :rtype: dict
+    """
+    weights = get_column_weights(full_res_data_matrix.columns, column_weights)
+    segmentation = 0 < nr_segments < hours_per_day
+
+    if engine == "tsam":
+        aggregation = tsam.TimeSeriesAggregation(
+            full_res_data_matrix,
+            noTypicalPeriods=nr_clusters,
+            hoursPerPeriod=hours_per_day,
+            segmentation=segmentation,
+            noSegments=nr_segments if segmentation else hours_per_day,
+            clusterMethod=cluster_method,
+            weightDict={
+                column: weight
+                for column, weight in zip(full_res_data_matrix.columns, weights)
+                if weight != 1
+            },
+        )
+
+        typical_periods = aggregation.createTypicalPeriods()
+        cluster_order = aggregation._clusterOrder
+        cluster_no_occ = aggregation._clusterPeriodNoOccur
+        if segmentation:
+            segment_durations = typical_periods.index.get_level_values(
+                "Segment Duration"
+            ).to_numpy(dtype=int)
+        else:
+            segment_durations = np.ones(len(typical_periods), dtype=int)
+
+    elif engine == "internal":
+        typical_values, cluster_order, occurrences = cluster_days(
+            full_res_data_matrix.to_numpy(dtype=np.float64),
+            nr_clusters,
+            hours_per_day,
+            cluster_method,
+            weights,
+        )
+        nr_typical_days = len(occurrences)
+        cluster_no_occ = {
+            cluster: int(occurrence) for cluster, occurrence in enumerate(occurrences)
+        }
+        if segmentation:
+            typical_values, segment_durations = segment_typical_days(
+                typical_values, hours_per_day, nr_segments, weights
+            )
+            index = pd.MultiIndex.from_arrays(
+                [
+                    np.repeat(np.arange(nr_typical_days), nr_segments),
+                    np.tile(np.arange(nr_segments), nr_typical_days),
+                    segment_durations,
+                ],
+                names=[None, "Segment Step", "Segment Duration"],
+            )
+        else:
+            segment_durations = np.ones(len(typical_values), dtype=int)
+            index = pd.MultiIndex.from_arrays(
+                [
+                    np.repeat(np.arange(nr_typical_days), hours_per_day),
+                    np.tile(np.arange(hours_per_day), nr_typical_days),
+                ],
+                names=[None, "TimeStep"],
+            )
+        typical_periods = pd.DataFrame(
+            typical_values, index=index, columns=full_res_data_matrix.columns
+        )
+
+    else:
+        raise Exception(f"Aggregation engine {engine} is not available")
+
+    return {
+        "typical_periods": typical_periods,
+        "cluster_order": cluster_order,
+        "cluster_no_occ": cluster_no_occ,
+        "segment_durations": segment_durations,
+    }
+
+
+def get_typical_day_sequence(
+    typical_day_of_row: np.ndarray,
+    cluster_order: np.ndarray,
+    cluster_no_occ: dict,
+    segment_durations: np.ndarray = None,
+) -> (np.ndarray, np.ndarray):
+    """
+    Calculates the sequence and the factors of the clustered timesteps
+
+    The sequence contains, for each timestep of the full resolution, the clustered
+    timestep (starting at 1) it is represented by. The factors contain, for each
+    clustered timestep, the number of full resolution timesteps it represents, i.e.
+    the number of days the typical day occurs times the duration of the timestep.
+    Both are calculated by index arithmetic on the rows of the typical periods.
+
+    :param np.ndarray typical_day_of_row: typical day of each row of the typical
+        periods (first level of their index)
+    :param np.ndarray cluster_order: typical day of each day of the full resolution
+    :param dict cluster_no_occ: number of occurrences of each typical day
+    :param np.ndarray segment_durations: duration of each row of the typical periods
+        in full resolution timesteps (default: 1)
+    :return: sequence (length: number of full resolution timesteps) and factors
+        (length: number of clustered timesteps) as integer arrays
+    :rtype: tuple
+    """
+    typical_days, day_position = np.unique(typical_day_of_row, return_inverse=True)
+    if segment_durations is None:
+        segment_durations = np.ones(len(typical_day_of_row), dtype=int)
+    segment_durations = np.asarray(segment_durations, dtype=int)
+
+    # Clustered timesteps of each typical day (rows are ordered by typical day)
+    timesteps_of_day = np.argsort(day_position, kind="stable") + 1
+    timesteps_of_hour = np.repeat(
+        timesteps_of_day, segment_durations[timesteps_of_day - 1]
+    ).reshape(len(typical_days), -1)
+    sequence = timesteps_of_hour[
+        np.searchsorted(typical_days, np.asarray(cluster_order))
+    ].ravel()
+
+    occurrences = np.array([cluster_no_occ[day] for day in typical_days], dtype=int)
+    factors = occurrences[day_position] * segment_durations
+
+    return sequence, factors
+
+
+def _cluster_time_series(args: tuple) -> dict:
+    """
+    Clusters full resolution data in a worker process
+
+    :param tuple args: arguments of :func:`cluster_time_series`
+    :return: clustering result
+    :rtype: dict
+    """
+    return cluster_time_series(*args)
+
+
+def cluster_investment_periods(
+    full_res_data: dict,
+    nr_clusters: int,
+    hours_per_day: int,
+    nr_workers: int = 1,
+    cache: ClusteringCache = None,
+    engine: str = "tsam",
+    cluster_method: str = "k_means",
+    column_weights: dict = None,
+    nr_segments: int = 0,
+) -> dict:
+    """
+    Clusters the full resolution data of multiple investment periods
+
+    If a cache is passed, results are read from the cache where possible and new
+    results are written to it. If more than one worker is used, the remaining
+    investment periods are clustered in a process pool.
+
+    :param dict full_res_data: full resolution data as {investment_period:
+        pd.DataFrame}
+    :param int nr_clusters: number of typical days
+    :param int hours_per_day: number of hours per day
+    :param int nr_workers: number of processes to use. If 1, all investment periods
+        are clustered serially in the current process
+    :param ClusteringCache cache: cache of clustering results
+    :param str engine: tsam or internal
+    :param str cluster_method: k_means, k_medoids or hierarchical
+    :param dict column_weights: weights of the columns as {label: weight}
+    :param int nr_segments: number of segments per typical day (0: no segmentation)
+    :return: clustering results as {investment_period: dict}, see
+        :func:`cluster_time_series`
+    :rtype: dict
+    """
+    column_weights = column_weights or {}
+    settings = {
+        "nr_clusters": nr_clusters,
+        "hours_per_day": hours_per_day,
+        "engine": engine,
+        "cluster_method": cluster_method,
+        "column_weights": column_weights,
+        "nr_segments": nr_segments,
+    }
+    arguments = (
+        nr_clusters,
+        hours_per_day,
+        engine,
+        cluster_method,
+        column_weights,
+        nr_segments,
+    )
+    results = {}
+    keys = {}
+
+    # Read from cache
+    if cache is not None:
+        for investment_period, data in full_res_data.items():
+            keys[investment_period] = get_clustering_key(data, settings)
+            results[investment_period] = cache.get(keys[investment_period])
+    to_cluster = [
+        investment_period
+        for investment_period in full_res_data
+        if results.get(investment_period) is None
+    ]
+
+    # Cluster
+    if nr_workers == 1 or len(to_cluster) <= 1:
+        for investment_period in to_cluster:
+            results[investment_period] = cluster_time_series(
+                full_res_data[investment_period], *arguments
+            )
+    else:
+        nr_workers = min(nr_workers, len(to_cluster))
+        log.info(
+            f"Clustering {len(to_cluster)} investment periods with {nr_workers} "
+            f"processes"
+        )
+        with ProcessPoolExecutor(max_workers=nr_workers) as executor:
+            for investment_period, result in zip(
+                to_cluster,
+                executor.map(
+                    _cluster_time_series,
+                    [
+                        (full_res_data[investment_period], *arguments)
+                        for investment_period in to_cluster
+                    ],
+                ),
+            ):
+                results[investment_period] = result
+
+    # Write to cache
+    if cache is not None:
+        for investment_period in to_cluster:
+            cache.put(keys[investment_period], results[investment_period])
+        cache.log_statistics()
+
+    return {
+        investment_period: results[investment_period]
+        for investment_period in full_res_data
+    }
+
+
+def get_aggregation_errors(
+    full_res_data_matrix: pd.DataFrame, clustering_result: dict
+) -> pd.DataFrame:
+    """
+    Calculates the aggregation error of each column of a clustering result
+
+    The full resolution data is reconstructed from the typical periods and compared
+    to the original data. Both are normalized with the minimum and range of the
+    original data. The following errors are calculated:
+
+    - rmse: root mean squared error
+    - duration_curve: root mean squared error of the duration curves
+    - peak: absolute error of the maximum
+
+    :param pd.DataFrame full_res_data_matrix: clustered data
+    :param dict clustering_result: result of :func:`cluster_time_series`
+    :return: errors as data frame with the metrics as index and the columns of
+        full_res_data_matrix as columns
+    :rtype: pd.DataFrame
+    """
+    typical_periods = clustering_result["typical_periods"]
+    sequence, _ = get_typical_day_sequence(
+        typical_periods.index.get_level_values(0).to_numpy(),
+        clustering_result["cluster_order"],
+        clustering_result["cluster_no_occ"],
+        clustering_result["segment_durations"],
+    )
+
+    original = full_res_data_matrix.to_numpy(dtype=np.float64)
+    reconstructed = typical_periods[full_res_data_matrix.columns].to_numpy(
+        dtype=np.float64
+    )[sequence - 1]
+    minimum = original.min(axis=0)
+    value_range = original.max(axis=0) - minimum
+    value_range[value_range == 0] = 1
+    original = (original - minimum) / value_range
+    reconstructed = (reconstructed - minimum) / value_range
+
+    errors = {
+        "rmse": np.sqrt(((reconstructed - original) ** 2).mean(axis=0)),
+        "duration_curve": np.sqrt(
+            ((np.sort(reconstructed, axis=0) - np.sort(original, axis=0)) ** 2).mean(
+                axis=0
+            )
+        ),
+        "peak": np.abs(reconstructed.max(axis=0) - original.max(axis=0)),
+    }
+    return pd.DataFrame(
+        [errors[metric] for metric in ERROR_METRICS],
+        index=pd.Index(ERROR_METRICS, name="Metric"),
+        columns=full_res_data_matrix.columns,
+    )
+
+
+def _evaluate_nr_typical_days(args: tuple) -> pd.DataFrame:
+    """
+    Clusters full resolution data and calculates the aggregation errors
+
+    :param tuple args: arguments of :func:`cluster_time_series`
+    :return: aggregation errors, see :func:`get_aggregation_errors`
+    :rtype: pd.DataFrame
+    """
+    return get_aggregation_errors(args[0], cluster_time_series(*args))
+
+
+def evaluate_nr_typical_days(
+    full_res_data: dict,
+    nr_typical_days: list,
+    hours_per_day: int,
+    nr_workers: int = 1,
+    engine: str = "tsam",
+    cluster_method: str = "k_means",
+    column_weights: dict = None,
+    nr_segments: int = 0,
+) -> pd.DataFrame:
+    """
+    Calculates the aggregation errors for different numbers of typical days
+
+    The data of each investment period is clustered for each number of typical
+    days and the aggregation errors of all columns are calculated, see
+    :func:`get_aggregation_errors`. If more than one worker is used, the numbers of
+    typical days are evaluated in a process pool.
+
+    :param dict full_res_data: full resolution data as {investment_period:
+        pd.DataFrame}
+    :param list nr_typical_days: numbers of typical days to evaluate
+    :param int hours_per_day: number of hours per day
+    :param int nr_workers: number of processes to use. If 1, all numbers of typical
+        days are evaluated serially in the current process
+    :param str engine: tsam or internal
+    :param str cluster_method: k_means, k_medoids or hierarchical
+    :param dict column_weights: weights of the columns as {label: weight}
+    :param int nr_segments: number of segments per typical day (0: no segmentation)
+    :return: errors as data frame with (investment period, number of typical days,
+        metric) as index and the columns of the data as columns
+    :rtype: pd.DataFrame
+    """
+    jobs = [
+        (investment_period, nr_clusters)
+        for investment_period in full_res_data
+        for nr_clusters in nr_typical_days
+    ]
+    arguments = [
+        (
+            full_res_data[investment_period],
+            nr_clusters,
+            hours_per_day,
+            engine,
+            cluster_method,
+            column_weights or {},
+            nr_segments,
+        )
+        for investment_period, nr_clusters in jobs
+    ]
+
+    if nr_workers == 1 or len(jobs) <= 1:
+        errors = [_evaluate_nr_typical_days(args) for args in arguments]
+    else:
+        nr_workers = min(nr_workers, len(jobs))
+        log.info(
+            f"Evaluating {len(jobs)} numbers of typical days with {nr_workers} "
+            f"processes"
+        )
+        with ProcessPoolExecutor(max_workers=nr_workers) as executor:
+            errors = list(executor.map(_evaluate_nr_typical_days, arguments))
+
+    return pd.concat(
+        errors, keys=jobs, names=["InvestmentPeriod", "NrTypicalDays"], axis=0
+    )
+
+
+def select_nr_typical_days(errors: pd.DataFrame, metric: str, threshold: float) -> int:
+    """
+    Selects the smallest number of typical days with an error below a threshold
+
+    The error of a number of typical days is the mean error of all columns, taking
+    the maximum over all investment periods. If no number of typical days meets the
+    threshold, the largest number evaluated is selected.
+
+    :param pd.DataFrame errors: aggregation errors, see
+        :func:`evaluate_nr_typical_days`
+    :param str metric: rmse, duration_curve or peak
+    :param float threshold: maximum error
+    :return: number of typical days
+    :rtype: int
+    """
+    if metric not in ERROR_METRICS:
+        raise Exception(f"Error metric {metric} is not available")
+    mean_errors = (
+        errors.xs(metric, level="Metric")
+        .mean(axis=1)
+        .groupby(level="NrTypicalDays")
+        .max()
+    )
+    below_threshold = mean_errors.index[mean_errors <= threshold]
+    if len(below_threshold):
+        return int(below_threshold.min())
+    log.warning(
+        f"No number of typical days has a {metric} error below {threshold}, using "
+        f"{mean_errors.index.max()} typical days"
+    )
+    return int(mean_errors.index.max())
@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+def read_time_series_header(file_path: Path) -> list:
+    """
+    Reads the column names of a time series csv file (semicolon separated, first
+    column is the index)
+
+    :param Path file_path: path of csv file
+    :return: column names of the file (without index column)
+    :rtype: list
+    """
+    return list(pd.read_csv(file_path, sep=";", index_col=0, nrows=0).columns)
+
+
+def read_time_series_values(file_path: Path, nr_columns: int) -> np.ndarray:
+    """
+    Reads the values of a time series csv file (without index column)
+
+    :param Path file_path: path of csv file
+    :param int nr_columns: number of columns of the file (without index column)
+    :return: values of the file as 2-D float64 array
+    :rtype: np.ndarray
+    """
+    return pd.read_csv(
+        file_path,
+        sep=";",
+        usecols=range(1, nr_columns + 1),
+        dtype=np.float64,
+    ).to_numpy()
+
+
+def read_time_series_files(
+    data_path: Path, files: list, nr_workers: int = 1
+) -> (np.ndarray, list, list):
+    """
+    Reads time series csv files into one 2-D float64 array
+
+    The column names of all files are read first, so that the column index is
+    built once and the array can be preallocated. The files are then read in a
+    thread pool, each writing directly into its columns of the array. NaN values
+    are replaced by zeros.
+
+    :param Path data_path: input data folder
+    :param list files: list of tuples (column prefix, path relative to data_path)
+        in the order the columns should be returned
+    :param int nr_workers: number of threads used to read the files
+    :return: array with all time series, list of column tuples (prefix + column
+        name) and list of column names per file
+    :rtype: tuple
+    """
+    paths = [Path(data_path) / rel_path for _, rel_path in files]
+    if not paths:
+        return np.empty((0, 0)), [], []
+
+    nr_workers = max(1, min(nr_workers, len(paths)))
+    with ThreadPoolExecutor(max_workers=nr_workers) as executor:
+        file_columns = list(executor.map(read_time_series_header, paths))
+
+    # Column index and offsets
+    columns = []
+    offsets = [0]
+    for (prefix, _), names in zip(files, file_columns):
+        columns.extend([tuple(prefix) + (name,) for name in names])
+        offsets.append(offsets[-1] + len(names))
+
+    # The first file determines the number of rows
+    first_values = read_time_series_values(paths[0], len(file_columns[0]))
+    nr_rows = first_values.shape[0]
+    values = np.empty((nr_rows, len(columns)), dtype=np.float64)
+    values[:, offsets[0] : offsets[1]] = first_values
+
+    def read_file(idx: int):
+        file_values = read_time_series_values(paths[idx], len(file_columns[idx]))
+        if file_values.shape[0] != nr_rows:
+            raise Exception(
+                f"The number of rows in {paths[idx]} ({file_values.shape[0]}) is "
+                f"different from the number of rows in {paths[0]} ({nr_rows})"
+            )
+        values[:, offsets[idx] : offsets[idx + 1]] = file_values
+
+    with ThreadPoolExecutor(max_workers=nr_workers) as executor:
+        list(executor.map(read_file, range(1, len(paths))))
+
+    replace_nan(values, columns)
+
+    return values, columns, file_columns
+
+
+def replace_nan(values: np.ndarray, columns: list):
+    """
+    Replaces NaN values in time series by zeros (in place)
+
+    :param np.ndarray values: 2-D array with time series
+    :param list columns: column tuples of the array (used for logging)
+    """
+    nan_values = np.isnan(values)
+    nan_in_column = nan_values.any(axis=0)
+    if nan_in_column.any():
+        for idx in np.flatnonzero(nan_in_column):
+            log.debug(
+                f"Found NaN values in data for {columns[idx]}. Replaced with zeros."
+            )
+        values[nan_values] = 0
@@ -0,0 +1,95 @@
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class MemoryMappedStore:
+    """
+    Store for time series and time dependent technology performances in memory-mapped
+    files
+
+    Each array is written to a ``.npy`` file in column-major order and opened as a
+    read-only memory map, so that the operating system loads its pages only when they
+    are accessed and can evict them again. As all columns of an investment period
+    (and of a node within an investment period) are adjacent, selecting an
+    investment period or a node from a data frame backed by the store returns a view
+    that is loaded on demand.
+
+    The files are written to a temporary folder in store_path that is deleted when
+    the store is garbage collected. Arrays are never overwritten, as they might
+    still be mapped.
+
+    :param Path store_path: folder to create the temporary folder in
+    """
+
+    def __init__(self, store_path: Path):
+        """
+        Constructor
+
+        :param Path store_path: folder to create the temporary folder in
+        """
+        store_path = Path(store_path)
+        store_path.mkdir(parents=True, exist_ok=True)
+        self.directory = tempfile.TemporaryDirectory(
+            dir=store_path, ignore_cleanup_errors=True
+        )
+        self.path = Path(self.directory.name)
+        self.nr_arrays = 0
+
+    def allocate(self, name: str, shape: tuple) -> np.memmap:
+        """
+        Creates a new writable memory-mapped array in column-major order
+
+        :param str name: name of the array (used in the file name)
+        :param tuple shape: shape of the array
+        :return: memory-mapped array
+        :rtype: np.memmap
+        """
+        self.nr_arrays += 1
+        file_path = self.path / f"{self.nr_arrays}_{name}.npy"
+        return open_memmap(
+            file_path, mode="w+", dtype=np.float64, shape=shape, fortran_order=True
+        )
+
+    def store_array(self, name: str, values: np.ndarray) -> np.memmap:
+        """
+        Writes an array to the store
+
+        :param str name: name of the array (used in the file name)
+        :param np.ndarray values: two dimensional array to store
+        :return: read-only memory-mapped array with the values
+        :rtype: np.memmap
+        """
+        array = self.allocate(name, values.shape)
+        array[...] = values
+        array.flush()
+        return np.load(array.filename, mmap_mode="r")
+
+    def store_frame(self, name: str, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Writes a data frame to the store
+
+        The data is copied column block by column block, so that the data frame is
+        not copied in memory as a whole.
+
+        :param str name: name of the array (used in the file name)
+        :param pd.DataFrame data: data frame to store
+        :return: data frame with the same index and columns backed by a read-only
+            memory-mapped array
+        :rtype: pd.DataFrame
+        """
+        array = self.allocate(name, data.shape)
+        nr_columns_per_block = max(1, (1 << 24) // max(1, len(data)))
+        for start in range(0, data.shape[1], nr_columns_per_block):
+            stop = start + nr_columns_per_block
+            array[:, start:stop] = data.iloc[:, start:stop].to_numpy(dtype=np.float64)
+        array.flush()
+        values = np.load(array.filename, mmap_mode="r")
+        log.debug(f"Stored {name} in {array.filename} ({values.nbytes / 1e6:.1f} MB)")
+        return pd.DataFrame(values, index=data.index, columns=data.columns, copy=False)
@@ -3,8 +3,11 @@ import pandas as pd
 import pvlib
 import os
 import json
+import copy
 
 from ..components.technologies import *
+from ..data_preprocessing.template_creation import initialize_configuration_templates
+from .input_data_source import InputFolder, get_input_data_source
 
 import logging
 
@@ -64,52 +67,52 @@ def select_technology(tec_data: dict):
         return HydroOpen(tec_data)
 
 
-def read_tec_data(tec_name: str, load_path: Path):
+def read_tec_data(tec_name: str, load_path: Path, source=None):
     """
     Loads the technology data from load_path and preprocesses it.
 
     :param str tec_name: technology name
-    :param Path load_path: load path
-    :param pd.DataFrame climate_data: Climate Data
-    :param dict location: Dictonary with node location
+    :param Path load_path: load path (relative to the input data folder, if source
+        is given)
+    :param source: input data source (InputFolder or CaseBundle) to read from, if
+        None, load_path is a folder
     :return: Technology Class
     """
-    tec_data = open_json(tec_name, load_path)
+    tec_data = open_json(tec_name, load_path, source)
     tec_data["name"] = tec_name
     tec_data = select_technology(tec_data)
 
     # CCS
     if tec_data.component_options.ccs_possible:
-        tec_data.ccs_data = open_json(tec_data.component_options.ccs_type, load_path)
+        tec_data.ccs_data = open_json(
+            tec_data.component_options.ccs_type, load_path, source
+        )
     return tec_data
 
 
-def open_json(tec: str, load_path: Path) -> dict:
+def open_json(tec: str, load_path: Path, source=None) -> dict:
     """
     Loops through load_path and subdirectories and returns json with name tec + ".json"
 
     :param str tec: name of technology to read json for
     :param Path load_path: directory path to loop through all subdirectories and search for tec + ".json"
+    :param source: input data source (InputFolder or CaseBundle) to read from, if
+        None, load_path is a folder
     :return: Dictionary containing the json data
     :rtype: dict
     """
-    # Read in JSON files
-    for path, subdirs, files in os.walk(load_path):
-        if "data" in locals():
-            break
-        else:
-            for name in files:
-                if (tec + ".json") == name:
-                    filepath = os.path.join(path, name)
-                    with open(filepath) as json_file:
-                        data = json.load(json_file)
-                    break
+    if source is None:
+        source = InputFolder(load_path)
+        load_path = Path()
 
-    # Assign name
-    if "data" in locals():
-        data["Name"] = tec
-    else:
+    # Read in JSON file
+    file_path = source.find_file(load_path, tec + ".json")
+    if file_path is None:
         raise Exception("There is no json data file for technology " + tec)
+    data = source.read_json(file_path)
+
+    # Assign name
+    data["Name"] = tec
 
     return data
 
@@ -128,20 +131,17 @@ def check_input_data_consistency(path: Path):
     - is there a json file for all technologies?
     - is there a carrier file for each defined carrier?
 
-    :param Path path: path to check for consistency
+    :param path: input data folder, case bundle or input data source to check
     """
+    source = get_input_data_source(path)
+    path = source.path
 
-    def check_path_existance(path: Path, error_message: str):
-        if not os.path.exists(path):
+    def check_path_existance(check_path: Path, error_message: str):
+        if not source.exists(check_path.relative_to(path)):
             raise Exception(error_message)
 
-    # Convert to Path
-    if isinstance(path, str):
-        path = Path(path)
-
     # Read topology
-    with open(path / "Topology.json") as json_file:
-        topology = json.load(json_file)
+    topology = source.read_json("Topology.json")
 
     for investment_period in topology["investment_periods"]:
 
@@ -157,8 +157,7 @@ def check_input_data_consistency(path: Path):
             check_path / "Networks.json",
             f"A Network.json file is missing in {check_path}",
         )
-        with open(check_path / "Networks.json") as json_file:
-            all_networks = json.load(json_file)
+        all_networks = source.read_json(check_path.relative_to(path) / "Networks.json")
         for type in all_networks.keys():
             networks = all_networks[type]
             for network in networks:
@@ -208,8 +207,9 @@ def check_input_data_consistency(path: Path):
             )
 
             # Check if all technologies have a json file
-            with open(check_node_path / "Technologies.json") as json_file:
-                technologies_at_node = json.load(json_file)
+            technologies_at_node = source.read_json(
+                check_node_path.relative_to(path) / "Technologies.json"
+            )
             technologies_at_node = set(
                 list(technologies_at_node["existing"].keys())
                 + technologies_at_node["new"]
@@ -229,8 +229,7 @@ def check_input_data_consistency(path: Path):
                 )
 
     # Read config
-    with open(path / "ConfigModel.json") as json_file:
-        config = json.load(json_file)
+    config = source.read_json("ConfigModel.json")
 
     # Check that averaging and k-means is not used at same time
     if (config["optimization"]["typicaldays"]["N"]["value"] != 0) and (
@@ -243,3 +242,84 @@ def check_input_data_consistency(path: Path):
 
     log_msg = "Input data folder has been checked successfully - no errors occurred."
     log.info(log_msg)
+
+
+def complete_model_config(model_config: dict, template: dict) -> dict:
+    """
+    Adds settings that are missing in the model configuration with their default
+    value
+
+    Allows to use model configurations that have been created with an older
+    version of the configuration template.
+
+    :param dict model_config: model configuration as read from ConfigModel.json
+    :param dict template: configuration template with default values
+    :return: completed model configuration
+    :rtype: dict
+    """
+    for key, value in template.items():
+        if key not in model_config:
+            model_config[key] = copy.deepcopy(value)
+        elif (
+            isinstance(value, dict)
+            and "value" not in value
+            and isinstance(model_config[key], dict)
+        ):
+            complete_model_config(model_config[key], value)
+    return model_config
+
+
+def get_nr_workers(nr_workers: int) -> int:
+    """
+    Returns the number of workers to use for parallel processing
+
+    :param int nr_workers: number of workers as specified in the model
+        configuration (-1 uses the number of CPUs)
+    :return: number of workers
+    :rtype: int
+    """
+    if nr_workers == -1:
+        return os.cpu_count() or 1
+    elif nr_workers < 1:
+        raise Exception("The number of workers needs to be -1 or larger than 0")
+    return int(nr_workers)
+
+
+class InvestmentPeriodData(dict):
+    """
+    Dictionary of data per investment period that reads investment periods on demand
+
+    If an investment period is not in the dictionary, the function load is called
+    with the investment period, which is expected to add it (to this and all other
+    dictionaries of investment period data). Investment periods that have been
+    released raise an exception instead, as their data is not available anymore.
+
+    :param load: function reading the data of an investment period
+    """
+
+    def __init__(self, load):
+        """
+        Constructor
+
+        :param load: function reading the data of an investment period
+        """
+        super().__init__()
+        self.load = load
+        self.released = set()
+
+    def __missing__(self, investment_period: str):
+        if investment_period in self.released:
+            raise Exception(
+                f"The data of investment period {investment_period} has been released"
+            )
+        self.load(investment_period)
+        return dict.__getitem__(self, investment_period)
+
+    def release(self, investment_period: str):
+        """
+        Removes the data of an investment period
+
+        :param str investment_period: investment period to release
+        """
+        self.pop(investment_period, None)
+        self.released.add(investment_period)
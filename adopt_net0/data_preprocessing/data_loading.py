@@ -5,7 +5,6 @@ import shutil
 import os
 import json
 import requests
-from timezonefinder import TimezoneFinder
 from pathlib import Path
 
 
@@ -285,9 +284,6 @@ def import_jrc_climate_data(
     specified hight. Wind speed is returned as a dict for different heights.
     :rtype: dict
     """
-    # get time zone
-    tf = TimezoneFinder()
-
     # Specify year import, lon, lat
     if year == "typical_year":
         parameters = {"lon": lon, "lat": lat, "outputformat": "json"}
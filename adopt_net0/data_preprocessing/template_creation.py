@@ -315,7 +315,24 @@ def initialize_configuration_templates() -> dict:
             },
             "typicaldays": {
                 "N": {
-                    "description": "Determines number of typical days (0 = off).",
+                    "description": "Determines number of typical days (0 = off, 'auto' = smallest number of typical days in auto_N_range with an aggregation error below auto_error_threshold).",
+                    "value": 0,
+                },
+                "auto_N_range": {
+                    "description": "Range [min, max] of numbers of typical days evaluated if N is 'auto'.",
+                    "value": [2, 30],
+                },
+                "auto_error_metric": {
+                    "description": "Aggregation error used to select the number of typical days if N is 'auto': root mean squared error (rmse), error of the duration curves (duration_curve) or error of the maxima (peak) of the normalized time series, averaged over all time series.",
+                    "options": ["rmse", "duration_curve", "peak"],
+                    "value": "rmse",
+                },
+                "auto_error_threshold": {
+                    "description": "Maximum aggregation error if N is 'auto'.",
+                    "value": 0.1,
+                },
+                "nr_segments": {
+                    "description": "Number of segments per typical day (0 = off). If larger than 0, adjacent hours of each typical day are merged to segments of variable duration, reducing the number of timesteps per typical day.",
                     "value": 0,
                 },
                 "method": {
@@ -330,6 +347,15 @@ def initialize_configuration_templates() -> dict:
                     "options": [],
                     "value": ["RES", "STOR", "Hydro_Open"],
                 },
+                "cluster_method": {
+                    "description": "Method used to cluster days to typical days. For k_means, typical days are the means of the clusters, for k_medoids and hierarchical the medoids.",
+                    "options": ["k_means", "k_medoids", "hierarchical"],
+                    "value": "k_means",
+                },
+                "column_weights": {
+                    "description": "Weights of time series for clustering as dict {label: weight}. Labels can be nodes, carriers or names of time series (e.g. 'Demand'). The weight of a time series is the product of the weights of its labels, labels not specified have a weight of 1.",
+                    "value": {},
+                },
             },
             "multiyear": {
                 "description": "Enable multiyear analysis, if turned off max time horizon is 1 year.",
@@ -426,6 +452,15 @@ def initialize_configuration_templates() -> dict:
                 "options": [0, 1, 2],
                 "value": 0,
             },
+            "profile_construction": {
+                "description": "If 1, records the wall time, memory delta and number of variables, constraints, binaries and nonzeros of each investment period, network, arc, node, technology and balance during model construction. The profile is written to construction_profile.json and construction_profile.csv in the result folder. Profiling slows down the model construction.",
+                "options": [0, 1],
+                "value": 0,
+            },
+            "profile_construction_top_n": {
+                "description": "Number of components with the most nonzeros that are printed after the balances are constructed, if the model construction is profiled.",
+                "value": 10,
+            },
         },
         "energybalance": {
             "violation": {
@@ -454,7 +489,17 @@ def initialize_configuration_templates() -> dict:
                 "description": "Determines if dynamics are used.",
                 "options": [0, 1],
                 "value": 0,
-            }
+            },
+            "gdp_transformation": {
+                "description": "Transformation used to reformulate disjunctions. gdp.mbigm calculates tightened big-M values with the solver defined in solveroptions.",
+                "options": ["gdp.bigm", "gdp.hull", "gdp.mbigm"],
+                "value": "gdp.bigm",
+            },
+            "deferred_gdp_transformation": {
+                "description": "If 1, all disjunctions are transformed in one pass over the full model after the balances are constructed. If 0, each technology, network and arc is transformed when it is constructed.",
+                "options": [0, 1],
+                "value": 0,
+            },
         },
         "scaling": {
             "scaling_on": {
@@ -477,6 +522,50 @@ def initialize_configuration_templates() -> dict:
                 },
             },
         },
+        "data_management": {
+            "cache_time_series": {
+                "description": "Caches the time series of the input data folder in a binary format. In subsequent runs, unchanged files are read from the cache.",
+                "options": [0, 1],
+                "value": 0,
+            },
+            "cache_path": {
+                "description": "Folder to write cached data to. If -1, the folder '.cache' in the input data folder is used.",
+                "value": -1,
+            },
+            "cache_technology_fits": {
+                "description": "Caches fitted technologies on disk. In subsequent runs, technologies with unchanged technology data, climate data and location are read from the cache.",
+                "options": [0, 1],
+                "value": 0,
+            },
+            "cache_clustering": {
+                "description": "Caches clustered time series (typical days) on disk. In subsequent runs, investment periods with unchanged data and clustering settings are read from the cache.",
+                "options": [0, 1],
+                "value": 0,
+            },
+            "cache_size_limit": {
+                "description": "Maximum size of the technology fit cache and of the clustering cache in MB. If exceeded, the least recently used entries are deleted.",
+                "value": 1000,
+            },
+            "aggregation_engine": {
+                "description": "Engine used to cluster (typical days) and average (time staging) time series. 'tsam' uses the package tsam, 'internal' uses a NumPy/SciPy implementation that is faster for large cases.",
+                "options": ["tsam", "internal"],
+                "value": "tsam",
+            },
+            "time_series_store": {
+                "description": "Storage of time series and time dependent technology performances. 'memory' keeps them in memory, 'memmap' writes them to memory-mapped files in the folder 'time_series_store' of the cache folder, which are loaded on demand per investment period and node. Use 'memmap' for large cases (e.g. multiple years with sub-hourly resolution).",
+                "options": ["memory", "memmap"],
+                "value": "memory",
+            },
+            "lazy_loading": {
+                "description": "If 1, only topology, model configuration and node locations are read initially. The data of each investment period is read, fitted and aggregated when the investment period is constructed and released afterwards (if not required for Monte Carlo simulations or time staging).",
+                "options": [0, 1],
+                "value": 0,
+            },
+            "nr_workers": {
+                "description": "Number of workers used to read and process the input data. If 1, the data is processed serially. If -1, the number of CPUs is used.",
+                "value": 1,
+            },
+        },
     }
 
     return configuration_template
@@ -14,3 +14,4 @@ from .construct_balances import (
 from .construct_nodes import construct_node_block
 from .construct_investment_period import construct_investment_period_block
 from .utilities import get_data_for_investment_period, get_data_for_node
+from .construction_profiler import ConstructionProfiler, get_model_size
@@ -105,10 +105,43 @@ def construct_network_constraints(model, config: dict):
     return model
 
 
+def get_carrier_technology_index(b_period, nodes) -> dict:
+    """
+    Indexes the technologies producing and consuming each carrier at each node
+
+    The index only contains the carriers of each node, so that the energy balances
+    can be constructed over the (node, carrier) pairs that exist without checking
+    the carriers of all technologies for each constraint.
+
+    :param b_period: pyomo block holding the investment period
+    :param nodes: nodes to index
+    :return: index as {node: {carrier: (producing technology blocks, consuming
+        technology blocks)}}
+    :rtype: dict
+    """
+    index = {}
+    for node in nodes:
+        node_block = b_period.node_blocks[node]
+        index[node] = {car: ([], []) for car in node_block.set_carriers}
+        for tec in node_block.set_technologies:
+            b_tec = node_block.tech_blocks_active[tec]
+            for car in b_tec.set_output_carriers_all:
+                if car in index[node]:
+                    index[node][car][0].append(b_tec)
+            for car in b_tec.set_input_carriers_all:
+                if car in index[node]:
+                    index[node][car][1].append(b_tec)
+
+    return index
+
+
 def construct_nodal_energybalance(model, config: dict):
     """
     Calculates the energy balance for each node and carrier
 
+    The constraints are only constructed for the carriers of each node (see
+    :func:`get_carrier_technology_index`).
+
     .. math::
         outputFromTechnologies - inputToTechnologies + \\
         inflowFromNetwork - outflowToNetwork + \\
@@ -133,55 +166,62 @@ def construct_nodal_energybalance(model, config: dict):
                 domain=pyo.NonNegativeReals,
             )
 
+        carrier_tec_index = get_carrier_technology_index(b_period, model.set_nodes)
+
+        b_ebalance.set_carrier_nodes = pyo.Set(
+            dimen=2,
+            initialize=[
+                (car, node)
+                for car in model.set_carriers
+                for node in model.set_nodes
+                if car in carrier_tec_index[node]
+            ],
+        )
+
         def init_energybalance(const, t, car, node):
-            if car in b_period.node_blocks[node].set_carriers:
-                node_block = b_period.node_blocks[node]
-                tec_output = sum(
-                    node_block.tech_blocks_active[tec].var_output_tot[t, car]
-                    for tec in node_block.set_technologies
-                    if car in node_block.tech_blocks_active[tec].set_output_carriers_all
-                )
+            node_block = b_period.node_blocks[node]
+            tecs_output, tecs_input = carrier_tec_index[node][car]
 
-                tec_input = sum(
-                    node_block.tech_blocks_active[tec].var_input_tot[t, car]
-                    for tec in node_block.set_technologies
-                    if car in node_block.tech_blocks_active[tec].set_input_carriers_all
-                )
+            tec_output = pyo.quicksum(
+                b_tec.var_output_tot[t, car] for b_tec in tecs_output
+            )
 
-                netw_inflow = node_block.var_netw_inflow[t, car]
+            tec_input = pyo.quicksum(
+                b_tec.var_input_tot[t, car] for b_tec in tecs_input
+            )
 
-                netw_outflow = node_block.var_netw_outflow[t, car]
+            netw_inflow = node_block.var_netw_inflow[t, car]
 
-                if hasattr(node_block, "var_netw_consumption"):
-                    netw_consumption = node_block.var_netw_consumption[t, car]
-                else:
-                    netw_consumption = 0
+            netw_outflow = node_block.var_netw_outflow[t, car]
 
-                import_flow = node_block.var_import_flow[t, car]
+            if hasattr(node_block, "var_netw_consumption"):
+                netw_consumption = node_block.var_netw_consumption[t, car]
+            else:
+                netw_consumption = 0
 
-                export_flow = node_block.var_export_flow[t, car]
+            import_flow = node_block.var_import_flow[t, car]
 
-                if config["energybalance"]["violation"]["value"] > 0:
-                    violation = b_period.var_violation[t, car, node]
-                else:
-                    violation = 0
-                return (
-                    tec_output
-                    - tec_input
-                    + netw_inflow
-                    - netw_outflow
-                    - netw_consumption
-                    + import_flow
-                    - export_flow
-                    + violation
-                    == node_block.para_demand[t, car]
-                    - node_block.var_generic_production[t, car]
-                )
+            export_flow = node_block.var_export_flow[t, car]
+
+            if config["energybalance"]["violation"]["value"] > 0:
+                violation = b_period.var_violation[t, car, node]
             else:
-                return pyo.Constraint.Skip
+                violation = 0
+            return (
+                tec_output
+                - tec_input
+                + netw_inflow
+                - netw_outflow
+                - netw_consumption
+                + import_flow
+                - export_flow
+                + violation
+                == node_block.para_demand[t, car]
+                - node_block.var_generic_production[t, car]
+            )
 
         b_ebalance.const_energybalance = pyo.Constraint(
-            set_t, model.set_carriers, model.set_nodes, rule=init_energybalance
+            set_t, b_ebalance.set_carrier_nodes, rule=init_energybalance
         )
 
         return b_ebalance
@@ -195,6 +235,10 @@ def construct_global_energybalance(model, config):
     """
     Calculates the global energy balance for each carrier summed over all nodes
 
+    The constraints are only constructed for the carriers used at any node and only
+    sum over the nodes and technologies using the carrier (see
+    :func:`get_carrier_technology_index`).
+
     .. math::
         outputFromTechnologies - inputToTechnologies + \\
         imports - exports = demand - genericProductionProfile
@@ -218,64 +262,47 @@ def construct_global_energybalance(model, config):
                 domain=pyo.NonNegativeReals,
             )
 
+        carrier_tec_index = get_carrier_technology_index(b_period, model.set_nodes)
+        carrier_nodes = {}
+        for node in model.set_nodes:
+            for car in carrier_tec_index[node]:
+                carrier_nodes.setdefault(car, []).append(node)
+
         def init_energybalance_global(const, t, car):
-            tec_output = sum(
-                sum(
-                    b_period.node_blocks[node]
-                    .tech_blocks_active[tec]
-                    .var_output_tot[t, car]
-                    for tec in b_period.node_blocks[node].set_technologies
-                    if car in b_period.node_blocks[node].set_carriers
-                    and b_period.node_blocks[node]
-                    .tech_blocks_active[tec]
-                    .set_output_carriers_all
-                )
-                for node in model.set_nodes
+            nodes = carrier_nodes[car]
+
+            tec_output = pyo.quicksum(
+                b_tec.var_output_tot[t, car]
+                for node in nodes
+                for b_tec in carrier_tec_index[node][car][0]
             )
 
-            tec_input = sum(
-                sum(
-                    b_period.node_blocks[node]
-                    .tech_blocks_active[tec]
-                    .var_input_tot[t, car]
-                    for tec in b_period.node_blocks[node].set_technologies
-                    if car in b_period.node_blocks[node].set_carriers
-                    and b_period.node_blocks[node]
-                    .tech_blocks_active[tec]
-                    .set_input_carriers_all
-                )
-                for node in model.set_nodes
+            tec_input = pyo.quicksum(
+                b_tec.var_input_tot[t, car]
+                for node in nodes
+                for b_tec in carrier_tec_index[node][car][1]
             )
 
-            import_flow = sum(
-                b_period.node_blocks[node].var_import_flow[t, car]
-                for node in model.set_nodes
-                if car in b_period.node_blocks[node].set_carriers
+            import_flow = pyo.quicksum(
+                b_period.node_blocks[node].var_import_flow[t, car] for node in nodes
             )
 
-            export_flow = sum(
-                b_period.node_blocks[node].var_export_flow[t, car]
-                for node in model.set_nodes
-                if car in b_period.node_blocks[node].set_carriers
+            export_flow = pyo.quicksum(
+                b_period.node_blocks[node].var_export_flow[t, car] for node in nodes
             )
 
-            demand = sum(
-                b_period.node_blocks[node].para_demand[t, car]
-                for node in model.set_nodes
-                if car in b_period.node_blocks[node].set_carriers
+            demand = pyo.quicksum(
+                b_period.node_blocks[node].para_demand[t, car] for node in nodes
             )
 
-            gen_prod = sum(
+            gen_prod = pyo.quicksum(
                 b_period.node_blocks[node].var_generic_production[t, car]
-                for node in model.set_nodes
-                if car in b_period.node_blocks[node].set_carriers
+                for node in nodes
             )
 
             if config["energybalance"]["violation"]["value"] > 0:
-                violation = sum(
-                    b_period.var_violation[t, car, node]
-                    for node in model.set_nodes
-                    if car in b_period.node_blocks[node].set_carriers
+                violation = pyo.quicksum(
+                    b_period.var_violation[t, car, node] for node in nodes
                 )
             else:
                 violation = 0
@@ -285,19 +312,12 @@ def construct_global_energybalance(model, config):
                 == demand - gen_prod
             )
 
-        model.set_used_carriers = pyo.Set(
-            initialize=list(
-                set().union(
-                    *[
-                        b_period.node_blocks[node].set_carriers
-                        for node in model.set_nodes
-                    ]
-                )
-            )
+        b_ebalance.set_used_carriers = pyo.Set(
+            initialize=[car for car in model.set_carriers if car in carrier_nodes]
         )
 
         b_ebalance.const_energybalance = pyo.Constraint(
-            set_t, model.set_used_carriers, rule=init_energybalance_global
+            set_t, b_ebalance.set_used_carriers, rule=init_energybalance_global
         )
 
         return b_ebalance
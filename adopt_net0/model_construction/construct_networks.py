@@ -1,4 +1,4 @@
-from ..components.utilities import perform_disjunct_relaxation
+from ..components.utilities import perform_component_disjunct_relaxation
 
 
 def construct_network_block(b_netw, data: dict, set_nodes, set_t_full, set_t_clustered):
@@ -18,6 +18,6 @@ def construct_network_block(b_netw, data: dict, set_nodes, set_t_full, set_t_clu
         b_netw, data, set_nodes, set_t_full, set_t_clustered
     )
     if network.big_m_transformation_required:
-        b_netw = perform_disjunct_relaxation(b_netw)
+        b_netw = perform_component_disjunct_relaxation(b_netw, data["config"])
 
     return b_netw
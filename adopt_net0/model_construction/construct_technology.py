@@ -1,4 +1,4 @@
-from ..components.utilities import perform_disjunct_relaxation
+from ..components.utilities import perform_component_disjunct_relaxation
 
 
 def construct_technology_block(b_tec, data: dict, set_t_full, set_t_clustered):
@@ -15,6 +15,6 @@ def construct_technology_block(b_tec, data: dict, set_t_full, set_t_clustered):
     technology = data["technology_data"][tec]
     b_tec = technology.construct_tech_model(b_tec, data, set_t_full, set_t_clustered)
     if technology.big_m_transformation_required:
-        b_tec = perform_disjunct_relaxation(b_tec)
+        b_tec = perform_component_disjunct_relaxation(b_tec, data["config"])
 
     return b_tec
@@ -0,0 +1,212 @@
+import json
+import time
+import tracemalloc
+from pathlib import Path
+import pandas as pd
+import pyomo.environ as pyo
+from pyomo.core.expr.visitor import identify_variables
+
+
+def get_model_size(components: list) -> dict:
+    """
+    Counts the variables, binary variables, active constraints and nonzeros of pyomo
+    components
+
+    Blocks are counted including all their sub-blocks and disjuncts. The nonzeros are
+    the number of unfixed variables in the body of each active constraint.
+
+    :param list components: pyomo components (blocks, variables, constraints)
+    :return: dict with number of variables, constraints, binaries and nonzeros
+    :rtype: dict
+    """
+    size = {"variables": 0, "constraints": 0, "binaries": 0, "nonzeros": 0}
+    variables = []
+    constraints = []
+    for component in components:
+        if component.is_indexed():
+            component_data = list(component.values())
+        else:
+            component_data = [component]
+
+        if component.ctype is pyo.Var:
+            variables.extend(component_data)
+        elif component.ctype is pyo.Constraint:
+            constraints.extend(con for con in component_data if con.active)
+        else:
+            for block in component_data:
+                if hasattr(block, "component_data_objects"):
+                    variables.extend(block.component_data_objects(pyo.Var))
+                    constraints.extend(
+                        block.component_data_objects(pyo.Constraint, active=True)
+                    )
+
+    for var in variables:
+        size["variables"] += 1
+        if var.is_binary():
+            size["binaries"] += 1
+    for con in constraints:
+        size["constraints"] += 1
+        size["nonzeros"] += sum(
+            1 for _ in identify_variables(con.body, include_fixed=False)
+        )
+
+    return size
+
+
+class ConstructionProfiler:
+    """
+    Records the wall time, memory delta and size of model blocks during the model
+    construction
+
+    The construction of a block is recorded between :func:`start` and :func:`stop`.
+    Recordings can be nested, e.g. technologies within nodes within investment
+    periods. The name of a record is the path of all enclosing records (e.g.
+    period1/node1/Boiler). All values of a record include the values of the records
+    nested in it. The memory delta is the change of the memory allocated by python,
+    traced with tracemalloc while a record is running. Counting the model size after
+    a block is constructed is not included in the wall time of the enclosing records.
+
+    If the profiler is not active, :func:`start` and :func:`stop` do nothing.
+    """
+
+    def __init__(self, active: bool = True):
+        """
+        Constructor
+
+        :param bool active: if the model construction is profiled
+        """
+        self.active = active
+        self.records = {}
+        self._running = []
+        self._counting_time = 0
+        self._tracing_started = False
+
+    def start(self, component_type: str, name: str, model_block=None):
+        """
+        Starts recording the construction of a block
+
+        :param str component_type: type of component (e.g. technology, node)
+        :param str name: name of the component
+        :param model_block: if passed, only the components that are added to this
+            block until :func:`stop` is called are counted
+        """
+        if not self.active:
+            return
+
+        if not self._running and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing_started = True
+
+        if self._running:
+            path = self._running[-1]["name"] + "/" + name
+        else:
+            path = name
+        self._running.append(
+            {
+                "name": path,
+                "component_type": component_type,
+                "existing_components": (
+                    None
+                    if model_block is None
+                    else set(model_block.component_map().keys())
+                ),
+                "start_time": time.perf_counter(),
+                "start_counting_time": self._counting_time,
+                "start_memory": tracemalloc.get_traced_memory()[0],
+            }
+        )
+
+    def stop(self, model_block):
+        """
+        Stops recording the construction of a block and counts its size
+
+        :param model_block: pyomo block that was constructed
+        """
+        if not self.active:
+            return
+
+        memory = tracemalloc.get_traced_memory()[0]
+        end_time = time.perf_counter()
+        running = self._running.pop()
+
+        if running["existing_components"] is None:
+            components = [model_block]
+        else:
+            components = [
+                component
+                for name, component in model_block.component_map().items()
+                if name not in running["existing_components"]
+            ]
+        record = {
+            "component_type": running["component_type"],
+            "wall_time": end_time
+            - running["start_time"]
+            - (self._counting_time - running["start_counting_time"]),
+            "memory_delta": (memory - running["start_memory"]) / 1024**2,
+        }
+        record.update(get_model_size(components))
+        self.records[running["name"]] = record
+
+        self._counting_time += time.perf_counter() - end_time
+
+        if not self._running and self._tracing_started:
+            tracemalloc.stop()
+            self._tracing_started = False
+
+    def get_report(self) -> pd.DataFrame:
+        """
+        Returns all records as a data frame
+
+        :return: data frame with wall time [s], memory delta [MB], number of
+            variables, constraints, binaries and nonzeros per component
+        :rtype: pd.DataFrame
+        """
+        report = pd.DataFrame.from_dict(self.records, orient="index")
+        report.index.name = "name"
+        return report
+
+    def get_largest_components(self, n: int, column: str = "nonzeros") -> pd.DataFrame:
+        """
+        Returns the n largest components without nested records (e.g. technologies,
+        arcs and balances)
+
+        :param int n: number of components
+        :param str column: column to sort by
+        :return: data frame with the n largest components
+        :rtype: pd.DataFrame
+        """
+        report = self.get_report()
+        names = report.index.to_list()
+        has_no_nested_records = [
+            not any(other.startswith(name + "/") for other in names) for name in names
+        ]
+        return (
+            report[has_no_nested_records].sort_values(column, ascending=False).head(n)
+        )
+
+    def print_largest_components(self, n: int, column: str = "nonzeros"):
+        """
+        Prints the n largest components as a table
+
+        :param int n: number of components
+        :param str column: column to sort by
+        """
+        if not self.records:
+            return
+        print(f"Components with the most {column}:")
+        print(
+            self.get_largest_components(n, column).to_string(
+                float_format=lambda value: f"{value:.2f}"
+            )
+        )
+
+    def write(self, folder_path: Path):
+        """
+        Writes all records to construction_profile.json and construction_profile.csv
+
+        :param Path folder_path: folder to write to
+        """
+        folder_path = Path(folder_path)
+        with open(folder_path / "construction_profile.json", "w") as json_file:
+            json.dump(self.records, json_file, indent=4)
+        self.get_report().to_csv(folder_path / "construction_profile.csv", sep=";")
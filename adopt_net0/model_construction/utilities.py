@@ -21,6 +21,9 @@ def get_data_for_investment_period(
     """
     Gets data from DataHandle for specific investement_period. Writes it to a dict.
 
+    The time series are a view of the time series of the DataHandle, i.e. they are
+    only loaded when accessed if the time series are memory-mapped.
+
     :param data: data to use
     :param str investment_period: investment period
     :param str aggregation_model: aggregation type
@@ -30,9 +33,7 @@ def get_data_for_investment_period(
     data_period = {}
     data_period["topology"] = data.topology
     data_period["technology_data"] = data.technology_data[investment_period]
-    data_period["time_series"] = data.time_series[aggregation_model].loc[
-        :, investment_period
-    ]
+    data_period["time_series"] = data.time_series[aggregation_model][investment_period]
     data_period["network_data"] = data.network_data[investment_period]
     data_period["energybalance_options"] = data.energybalance_options[investment_period]
     data_period["config"] = data.model_config
@@ -47,6 +48,8 @@ def get_data_for_node(data: dict, node: str) -> dict:
     """
     Gets data from a dict for specific node. Writes it to a dict.
 
+    The time series are a view of the time series of the investment period.
+
     :param dict data: data to use
     :param str node: node
     :return: data of respective node
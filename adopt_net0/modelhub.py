@@ -1,6 +1,7 @@
 import random
 from pathlib import Path
 import pyomo.environ as pyo
+import pyomo.gdp as gdp
 import os
 import time
 import numpy as np
@@ -9,7 +10,7 @@ import sys
 import datetime
 
 from .utilities import get_set_t
-from .data_management import DataHandle, read_tec_data
+from .data_management import DataHandle, read_tec_data, fit_technologies
 from .model_construction import *
 from .result_management.read_results import add_values_to_summary
 from .utilities import get_glpk_parameters, get_gurobi_parameters
@@ -18,6 +19,8 @@ from .components.utilities import (
     annualize,
     set_discount_rate,
     perform_disjunct_relaxation,
+    get_disjunct_relaxation_options,
+    get_disjunct_reformulation_name,
 )
 import logging
 
@@ -40,6 +43,7 @@ class ModelHub:
     - self.info_pareto: Current pareto point (if used)
     - self.info_solving_algorithms: Information on time aggregation algorithms
     - self.info_monte_carlo: Information on monte carlo runs
+    - self.construction_profiler: Profile of the model construction (if enabled)
     """
 
     def __init__(self):
@@ -50,6 +54,7 @@ class ModelHub:
         self.model = {}
         self.solution = {}
         self.solver = None
+        self.construction_profiler = ConstructionProfiler(active=False)
         self.last_solve_info = {}
         self.info_pareto = {}
         self.info_pareto["pareto_point"] = -1
@@ -114,34 +119,17 @@ class ModelHub:
                 raise Exception(
                     "Dynamics and clustering with typical days is not " "allowed"
                 )
-            for period in topology["investment_periods"]:
-                for node in topology["nodes"]:
-                    for tec_name in self.data.technology_data[period][node]:
-                        tec = self.data.technology_data[period][node][tec_name]
-                        if ("ramping_const_int" in tec.processed_coeff.dynamics) and (
-                            tec.processed_coeff.dynamics["ramping_const_int"] != -1
-                        ):
-                            raise Exception(
-                                f"Ramping constraint with integers (ramping_const_int) for technology {tec_name} "
-                                f"needs to be -1 when clustering with typical days"
-                            )
 
         if config["optimization"]["timestaging"]["value"] != 0:
             if config["performance"]["dynamics"]["value"]:
                 raise Exception(
                     "Dynamics and two-stage averaging algorithm is not " "allowed"
                 )
+
+        # With lazy loading, technologies are checked when their period is read
+        if not self.data.lazy_loading:
             for period in topology["investment_periods"]:
-                for node in topology["nodes"]:
-                    for tec_name in self.data.technology_data[period][node]:
-                        tec = self.data.technology_data[period][node][tec_name]
-                        if ("ramping_time" in tec.processed_coeff.dynamics) and (
-                            tec.processed_coeff.dynamics["ramping_time"] != -1
-                        ):
-                            raise Exception(
-                                f"Ramping Rate for technology {tec_name} "
-                                f"needs to be -1 when two-stage averaging algorithm is used"
-                            )
+                self._check_technology_data(period)
 
         # check if technologies have dynamic parameters
         if config["performance"]["dynamics"]["value"]:
@@ -173,6 +161,40 @@ class ModelHub:
                                     f"json files or switch off the dynamics."
                                 )
 
+    def _check_technology_data(self, period: str):
+        """
+        Checks the technologies of an investment period for consistency with the time
+        aggregation algorithms
+
+        :param str period: investment period to check
+        """
+        config = self.data.model_config
+        topology = self.data.topology
+
+        if config["optimization"]["typicaldays"]["N"]["value"] != 0:
+            for node in topology["nodes"]:
+                for tec_name in self.data.technology_data[period][node]:
+                    tec = self.data.technology_data[period][node][tec_name]
+                    if ("ramping_const_int" in tec.processed_coeff.dynamics) and (
+                        tec.processed_coeff.dynamics["ramping_const_int"] != -1
+                    ):
+                        raise Exception(
+                            f"Ramping constraint with integers (ramping_const_int) for technology {tec_name} "
+                            f"needs to be -1 when clustering with typical days"
+                        )
+
+        if config["optimization"]["timestaging"]["value"] != 0:
+            for node in topology["nodes"]:
+                for tec_name in self.data.technology_data[period][node]:
+                    tec = self.data.technology_data[period][node][tec_name]
+                    if ("ramping_time" in tec.processed_coeff.dynamics) and (
+                        tec.processed_coeff.dynamics["ramping_time"] != -1
+                    ):
+                        raise Exception(
+                            f"Ramping Rate for technology {tec_name} "
+                            f"needs to be -1 when two-stage averaging algorithm is used"
+                        )
+
     def construct_model(self):
         """
         Constructs the model. The model structure is as follows:
@@ -226,9 +248,12 @@ class ModelHub:
                 self.info_solving_algorithms["aggregation_model"] = "averaged"
                 self.info_solving_algorithms["aggregation_data"] = "averaged"
 
+        self.construction_profiler = ConstructionProfiler(
+            config["reporting"]["profile_construction"]["value"]
+        )
+
         # INITIALIZE MODEL
         aggregation_model = self.info_solving_algorithms["aggregation_model"]
-        aggregation_data = self.info_solving_algorithms["aggregation_data"]
         self.model[aggregation_model] = pyo.ConcreteModel()
 
         # GET DATA
@@ -247,70 +272,148 @@ class ModelHub:
         model.var_emissions_net = pyo.Var()
 
         # INVESTMENT PERIOD BLOCK
-        def init_period_block(b_period):
-            """Pyomo rule to initialize a block holding all investment periods"""
+        model.periods = pyo.Block(model.set_periods, rule=self._construct_period_block)
 
-            # Get data for investment period
-            investment_period = b_period.index()
-            data_period = get_data_for_investment_period(
-                self.data, investment_period, aggregation_data
-            )
-            # Add sets, parameters, variables, constraints to block
-            b_period = construct_investment_period_block(b_period, data_period)
-
-            # NETWORK BLOCK
-            if not config["energybalance"]["copperplate"]["value"]:
-
-                def init_network_block(b_netw, netw):
-                    """Pyomo rule to initialize a block holding all networks"""
-                    # Add sets, parameters, variables, constraints to block
-                    b_netw = construct_network_block(
-                        b_netw,
-                        data_period,
-                        model.set_nodes,
-                        b_period.set_t_full,
-                        b_period.set_t_clustered,
-                    )
+        log_msg = f"Constructing model completed in {str(round(time.time() - start))}s"
+        log.info(log_msg)
 
-                    return b_netw
+    def _construct_period_block(self, b_period):
+        """
+        Pyomo rule to initialize a block holding all investment periods
 
-                b_period.network_block = pyo.Block(
-                    b_period.set_networks, rule=init_network_block
-                )
+        With lazy loading, the data of an investment period is read when its block
+        is constructed and released afterwards, if it is not needed anymore.
 
-            # NODE BLOCK
-            def init_node_block(b_node, node):
-                """Pyomo rule to initialize a block holding all nodes"""
-                # Get data for node
-                data_node = get_data_for_node(data_period, node)
+        :param b_period: investment period block to construct
+        :return: investment period block
+        """
+        config = self.data.model_config
+        model = b_period.model()
+        profiler = self.construction_profiler
+        aggregation_data = self.info_solving_algorithms["aggregation_data"]
+        release_data = (
+            self.data.lazy_loading
+            and config["optimization"]["monte_carlo"]["N"]["value"] == 0
+            and config["optimization"]["timestaging"]["value"] == 0
+        )
+
+        # Get data for investment period
+        investment_period = b_period.index()
+        profiler.start("investment_period", investment_period)
+        data_period = get_data_for_investment_period(
+            self.data, investment_period, aggregation_data
+        )
+        data_period["construction_profiler"] = profiler
+        if self.data.lazy_loading:
+            self._check_technology_data(investment_period)
+        data_nodes = []
+        # Add sets, parameters, variables, constraints to block
+        b_period = construct_investment_period_block(b_period, data_period)
+
+        # NETWORK BLOCK
+        if not config["energybalance"]["copperplate"]["value"]:
 
+            def init_network_block(b_netw, netw):
+                """Pyomo rule to initialize a block holding all networks"""
+                profiler.start("network", netw)
                 # Add sets, parameters, variables, constraints to block
-                b_node = construct_node_block(
-                    b_node, data_node, b_period.set_t_full, b_period.set_t_clustered
+                b_netw = construct_network_block(
+                    b_netw,
+                    data_period,
+                    model.set_nodes,
+                    b_period.set_t_full,
+                    b_period.set_t_clustered,
                 )
+                profiler.stop(b_netw)
 
-                # TECHNOLOGY BLOCK
-                def init_technology_block(b_tec, tec):
-                    b_tec = construct_technology_block(
-                        b_tec, data_node, b_period.set_t_full, b_period.set_t_clustered
-                    )
+                return b_netw
 
-                    return b_tec
+            b_period.network_block = pyo.Block(
+                b_period.set_networks, rule=init_network_block
+            )
 
-                b_node.tech_blocks_active = pyo.Block(
-                    b_node.set_technologies, rule=init_technology_block
+        # NODE BLOCK
+        def init_node_block(b_node, node):
+            """Pyomo rule to initialize a block holding all nodes"""
+            profiler.start("node", node)
+            # Get data for node
+            data_node = get_data_for_node(data_period, node)
+            data_nodes.append(data_node)
+
+            # Add sets, parameters, variables, constraints to block
+            b_node = construct_node_block(
+                b_node, data_node, b_period.set_t_full, b_period.set_t_clustered
+            )
+
+            # TECHNOLOGY BLOCK
+            def init_technology_block(b_tec, tec):
+                profiler.start("technology", tec)
+                b_tec = construct_technology_block(
+                    b_tec, data_node, b_period.set_t_full, b_period.set_t_clustered
                 )
+                profiler.stop(b_tec)
 
-                return b_node
+                return b_tec
 
-            b_period.node_blocks = pyo.Block(model.set_nodes, rule=init_node_block)
+            b_node.tech_blocks_active = pyo.Block(
+                b_node.set_technologies, rule=init_technology_block
+            )
+            profiler.stop(b_node)
 
-            return b_period
+            return b_node
 
-        model.periods = pyo.Block(model.set_periods, rule=init_period_block)
+        b_period.node_blocks = pyo.Block(model.set_nodes, rule=init_node_block)
 
-        log_msg = f"Constructing model completed in {str(round(time.time() - start))}s"
+        # Release data (the block rules keep references to the data dicts)
+        if release_data:
+            for data in [data_period] + data_nodes:
+                data.clear()
+            self.data.release_investment_period(investment_period)
+
+        profiler.stop(b_period)
+
+        return b_period
+
+    def refresh_data(self) -> dict:
+        """
+        Reads changed input data again and rebuilds the affected parts of the model
+
+        The input data is refreshed with :meth:`DataHandle.refresh`. If the model was
+        constructed already, the blocks of all affected investment periods are
+        constructed again. As all balances need to be re-constructed then,
+        run :func:`~construct_balances` and then :func:`~solve` to solve the model
+        again. If all data was read again (e.g. because the topology or the model
+        configuration changed), the model is deleted and needs to be constructed
+        again.
+
+        :return: change set, see :meth:`DataHandle.refresh`
+        :rtype: dict
+        """
+        log_msg = "--- Refreshing data ---"
         log.info(log_msg)
+        changes = self.data.refresh()
+
+        if changes["full_reload"]:
+            self._perform_preprocessing_checks()
+            self.model = {}
+            return changes
+
+        if not self.data.lazy_loading:
+            for period in changes["investment_periods"]:
+                self._check_technology_data(period)
+
+        aggregation_model = self.info_solving_algorithms["aggregation_model"]
+        if aggregation_model in self.model:
+            model = self.model[aggregation_model]
+            for period in changes["investment_periods"]:
+                log.info(f"Constructing investment period {period} again")
+                b_period = model.periods[period]
+                b_period.clear()
+                self._construct_period_block(b_period)
+
+        log_msg = "--- Refreshing data complete ---"
+        log.info(log_msg)
+        return changes
 
     def construct_balances(self):
         """
@@ -323,24 +426,63 @@ class ModelHub:
         config = self.data.model_config
         data = self.data
         model = self.model[self.info_solving_algorithms["aggregation_model"]]
+        profiler = self.construction_profiler
 
         model = delete_all_balances(model)
 
         if not config["energybalance"]["copperplate"]["value"]:
+            profiler.start("balance", "network_constraints", model)
             model = construct_network_constraints(model, config)
+            profiler.stop(model)
+            profiler.start("balance", "nodal_energybalance", model)
             model = construct_nodal_energybalance(model, config)
+            profiler.stop(model)
         else:
+            profiler.start("balance", "global_energybalance", model)
             model = construct_global_energybalance(model, config)
+            profiler.stop(model)
 
+        profiler.start("balance", "emission_balance", model)
         model = construct_emission_balance(model, data)
+        profiler.stop(model)
+        profiler.start("balance", "system_cost", model)
         model = construct_system_cost(model, data)
+        profiler.stop(model)
+        profiler.start("balance", "global_balance", model)
         model = construct_global_balance(model)
+        profiler.stop(model)
+
+        # Transform all disjunctions in one pass
+        if config["performance"]["deferred_gdp_transformation"]["value"]:
+            start_transformation = time.time()
+            nr_disjunctions = len(
+                list(
+                    model.component_data_objects(
+                        gdp.Disjunction,
+                        active=True,
+                        descend_into=(pyo.Block, gdp.Disjunct),
+                    )
+                )
+            )
+            model = perform_disjunct_relaxation(
+                model, **get_disjunct_relaxation_options(config)
+            )
+            log_msg = (
+                f"Transformed {nr_disjunctions} disjunctions in one pass in "
+                f"{str(round(time.time() - start_transformation))}s"
+            )
+            log.info(log_msg)
 
         log_msg = (
             f"Constructing balances completed in {str(round(time.time() - start))}s"
         )
         log.warning(log_msg)
 
+        if profiler.active:
+            profiler.print_largest_components(
+                config["reporting"]["profile_construction_top_n"]["value"]
+            )
+
     def solve(self):
         """
         Defines objective and solves model
@@ -430,24 +572,30 @@ class ModelHub:
             "config": config,
             "topology": self.data.topology,
         }
+        fitting_jobs = []
         for technology in technologies:
             # read in technology data
             tec_data = read_tec_data(
                 technology,
-                self.data.data_path
-                / investment_period
-                / "node_data"
-                / node
-                / "technology_data",
-            )
-            # fit technology data
-            tec_data.fit_technology_performance(
-                self.data.time_series["full"][investment_period][node]["ClimateData"][
-                    "global"
-                ],
-                self.data.node_locations.loc[node, :],
+                Path(investment_period) / "node_data" / node / "technology_data",
+                self.data.input_data_source,
             )
-            # add technology data to data handle
+            fitting_jobs.append((tec_data, investment_period, node))
+
+        # fit technology data
+        fitted_technologies = fit_technologies(
+            fitting_jobs,
+            {
+                investment_period: {
+                    node: self.data.get_climate_data(investment_period, node)
+                }
+            },
+            self.data.node_locations,
+            cache=self.data.get_technology_fit_cache(),
+        )
+
+        # add technology data to data handle
+        for technology, tec_data in zip(technologies, fitted_technologies):
             self.data.technology_data[investment_period][node][technology] = tec_data
             data_node["technology_data"][technology] = tec_data
 
@@ -820,6 +968,13 @@ class ModelHub:
         result_folder_path = create_unique_folder_name(save_path, folder_name)
         create_save_folder(result_folder_path)
 
+        if self.construction_profiler.active:
+            self.construction_profiler.write(result_folder_path)
+        if self.data.typical_days_selection is not None:
+            self.data.typical_days_selection.to_csv(
+                result_folder_path / "typical_days_selection.csv", sep=";"
+            )
+
         # Scale model
         if config["scaling"]["scaling_on"]["value"] == 1:
             self.scale_model()
@@ -1204,7 +1359,7 @@ class ModelHub:
                 big_m_transformation_required = 1
                 b_tec.del_component(b_tec.dis_installation)
                 b_tec.del_component(b_tec.disjunction_installation)
-                b_tec.del_component(b_tec._pyomo_gdp_bigm_reformulation)
+                b_tec.del_component(get_disjunct_reformulation_name(config))
 
             # Reconstruct technology constraints
             data_period = get_data_for_investment_period(
@@ -1214,7 +1369,9 @@ class ModelHub:
 
             b_tec = tec_data._define_capex_constraints(b_tec, data_node)
             if big_m_transformation_required:
-                b_tec = perform_disjunct_relaxation(b_tec)
+                b_tec = perform_disjunct_relaxation(
+                    b_tec, **get_disjunct_relaxation_options(config)
+                )
 
         else:
             log_msg = (
@@ -1289,7 +1446,7 @@ class ModelHub:
             b_arc.var_capex.setub(bounds[1])
 
             # Remove constraint (from persistent solver and from model)
-            b_arc.del_component(b_arc._pyomo_gdp_bigm_reformulation)
+            b_arc.del_component(get_disjunct_reformulation_name(config))
             b_arc.del_component(b_arc.const_capex)
             b_arc.del_component(b_arc.dis_installation)
             b_arc.del_component(b_arc.disjunction_installation)
@@ -1299,7 +1456,9 @@ class ModelHub:
             )
 
             if b_arc.big_m_transformation_required:
-                b_arc = perform_disjunct_relaxation(b_arc)
+                b_arc = perform_disjunct_relaxation(
+                    b_arc, **get_disjunct_relaxation_options(config)
+                )
 
     def _monte_carlo_import_parameters(self, on_car=None, MC_ranges=None):
         """
@@ -1322,8 +1481,8 @@ class ModelHub:
 
                 for car in model.periods[period].node_blocks[node].set_carriers:
                     if car in on_car:
-                        import_prices = self.data.time_series[aggregation_data][
-                            period, node, "CarrierData", car, "Import price"
+                        import_prices = self.data.time_series[aggregation_data][period][
+                            node, "CarrierData", car, "Import price"
                         ]
 
                         for t in set_t:
@@ -1379,8 +1538,8 @@ class ModelHub:
 
                 for car in model.periods[period].node_blocks[node].set_carriers:
                     if car in on_car:
-                        export_prices = self.data.time_series[aggregation_data][
-                            period, node, "CarrierData", car, "Export price"
+                        export_prices = self.data.time_series[aggregation_data][period][
+                            node, "CarrierData", car, "Export price"
                         ]
 
                         for t in set_t:
@@ -1,3 +1,4 @@
+import numpy as np
 from pyomo.environ import SolverFactory
 
 
@@ -55,20 +56,25 @@ def get_set_t(config: dict, model_block):
         return model_block.set_t_full
 
 
-def get_hour_factors(config: dict, data, period: str) -> list:
+def get_hour_factors(config: dict, data, period: str) -> np.ndarray:
     """
     Returns the correct hour factors to use for global balances
 
+    With typical days (method 1), the factor of a clustered timestep is the number
+    of full resolution timesteps it represents, i.e. the number of occurrences of
+    its typical day times its duration (larger than 1 for segmented typical days).
+
     :param dict config: config dict
     :param data: DataHandle
     :return: hour factors
+    :rtype: np.ndarray
     """
     if config["optimization"]["typicaldays"]["N"]["value"] == 0:
-        return [1] * len(data.topology["time_index"]["full"])
+        return np.ones(len(data.topology["time_index"]["full"]), dtype=int)
     elif config["optimization"]["typicaldays"]["method"]["value"] == 1:
         return data.k_means_specs[period]["factors"]
     elif config["optimization"]["typicaldays"]["method"]["value"] == 2:
-        return [1] * len(data.topology["time_index"]["full"])
+        return np.ones(len(data.topology["time_index"]["full"]), dtype=int)
 
 
 def get_nr_timesteps_averaged(config: dict) -> int:
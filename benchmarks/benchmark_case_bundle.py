@@ -0,0 +1,89 @@
+"""
+Benchmark of reading input data from a folder and from a case bundle
+
+Creates input data folders with an increasing number of nodes (with the templates
+and random time series for one year at hourly resolution), packs them into a case
+bundle and compares the runtime of DataHandle.read_data for the folder and for the
+bundle. Caching of time series is disabled. The number of files opened by the
+folder reader is reported, the bundle reader opens a single file. On network file
+systems, the difference is larger than on a local disk, as each file open has a
+higher latency.
+
+Usage: python benchmarks/benchmark_case_bundle.py
+"""
+
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from adopt_net0.data_management import DataHandle, export_case_bundle
+from adopt_net0.data_preprocessing import (
+    create_input_data_folder_template,
+    initialize_configuration_templates,
+    initialize_topology_templates,
+)
+
+NR_NODES = [10, 50, 200]
+CARRIERS = ["electricity", "heat", "gas", "hydrogen"]
+
+
+def create_case(data_path: Path, nr_nodes: int):
+    """
+    Creates an input data folder with random time series
+    """
+    rng = np.random.default_rng(0)
+    topology = initialize_topology_templates()
+    topology["nodes"] = [f"node{idx}" for idx in range(nr_nodes)]
+    topology["carriers"] = CARRIERS
+    with open(data_path / "Topology.json", "w") as json_file:
+        json.dump(topology, json_file, indent=4)
+    with open(data_path / "ConfigModel.json", "w") as json_file:
+        json.dump(initialize_configuration_templates(), json_file, indent=4)
+    create_input_data_folder_template(data_path)
+
+    for file_path in (data_path / "period1" / "node_data").rglob("*.csv"):
+        data = pd.read_csv(file_path, sep=";", index_col=0)
+        data.loc[:, :] = rng.random(data.shape)
+        data.to_csv(file_path, sep=";")
+
+
+def read(data_path: Path) -> float:
+    """
+    Returns the runtime of reading the input data in s
+    """
+    start = time.perf_counter()
+    data = DataHandle()
+    data.set_settings(data_path)
+    data.read_data()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    print(
+        f"{'nodes':>6} {'files':>6} {'export [s]':>11} {'bundle [MB]':>12} "
+        f"{'folder [s]':>11} {'bundle [s]':>11}"
+    )
+    for nr_nodes in NR_NODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "case"
+            data_path.mkdir()
+            create_case(data_path, nr_nodes)
+            nr_files = sum(1 for path in data_path.rglob("*") if path.is_file())
+
+            bundle_path = Path(tmp) / "case.h5"
+            start = time.perf_counter()
+            export_case_bundle(data_path, bundle_path)
+            t_export = time.perf_counter() - start
+
+            t_folder = read(data_path)
+            t_bundle = read(bundle_path)
+            print(
+                f"{nr_nodes:>6} {nr_files:>6} {t_export:>11.2f} "
+                f"{bundle_path.stat().st_size / 1e6:>12.1f} {t_folder:>11.2f} "
+                f"{t_bundle:>11.2f}"
+            )
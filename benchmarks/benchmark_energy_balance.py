@@ -0,0 +1,225 @@
+"""
+Benchmark of constructing the energy balances
+
+Compares the construction of the nodal and global energy balances scanning all
+technologies of a node for each constraint (previous implementation) with the
+construction over the sparse carrier-technology index (see
+get_carrier_technology_index). A synthetic model with 50 nodes, each using 5 of 10
+carriers and 20 technologies, is constructed for one week at hourly resolution. Only
+the construction of the energy balances is timed. The previous implementation of
+the global energy balance is included with the corrected technology carrier check.
+
+Usage: python benchmarks/benchmark_energy_balance.py
+"""
+
+import time
+import numpy as np
+import pyomo.environ as pyo
+
+from adopt_net0.model_construction import (
+    construct_global_energybalance,
+    construct_nodal_energybalance,
+)
+
+NR_NODES = 50
+NR_CARRIERS = 10
+NR_CARRIERS_PER_NODE = 5
+NR_TECHNOLOGIES_PER_NODE = 20
+NR_TIMESTEPS = 168
+CONFIG = {
+    "energybalance": {"violation": {"value": 0}},
+    "optimization": {"typicaldays": {"N": {"value": 0}}},
+}
+
+
+def create_model() -> pyo.ConcreteModel:
+    """
+    Creates a synthetic model with the components used by the energy balances
+    """
+    rng = np.random.default_rng(0)
+    carriers = [f"carrier{idx}" for idx in range(NR_CARRIERS)]
+
+    model = pyo.ConcreteModel()
+    model.set_periods = pyo.Set(initialize=["period1"])
+    model.set_nodes = pyo.Set(initialize=[f"node{idx}" for idx in range(NR_NODES)])
+    model.set_carriers = pyo.Set(initialize=carriers)
+
+    def init_tec(b_tec, tec, node_carriers, set_t):
+        b_tec.set_input_carriers_all = pyo.Set(
+            initialize=sorted(rng.choice(node_carriers, 2, replace=False))
+        )
+        b_tec.set_output_carriers_all = pyo.Set(
+            initialize=sorted(rng.choice(node_carriers, 2, replace=False))
+        )
+        b_tec.var_input_tot = pyo.Var(set_t, b_tec.set_input_carriers_all)
+        b_tec.var_output_tot = pyo.Var(set_t, b_tec.set_output_carriers_all)
+
+    def init_node(b_node, node):
+        set_t = b_node.parent_block().set_t_full
+        node_carriers = sorted(rng.choice(carriers, NR_CARRIERS_PER_NODE, False))
+        b_node.set_carriers = pyo.Set(initialize=node_carriers)
+        b_node.set_technologies = pyo.Set(
+            initialize=[f"tec{idx}" for idx in range(NR_TECHNOLOGIES_PER_NODE)]
+        )
+        b_node.tech_blocks_active = pyo.Block(
+            b_node.set_technologies,
+            rule=lambda b_tec, tec: init_tec(b_tec, tec, node_carriers, set_t),
+        )
+        for var in [
+            "var_netw_inflow",
+            "var_netw_outflow",
+            "var_import_flow",
+            "var_export_flow",
+            "var_generic_production",
+        ]:
+            b_node.add_component(var, pyo.Var(set_t, b_node.set_carriers))
+        b_node.para_demand = pyo.Param(
+            set_t, b_node.set_carriers, initialize=1, mutable=True
+        )
+
+    def init_period(b_period, period):
+        b_period.set_t_full = pyo.RangeSet(1, NR_TIMESTEPS)
+        b_period.node_blocks = pyo.Block(model.set_nodes, rule=init_node)
+
+    model.periods = pyo.Block(model.set_periods, rule=init_period)
+    return model
+
+
+def construct_nodal_energybalance_previous(model, config: dict):
+    """
+    Previous implementation of the nodal energy balance
+    """
+
+    def init_energybalance(b_ebalance, period):
+        b_period = model.periods[period]
+        set_t = b_period.set_t_full
+
+        def init_energybalance(const, t, car, node):
+            if car in b_period.node_blocks[node].set_carriers:
+                node_block = b_period.node_blocks[node]
+                tec_output = sum(
+                    node_block.tech_blocks_active[tec].var_output_tot[t, car]
+                    for tec in node_block.set_technologies
+                    if car in node_block.tech_blocks_active[tec].set_output_carriers_all
+                )
+                tec_input = sum(
+                    node_block.tech_blocks_active[tec].var_input_tot[t, car]
+                    for tec in node_block.set_technologies
+                    if car in node_block.tech_blocks_active[tec].set_input_carriers_all
+                )
+                return (
+                    tec_output
+                    - tec_input
+                    + node_block.var_netw_inflow[t, car]
+                    - node_block.var_netw_outflow[t, car]
+                    + node_block.var_import_flow[t, car]
+                    - node_block.var_export_flow[t, car]
+                    == node_block.para_demand[t, car]
+                    - node_block.var_generic_production[t, car]
+                )
+            else:
+                return pyo.Constraint.Skip
+
+        b_ebalance.const_energybalance = pyo.Constraint(
+            set_t, model.set_carriers, model.set_nodes, rule=init_energybalance
+        )
+
+    model.block_energybalance = pyo.Block(model.set_periods, rule=init_energybalance)
+    return model
+
+
+def construct_global_energybalance_previous(model, config: dict):
+    """
+    Previous implementation of the global energy balance
+    """
+
+    def init_energybalance(b_ebalance, period):
+        b_period = model.periods[period]
+        set_t = b_period.set_t_full
+
+        def init_energybalance_global(const, t, car):
+            node_blocks = [
+                b_period.node_blocks[node]
+                for node in model.set_nodes
+                if car in b_period.node_blocks[node].set_carriers
+            ]
+            tec_output = sum(
+                sum(
+                    node_block.tech_blocks_active[tec].var_output_tot[t, car]
+                    for tec in node_block.set_technologies
+                    if car in node_block.tech_blocks_active[tec].set_output_carriers_all
+                )
+                for node_block in node_blocks
+            )
+            tec_input = sum(
+                sum(
+                    node_block.tech_blocks_active[tec].var_input_tot[t, car]
+                    for tec in node_block.set_technologies
+                    if car in node_block.tech_blocks_active[tec].set_input_carriers_all
+                )
+                for node_block in node_blocks
+            )
+            import_flow = sum(nb.var_import_flow[t, car] for nb in node_blocks)
+            export_flow = sum(nb.var_export_flow[t, car] for nb in node_blocks)
+            demand = sum(nb.para_demand[t, car] for nb in node_blocks)
+            gen_prod = sum(nb.var_generic_production[t, car] for nb in node_blocks)
+            return (
+                tec_output - tec_input + import_flow - export_flow == demand - gen_prod
+            )
+
+        b_ebalance.const_energybalance = pyo.Constraint(
+            set_t, model.set_carriers, rule=init_energybalance_global
+        )
+
+    model.block_energybalance = pyo.Block(model.set_periods, rule=init_energybalance)
+    return model
+
+
+def construct(model, construct_balance) -> (float, int):
+    """
+    Returns the runtime of constructing an energy balance in s and the number of
+    constraints
+    """
+    if model.find_component("block_energybalance"):
+        model.del_component(model.block_energybalance)
+    start = time.perf_counter()
+    construct_balance(model, CONFIG)
+    runtime = time.perf_counter() - start
+    nr_constraints = sum(
+        len(b_ebalance.const_energybalance)
+        for b_ebalance in model.block_energybalance.values()
+    )
+    return runtime, nr_constraints
+
+
+if __name__ == "__main__":
+    model = create_model()
+    print(
+        f"{NR_NODES} nodes, {NR_TECHNOLOGIES_PER_NODE} technologies per node, "
+        f"{NR_TIMESTEPS} timesteps"
+    )
+    print(
+        f"{'balance':>8} {'constraints':>12} {'previous [s]':>13} {'sparse [s]':>11} "
+        f"{'speedup':>8}"
+    )
+    for name, previous, sparse in [
+        (
+            "nodal",
+            construct_nodal_energybalance_previous,
+            construct_nodal_energybalance,
+        ),
+        (
+            "global",
+            construct_global_energybalance_previous,
+            construct_global_energybalance,
+        ),
+    ]:
+        t_previous, nr_constraints = construct(model, previous)
+        t_sparse, nr_constraints_sparse = construct(model, sparse)
+        if model.periods["period1"].find_component("var_violation"):
+            model.periods["period1"].del_component("var_violation")
+        assert nr_constraints == nr_constraints_sparse
+        print(
+            f"{name:>8} {nr_constraints:>12} {t_previous:>13.2f} {t_sparse:>11.2f} "
+            f"{t_previous / t_sparse:>8.1f}"
+        )
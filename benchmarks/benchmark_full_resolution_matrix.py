@@ -0,0 +1,151 @@
+"""
+Benchmark of collecting full resolution data for time aggregation
+
+Compares collecting the time series and time dependent technology performances of an
+investment period in one data frame and writing the averaged data back to the
+technologies with per series data frames (previous implementation) and with the
+contiguous FullResolutionMatrix. Synthetic hourly data of one year is used for
+cases with an increasing number of nodes, each with 20 time series and 10
+technologies with one one-dimensional and one two-dimensional (3 columns)
+coefficient. The runtime and the peak memory allocated (measured with tracemalloc,
+not including the input data) are reported.
+
+Usage: python benchmarks/benchmark_full_resolution_matrix.py
+"""
+
+import time
+import tracemalloc
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+from adopt_net0.data_management import average_time_series
+from adopt_net0.data_management.full_resolution_matrix import FullResolutionMatrix
+
+NR_NODES = [5, 20, 50]
+NR_TIME_SERIES_PER_NODE = 20
+NR_TECHNOLOGIES_PER_NODE = 10
+NR_TIMESTEPS = 8760
+NR_TIMESTEPS_AVERAGED = 4
+
+
+def create_data(nr_nodes: int) -> (pd.DataFrame, dict):
+    """
+    Creates synthetic time series and technologies with time dependent coefficients
+    """
+    rng = np.random.default_rng(0)
+    columns = pd.MultiIndex.from_tuples(
+        [
+            (f"node{node}", "CarrierData", f"carrier{idx}", "Demand")
+            for node in range(nr_nodes)
+            for idx in range(NR_TIME_SERIES_PER_NODE)
+        ],
+        names=["Node", "Key1", "Carrier", "Key2"],
+    )
+    time_series = pd.DataFrame(
+        rng.random((NR_TIMESTEPS, len(columns))),
+        columns=columns,
+        index=pd.date_range("2022-01-01", periods=NR_TIMESTEPS, freq="1h"),
+    )
+    technology_data = {
+        f"node{node}": {
+            f"tec{tec}": SimpleNamespace(
+                processed_coeff=SimpleNamespace(
+                    time_dependent_full={
+                        "capfactor": rng.random(NR_TIMESTEPS),
+                        "alpha": rng.random((NR_TIMESTEPS, 3)),
+                    }
+                )
+            )
+            for tec in range(NR_TECHNOLOGIES_PER_NODE)
+        }
+        for node in range(nr_nodes)
+    }
+    return time_series, technology_data
+
+
+def collect_data_frames(time_series: pd.DataFrame, technology_data: dict):
+    """
+    Previous implementation: collects all series in a dictionary and concatenates
+    them to a data frame
+    """
+    time_series = pd.concat({"time_series": time_series}, names=["type_series"], axis=1)
+    tec_series = {}
+    for node in technology_data:
+        for tec in technology_data[node]:
+            coeff_td = technology_data[node][tec].processed_coeff.time_dependent_full
+            for series in coeff_td:
+                if coeff_td[series].ndim > 1:
+                    for count, c in enumerate(coeff_td[series].T):
+                        tec_series[(node, tec, series, count)] = c
+                else:
+                    tec_series[(node, tec, series, "")] = coeff_td[series]
+    tec_series = pd.DataFrame(tec_series)
+    tec_series.columns.set_names(["Node", "Key1", "Carrier", "Key2"], inplace=True)
+    tec_series = pd.concat({"tec_series": tec_series}, names=["type_series"], axis=1)
+    tec_series.index = time_series.index
+    return pd.concat([time_series, tec_series], axis=1)
+
+
+def aggregate_data_frames(time_series: pd.DataFrame, technology_data: dict):
+    """
+    Previous implementation: averages the data frame and writes the technology
+    performances back column by column
+    """
+    full_res_data = collect_data_frames(time_series, technology_data)
+    averaged = pd.DataFrame(
+        average_time_series(
+            full_res_data.to_numpy(dtype=np.float64),
+            NR_TIMESTEPS // NR_TIMESTEPS_AVERAGED,
+        ),
+        columns=full_res_data.columns,
+    )
+    tec_series = averaged["tec_series"]
+    for node in technology_data:
+        for tec in technology_data[node]:
+            coeff = technology_data[node][tec].processed_coeff
+            time_dependent_coeff = tec_series[node][tec]
+            coeff.time_dependent_averaged = {
+                series: time_dependent_coeff[series].values
+                for series in time_dependent_coeff.columns.get_level_values(0)
+            }
+    return averaged["time_series"]
+
+
+def aggregate_matrix(time_series: pd.DataFrame, technology_data: dict):
+    """
+    Averages the data with a FullResolutionMatrix
+    """
+    matrix = FullResolutionMatrix(time_series, technology_data)
+    averaged = average_time_series(matrix.values, NR_TIMESTEPS // NR_TIMESTEPS_AVERAGED)
+    matrix.write_aggregated_data(averaged, "averaged")
+    return matrix.get_time_series(averaged)
+
+
+def measure(function, nr_nodes: int) -> (float, float):
+    """
+    Returns runtime in s and peak memory in MB of aggregating the data
+    """
+    time_series, technology_data = create_data(nr_nodes)
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(time_series, technology_data)
+    runtime = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return runtime, peak / 1e6
+
+
+if __name__ == "__main__":
+    print(
+        f"{'nodes':>6} {'columns':>8} {'data frames [s]':>16} {'matrix [s]':>11} "
+        f"{'data frames [MB]':>17} {'matrix [MB]':>12}"
+    )
+    for nr_nodes in NR_NODES:
+        nr_columns = nr_nodes * (NR_TIME_SERIES_PER_NODE + 4 * NR_TECHNOLOGIES_PER_NODE)
+        t_frames, m_frames = measure(aggregate_data_frames, nr_nodes)
+        t_matrix, m_matrix = measure(aggregate_matrix, nr_nodes)
+        print(
+            f"{nr_nodes:>6} {nr_columns:>8} {t_frames:>16.2f} {t_matrix:>11.2f} "
+            f"{m_frames:>17.1f} {m_matrix:>12.1f}"
+        )
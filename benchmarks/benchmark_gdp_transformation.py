@@ -0,0 +1,97 @@
+"""
+Benchmark of transforming the disjunctions of a model
+
+Compares transforming the disjunctions of each technology when it is constructed
+(one transformation per block) with transforming all disjunctions in one pass after
+the balances are constructed (deferred_gdp_transformation). Cases with an
+increasing number of nodes are created from the templates, each node with two
+technologies with a piecewise CAPEX function (CAPEX_model 3, modelled with a
+disjunction). The runtime of constructing the model and the balances is reported for
+gdp.bigm and gdp.hull.
+
+Usage: python benchmarks/benchmark_gdp_transformation.py
+"""
+
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from adopt_net0.modelhub import ModelHub
+from adopt_net0.data_preprocessing import (
+    copy_technology_data,
+    create_input_data_folder_template,
+    initialize_configuration_templates,
+    initialize_topology_templates,
+)
+
+NR_NODES = [10, 50, 100]
+NR_TIMESTEPS = 24
+TECHNOLOGIES = ["Boiler_Small_NG", "Boiler_El"]
+METHODS = ["gdp.bigm", "gdp.hull"]
+
+
+def create_case(data_path: Path, nr_nodes: int):
+    """
+    Creates an input data folder with technologies modelled with disjunctions
+    """
+    topology = initialize_topology_templates()
+    topology["nodes"] = [f"node{idx}" for idx in range(nr_nodes)]
+    topology["carriers"] = ["electricity", "heat", "gas"]
+    with open(data_path / "Topology.json", "w") as json_file:
+        json.dump(topology, json_file, indent=4)
+    config = initialize_configuration_templates()
+    config["reporting"]["save_path"]["value"] = str(data_path)
+    with open(data_path / "ConfigModel.json", "w") as json_file:
+        json.dump(config, json_file, indent=4)
+    create_input_data_folder_template(data_path)
+
+    for node in topology["nodes"]:
+        with open(
+            data_path / "period1" / "node_data" / node / "Technologies.json", "w"
+        ) as json_file:
+            json.dump({"existing": {}, "new": TECHNOLOGIES}, json_file, indent=4)
+    copy_technology_data(data_path)
+
+    for tec_path in (data_path / "period1" / "node_data").rglob("technology_data/*"):
+        with open(tec_path) as json_file:
+            tec_data = json.load(json_file)
+        tec_data["Economics"]["CAPEX_model"] = 3
+        with open(tec_path, "w") as json_file:
+            json.dump(tec_data, json_file, indent=4)
+
+
+def construct(data_path: Path, method: str, deferred: int) -> float:
+    """
+    Returns the runtime of constructing the model and the balances in s
+    """
+    pyhub = ModelHub()
+    pyhub.read_data(data_path, start_period=0, end_period=NR_TIMESTEPS)
+    config = pyhub.data.model_config
+    config["performance"]["gdp_transformation"]["value"] = method
+    config["performance"]["deferred_gdp_transformation"]["value"] = deferred
+
+    start = time.perf_counter()
+    pyhub.construct_model()
+    pyhub.construct_balances()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    print(
+        f"{'nodes':>6} {'method':>9} {'per block [s]':>14} {'one pass [s]':>13} "
+        f"{'saved [s]':>10}"
+    )
+    for nr_nodes in NR_NODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp)
+            create_case(data_path, nr_nodes)
+            for method in METHODS:
+                t_per_block = construct(data_path, method, 0)
+                t_one_pass = construct(data_path, method, 1)
+                print(
+                    f"{nr_nodes:>6} {method:>9} {t_per_block:>14.2f} "
+                    f"{t_one_pass:>13.2f} {t_per_block - t_one_pass:>10.2f}"
+                )
@@ -0,0 +1,214 @@
+"""
+Benchmark of constructing time-indexed linear constraints from coefficient lists
+
+Compares constructing the storage level and the network flow constraints with a
+rule per timestep (as in Stor.construct_tech_model and Network._define_flow) with
+constructing them from coefficient lists as pyomo LinearExpressions that are looked
+up by the rule of the constraint. A synthetic model with 10 storage and 10 network
+blocks is constructed for an increasing number of timesteps. The runtime of
+constructing the constraints and of writing the model to an LP file is reported.
+
+With pyomo 6.10, constructing the constraints from coefficient lists takes about
+1.8 times as long as constructing them with rules (8760 timesteps): the operators
+already collect sums of variables into LinearExpressions, while the
+MonomialTermExpression created for each coefficient triggers more garbage collection.
+Writing the LP file is about 20% faster for the flat LinearExpressions, so that the
+sum of both is not smaller. Pyomo's MatrixConstraint, which bypasses the
+expression system, can not be written with the LP writer of pyomo 6.10 and is
+indexed by the row number, so it is not included.
+
+Usage: python benchmarks/benchmark_linear_constraints.py
+"""
+
+import os
+import tempfile
+import time
+import numpy as np
+import pyomo.environ as pyo
+from pyomo.core.expr.numeric_expr import LinearExpression, MonomialTermExpression
+from pyomo.core.expr.relational_expr import EqualityExpression, InequalityExpression
+
+NR_BLOCKS = 10
+NR_TIMESTEPS = [168, 672, 8760]
+ETA_IN = 0.95
+ETA_OUT = 0.95
+LAMBDA = 0.001
+LOSS = 0.03
+RATED_POWER = 1
+
+
+def create_model(nr_timesteps: int) -> pyo.ConcreteModel:
+    """
+    Creates a synthetic model with the variables of storage and network blocks
+    """
+    model = pyo.ConcreteModel()
+    model.set_t = pyo.RangeSet(1, nr_timesteps)
+    model.set_blocks = pyo.RangeSet(1, NR_BLOCKS)
+
+    def init_stor(b_tec, idx):
+        b_tec.var_size = pyo.Var(domain=pyo.NonNegativeReals)
+        b_tec.var_storage_level = pyo.Var(model.set_t, domain=pyo.NonNegativeReals)
+        b_tec.var_input = pyo.Var(model.set_t, ["electricity"])
+        b_tec.var_output = pyo.Var(model.set_t, ["electricity"])
+        b_tec.para_ambient_loss_factor = np.random.default_rng(idx).uniform(
+            0, 0.01, nr_timesteps
+        )
+
+    def init_arc(b_arc, idx):
+        b_arc.var_size = pyo.Var(domain=pyo.NonNegativeReals)
+        b_arc.var_flow = pyo.Var(model.set_t, domain=pyo.NonNegativeReals)
+        b_arc.var_losses = pyo.Var(model.set_t, domain=pyo.NonNegativeReals)
+
+    model.stor_blocks = pyo.Block(model.set_blocks, rule=init_stor)
+    model.arc_blocks = pyo.Block(model.set_blocks, rule=init_arc)
+    model.obj = pyo.Objective(
+        expr=pyo.quicksum(b.var_size for b in model.stor_blocks.values())
+        + pyo.quicksum(b.var_size for b in model.arc_blocks.values())
+    )
+    return model
+
+
+def construct_rules(model):
+    """
+    Constructs the constraints with a rule per timestep
+    """
+    t_end = max(model.set_t)
+    for b_tec in model.stor_blocks.values():
+        ambient_loss_factor = b_tec.para_ambient_loss_factor
+
+        def init_size_constraint(const, t):
+            return b_tec.var_storage_level[t] <= b_tec.var_size
+
+        def init_storage_level(const, t):
+            t_previous = t_end if t == 1 else t - 1
+            t_ambient = t_end if t == 1 else t
+            return b_tec.var_storage_level[t] == b_tec.var_storage_level[t_previous] * (
+                1 - LAMBDA
+            ) - b_tec.var_storage_level[t_ambient] * ambient_loss_factor[t - 1] + (
+                ETA_IN * b_tec.var_input[t, "electricity"]
+                - 1 / ETA_OUT * b_tec.var_output[t, "electricity"]
+            )
+
+        b_tec.const_size = pyo.Constraint(model.set_t, rule=init_size_constraint)
+        b_tec.const_storage_level = pyo.Constraint(model.set_t, rule=init_storage_level)
+
+    for b_arc in model.arc_blocks.values():
+
+        def init_flowlosses(const, t):
+            return b_arc.var_losses[t] == b_arc.var_flow[t] * LOSS
+
+        def init_size_const_high(const, t):
+            return b_arc.var_flow[t] <= b_arc.var_size * RATED_POWER
+
+        b_arc.const_flowlosses = pyo.Constraint(model.set_t, rule=init_flowlosses)
+        b_arc.const_flow_size_high = pyo.Constraint(
+            model.set_t, rule=init_size_const_high
+        )
+
+
+def linear_constraint(index, coefficients, variables, sense: str):
+    """
+    Returns a constraint with the expressions sum(coefficients[k] * variables[k])
+    (sense) 0 for the k-th index
+    """
+    expressions = {}
+    for key, coefficients_key, variables_key in zip(index, coefficients, variables):
+        body = LinearExpression(
+            [
+                MonomialTermExpression((coefficient, variable))
+                for coefficient, variable in zip(coefficients_key, variables_key)
+            ]
+        )
+        if sense == "==":
+            expressions[key] = EqualityExpression((body, 0))
+        else:
+            expressions[key] = InequalityExpression((body, 0), False)
+
+    return pyo.Constraint(index, rule=lambda const, key: expressions[key])
+
+
+def construct_linear(model):
+    """
+    Constructs the constraints from coefficient lists
+    """
+    for b_tec in model.stor_blocks.values():
+        level = [b_tec.var_storage_level[t] for t in model.set_t]
+        level_previous = level[-1:] + level[:-1]
+        level_ambient = level[-1:] + level[1:]
+        b_tec.const_size = linear_constraint(
+            model.set_t,
+            [[1, -1]] * len(level),
+            [[var, b_tec.var_size] for var in level],
+            "<=",
+        )
+        b_tec.const_storage_level = linear_constraint(
+            model.set_t,
+            [
+                [1, -(1 - LAMBDA), factor, -ETA_IN, 1 / ETA_OUT]
+                for factor in b_tec.para_ambient_loss_factor.tolist()
+            ],
+            [
+                [
+                    level[t - 1],
+                    level_previous[t - 1],
+                    level_ambient[t - 1],
+                    b_tec.var_input[t, "electricity"],
+                    b_tec.var_output[t, "electricity"],
+                ]
+                for t in model.set_t
+            ],
+            "==",
+        )
+
+    for b_arc in model.arc_blocks.values():
+        flow = [b_arc.var_flow[t] for t in model.set_t]
+        losses = [b_arc.var_losses[t] for t in model.set_t]
+        b_arc.const_flowlosses = linear_constraint(
+            model.set_t,
+            [[1, -LOSS]] * len(flow),
+            [list(variables) for variables in zip(losses, flow)],
+            "==",
+        )
+        b_arc.const_flow_size_high = linear_constraint(
+            model.set_t,
+            [[1, -RATED_POWER]] * len(flow),
+            [[var, b_arc.var_size] for var in flow],
+            "<=",
+        )
+
+
+def construct(nr_timesteps: int, construct_constraints, lp_path: str) -> tuple:
+    """
+    Returns the runtime of constructing the constraints and of writing the model in s
+    """
+    model = create_model(nr_timesteps)
+    start = time.perf_counter()
+    construct_constraints(model)
+    t_construct = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.write(lp_path)
+    t_write = time.perf_counter() - start
+    return t_construct, t_write
+
+
+if __name__ == "__main__":
+    print(f"{NR_BLOCKS} storage blocks and {NR_BLOCKS} arcs")
+    print(
+        f"{'timesteps':>10} {'backend':>8} {'construction [s]':>17} {'write [s]':>10} "
+        f"{'total [s]':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        lp_path = os.path.join(tmp, "model.lp")
+        for nr_timesteps in NR_TIMESTEPS:
+            for backend, construct_constraints in [
+                ("rules", construct_rules),
+                ("linear", construct_linear),
+            ]:
+                t_construct, t_write = construct(
+                    nr_timesteps, construct_constraints, lp_path
+                )
+                print(
+                    f"{nr_timesteps:>10} {backend:>8} {t_construct:>17.2f} "
+                    f"{t_write:>10.2f} {t_construct + t_write:>10.2f}"
+                )
@@ -0,0 +1,116 @@
+"""
+Benchmark of cloning technology blocks
+
+Compares constructing the block of each technology (including the disjunct
+relaxation) with constructing it once and cloning it with pyomo for all other
+technologies with identical data. A case with 100 nodes is created from the
+templates, each node with the same gas turbine (CONV1) and battery (STOR). For each
+technology, 100 blocks are constructed and 100 blocks are cloned from a constructed
+block for an increasing number of timesteps. Block.clone deep copies all components
+of a block, which takes about as long as constructing it with the rules of the
+technology, so identical technologies are constructed and not cloned.
+
+Usage: python benchmarks/benchmark_technology_block_cloning.py
+"""
+
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+import pyomo.environ as pyo
+
+from adopt_net0.modelhub import ModelHub
+from adopt_net0.model_construction import (
+    construct_technology_block,
+    get_data_for_investment_period,
+    get_data_for_node,
+)
+from adopt_net0.data_preprocessing import (
+    copy_technology_data,
+    create_input_data_folder_template,
+    initialize_configuration_templates,
+    initialize_topology_templates,
+)
+
+NR_NODES = 100
+NR_TIMESTEPS = [24, 168, 672]
+TECHNOLOGIES = ["GasTurbine_simple", "Storage_Battery"]
+
+
+def create_case(data_path: Path):
+    """
+    Creates an input data folder with the same technologies at all nodes
+    """
+    topology = initialize_topology_templates()
+    topology["nodes"] = [f"node{idx}" for idx in range(NR_NODES)]
+    topology["carriers"] = ["electricity", "heat", "gas", "hydrogen"]
+    with open(data_path / "Topology.json", "w") as json_file:
+        json.dump(topology, json_file, indent=4)
+    config = initialize_configuration_templates()
+    config["reporting"]["save_path"]["value"] = str(data_path)
+    with open(data_path / "ConfigModel.json", "w") as json_file:
+        json.dump(config, json_file, indent=4)
+    create_input_data_folder_template(data_path)
+
+    for node in topology["nodes"]:
+        with open(
+            data_path / "period1" / "node_data" / node / "Technologies.json", "w"
+        ) as json_file:
+            json.dump({"existing": {}, "new": TECHNOLOGIES}, json_file, indent=4)
+    copy_technology_data(data_path)
+
+
+def construct(data_path: Path, nr_timesteps: int) -> dict:
+    """
+    Returns the runtime of constructing and cloning the technology blocks of all
+    nodes in s
+    """
+    pyhub = ModelHub()
+    pyhub.read_data(data_path, start_period=0, end_period=nr_timesteps)
+    data_period = get_data_for_investment_period(pyhub.data, "period1", "full")
+    data_nodes = {
+        node: get_data_for_node(data_period, node)
+        for node in pyhub.data.topology["nodes"]
+    }
+
+    runtime = {}
+    for tec in TECHNOLOGIES:
+        model = pyo.ConcreteModel()
+        model.set_t = pyo.RangeSet(1, nr_timesteps)
+
+        start = time.perf_counter()
+        model.constructed = pyo.Block(pyhub.data.topology["nodes"])
+        for node, data_node in data_nodes.items():
+            b_tec = model.constructed[node].tech_blocks = pyo.Block([tec])
+            construct_technology_block(b_tec[tec], data_node, model.set_t, model.set_t)
+        t_constructed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        template = model.constructed[pyhub.data.topology["nodes"][0]].tech_blocks[tec]
+        model.cloned = pyo.Block(pyhub.data.topology["nodes"])
+        for node in data_nodes:
+            model.cloned[node].transfer_attributes_from(template.clone())
+        t_cloned = time.perf_counter() - start
+
+        runtime[tec] = (t_constructed, t_cloned)
+    return runtime
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    print(f"{NR_NODES} blocks per technology")
+    print(
+        f"{'timesteps':>10} {'technology':>18} {'constructed [s]':>16} "
+        f"{'cloned [s]':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp)
+        create_case(data_path)
+        for nr_timesteps in NR_TIMESTEPS:
+            runtime = construct(data_path, nr_timesteps)
+            for tec, (t_constructed, t_cloned) in runtime.items():
+                print(
+                    f"{nr_timesteps:>10} {tec:>18} {t_constructed:>16.2f} "
+                    f"{t_cloned:>11.2f}"
+                )
@@ -0,0 +1,124 @@
+"""
+Benchmark of clustering time series to typical days and averaging time series
+
+Compares the aggregation engines tsam and internal for synthetic hourly data of one
+and three years with 50 and 300 time series. For clustering, the runtime and the
+root mean squared error between the original (normalized) time series and the time
+series reconstructed from the typical days are reported. For averaging, the runtime
+and the maximum deviation between both engines are reported.
+
+Usage: python benchmarks/benchmark_time_series_aggregation.py
+"""
+
+import time
+import numpy as np
+import pandas as pd
+import tsam.timeseriesaggregation as tsam
+
+from adopt_net0.data_management import average_time_series
+from adopt_net0.data_management.time_series_clustering import cluster_time_series
+
+NR_YEARS = [1, 3]
+NR_COLUMNS = [50, 300]
+NR_TYPICAL_DAYS = 20
+CLUSTER_METHODS = ["k_means", "hierarchical"]
+NR_TIMESTEPS_AVERAGED = 4
+
+
+def create_data(nr_years: int, nr_columns: int) -> pd.DataFrame:
+    """
+    Creates synthetic time series with daily and seasonal patterns and noise
+    """
+    rng = np.random.default_rng(0)
+    nr_timesteps = nr_years * 8760
+    hours = np.arange(nr_timesteps)[:, np.newaxis]
+    daily_shift = rng.uniform(0, 2 * np.pi, nr_columns)
+    seasonal_amplitude = rng.uniform(0, 1, nr_columns)
+    values = (
+        1.5
+        + np.sin(2 * np.pi * hours / 24 + daily_shift)
+        + seasonal_amplitude * np.cos(2 * np.pi * hours / 8760)
+        + 0.3 * rng.standard_normal((nr_timesteps, nr_columns))
+    )
+    columns = pd.MultiIndex.from_tuples(
+        [(f"node{idx % 10}", f"series{idx}") for idx in range(nr_columns)]
+    )
+    return pd.DataFrame(
+        values,
+        columns=columns,
+        index=pd.date_range("2022-01-01", periods=nr_timesteps, freq="1h"),
+    )
+
+
+def reconstruction_error(data: pd.DataFrame, result: dict) -> float:
+    """
+    Root mean squared error of the normalized time series reconstructed from the
+    typical days
+    """
+    typical_periods = result["typical_periods"][data.columns].to_numpy()
+    nr_typical_days = typical_periods.shape[0] // 24
+    reconstructed = typical_periods.reshape(nr_typical_days, 24, -1)[
+        np.asarray(result["cluster_order"])
+    ].reshape(data.shape)
+    values = data.to_numpy()
+    value_range = values.max(axis=0) - values.min(axis=0)
+    return np.sqrt((((reconstructed - values) / value_range) ** 2).mean())
+
+
+def average_tsam(data: pd.DataFrame, nr_periods: int) -> np.ndarray:
+    return (
+        tsam.TimeSeriesAggregation(
+            data,
+            noTypicalPeriods=nr_periods,
+            hoursPerPeriod=1,
+            noSegments=1,
+            resolution=1,
+            clusterMethod="averaging",
+        )
+        .createTypicalPeriods()[data.columns]
+        .to_numpy()
+    )
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    print(
+        f"{'years':>6} {'columns':>8} {'method':>13} {'tsam [s]':>9} "
+        f"{'internal [s]':>13} {'tsam RMSE':>10} {'internal RMSE':>14}"
+    )
+    for nr_years in NR_YEARS:
+        for nr_columns in NR_COLUMNS:
+            data = create_data(nr_years, nr_columns)
+            for cluster_method in CLUSTER_METHODS:
+                results = {}
+                for engine in ["tsam", "internal"]:
+                    results[engine] = timed(
+                        cluster_time_series,
+                        data,
+                        NR_TYPICAL_DAYS,
+                        24,
+                        engine,
+                        cluster_method,
+                    )
+                print(
+                    f"{nr_years:>6} {nr_columns:>8} {cluster_method:>13} "
+                    f"{results['tsam'][0]:>9.2f} {results['internal'][0]:>13.2f} "
+                    f"{reconstruction_error(data, results['tsam'][1]):>10.4f} "
+                    f"{reconstruction_error(data, results['internal'][1]):>14.4f}"
+                )
+
+            nr_periods = len(data) // NR_TIMESTEPS_AVERAGED
+            t_tsam, averaged_tsam = timed(average_tsam, data, nr_periods)
+            t_internal, averaged_internal = timed(
+                average_time_series, data.to_numpy(), nr_periods
+            )
+            print(
+                f"{nr_years:>6} {nr_columns:>8} {'averaging':>13} {t_tsam:>9.2f} "
+                f"{t_internal:>13.2f}   max. deviation: "
+                f"{np.abs(averaged_tsam - averaged_internal).max():.1e}"
+            )
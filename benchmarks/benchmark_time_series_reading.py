@@ -0,0 +1,133 @@
+"""
+Benchmark of reading the time series of an input data folder
+
+Compares the legacy reader (one pd.read_csv per file, conversion to dicts and
+replacement of NaN values in lists) with the threaded reader writing into a
+preallocated array. Synthetic input data folders with 10, 50 and 200 nodes are
+created in a temporary directory.
+
+Usage: python benchmarks/benchmark_time_series_reading.py
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from adopt_net0.data_management.time_series_reader import read_time_series_files
+
+NR_NODES = [10, 50, 200]
+CARRIERS = ["electricity", "heat", "gas", "hydrogen"]
+NR_TIMESTEPS = 8760
+INVESTMENT_PERIODS = ["period1"]
+
+
+def create_case(data_path: Path, nr_nodes: int) -> list:
+    """
+    Creates synthetic time series files and returns the file list
+    """
+    rng = np.random.default_rng(0)
+    time_index = pd.date_range("2022-01-01 00:00", periods=NR_TIMESTEPS, freq="1h")
+    climate_columns = [
+        "ghi",
+        "dni",
+        "dhi",
+        "temp_air",
+        "rh",
+        "ws10",
+        "TECHNOLOGYNAME_hydro_inflow",
+    ]
+    carrier_columns = [
+        "Demand",
+        "Import limit",
+        "Export limit",
+        "Import price",
+        "Export price",
+        "Import emission factor",
+        "Export emission factor",
+        "Generic production",
+    ]
+
+    def write(path, columns):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        values = rng.random((NR_TIMESTEPS, len(columns)))
+        values[rng.random(values.shape) < 0.01] = np.nan
+        pd.DataFrame(values, index=time_index, columns=columns).to_csv(path, sep=";")
+
+    files = []
+    for investment_period in INVESTMENT_PERIODS:
+        for node_idx in range(nr_nodes):
+            node = f"node{node_idx}"
+            node_path = Path(investment_period) / "node_data" / node
+            write(data_path / node_path / "CarbonCost.csv", ["price", "subsidy"])
+            files.append(
+                (
+                    (investment_period, node, "CarbonCost", "global"),
+                    node_path / "CarbonCost.csv",
+                )
+            )
+            write(data_path / node_path / "ClimateData.csv", climate_columns)
+            files.append(
+                (
+                    (investment_period, node, "ClimateData", "global"),
+                    node_path / "ClimateData.csv",
+                )
+            )
+            for carrier in CARRIERS:
+                rel_path = node_path / "carrier_data" / (carrier + ".csv")
+                write(data_path / rel_path, carrier_columns)
+                files.append(
+                    ((investment_period, node, "CarrierData", carrier), rel_path)
+                )
+    return files
+
+
+def read_legacy(data_path: Path, files: list) -> pd.DataFrame:
+    """
+    Reads time series as done before the threaded reader was introduced
+    """
+    data = {}
+    for prefix, rel_path in files:
+        file_data = pd.read_csv(data_path / rel_path, sep=";", index_col=0).to_dict(
+            orient="list"
+        )
+        for key in file_data.keys():
+            ls = file_data[key]
+            if any(np.isnan(x) for x in ls):
+                ls = [0 if np.isnan(x) else x for x in ls]
+            data[prefix + (key,)] = ls
+    return pd.DataFrame(data)
+
+
+def read_new(data_path: Path, files: list, nr_workers: int) -> pd.DataFrame:
+    values, columns, _ = read_time_series_files(data_path, files, nr_workers)
+    return pd.DataFrame(values, columns=pd.MultiIndex.from_tuples(columns), copy=False)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    nr_cpus = os.cpu_count() or 1
+    print(
+        f"{'nodes':>6} {'files':>6} {'legacy [s]':>11} {'1 worker [s]':>13} {f'{nr_cpus} workers [s]':>15}"
+    )
+    for nr_nodes in NR_NODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp)
+            files = create_case(data_path, nr_nodes)
+            t_legacy, df_legacy = timed(read_legacy, data_path, files)
+            t_serial, df_serial = timed(read_new, data_path, files, 1)
+            t_parallel, df_parallel = timed(read_new, data_path, files, nr_cpus)
+            pd.testing.assert_frame_equal(df_legacy, df_serial, check_column_type=False)
+            pd.testing.assert_frame_equal(
+                df_legacy, df_parallel, check_column_type=False
+            )
+            print(
+                f"{nr_nodes:>6} {len(files):>6} {t_legacy:>11.2f} {t_serial:>13.2f} {t_parallel:>15.2f}"
+            )
@@ -14,6 +14,7 @@ from adopt_net0.model_construction.construct_balances import (
     construct_nodal_energybalance,
     construct_network_constraints,
     construct_system_cost,
+    get_carrier_technology_index,
 )
 from adopt_net0.data_management import DataHandle
 
@@ -109,6 +110,35 @@ def test_model_nodal_energy_balance():
     assert m.periods[period].node_blocks[node].var_import_flow[1, carrier].value == 1
 
 
+def test_carrier_technology_index():
+    """
+    Tests that the energy balances are only constructed for the carriers of each node
+    """
+    nr_timesteps = 2
+
+    dh = make_data_handle(nr_timesteps)
+    config = {
+        "energybalance": {"violation": {"value": 0}},
+        "optimization": {"typicaldays": {"N": {"value": 0}}},
+    }
+    period = dh.topology["investment_periods"][0]
+
+    m = construct_model(dh)
+    index = get_carrier_technology_index(m.periods[period], m.set_nodes)
+    for node in dh.topology["nodes"]:
+        assert set(index[node]) == set(m.periods[period].node_blocks[node].set_carriers)
+        assert all(index[node][car] == ([], []) for car in index[node])
+
+    m = construct_network_constraints(m, config)
+    m = construct_nodal_energybalance(m, config)
+    assert set(m.block_energybalance[period].const_energybalance) == {
+        (t, car, node)
+        for t in range(1, nr_timesteps + 1)
+        for node in index
+        for car in index[node]
+    }
+
+
 def test_model_global_energy_balance():
     """
     Tests the energybalance on a global level
@@ -1,9 +1,14 @@
+import gc
+import shutil
+import weakref
 from pathlib import Path
 from warnings import warn
 
+import pandas as pd
 from pyomo.opt import TerminationCondition
 
 from adopt_net0.modelhub import ModelHub
+from adopt_net0.model_construction import get_model_size
 
 
 def test_full_model_flow(request):
@@ -147,6 +152,87 @@ def test_clustering_algo(request):
             ) <= tol
 
 
+def test_clustering_segmentation(request):
+    """
+    Tests method 1 and two of the clustering algorithm with segmented typical days
+    """
+
+    path = Path("tests/case_study_full_pipeline")
+
+    pyhub = ModelHub()
+    pyhub.read_data(path, start_period=0, end_period=2 * 24)
+    pyhub.construct_model()
+    pyhub.construct_balances()
+    pyhub.data.model_config["solveroptions"]["solver"]["value"] = request.config.solver
+    pyhub.solve()
+
+    m = pyhub.model["full"]
+    npv_no_cluster = m.var_npv.value
+
+    methods = [1, 2]
+    pyhub = ModelHub()
+    pyhub.data.set_settings(path)
+    pyhub.data._read_topology()
+    pyhub.data._read_model_config()
+    for method in methods:
+        pyhub.data.model_config["optimization"]["typicaldays"]["N"]["value"] = 2
+        pyhub.data.model_config["optimization"]["typicaldays"]["nr_segments"][
+            "value"
+        ] = 8
+        pyhub.data.model_config["optimization"]["typicaldays"]["method"][
+            "value"
+        ] = method
+        pyhub.data._read_time_series()
+        pyhub.data._read_node_locations()
+        pyhub.data._read_energybalance_options()
+        pyhub.data._read_technology_data()
+        pyhub.data._read_network_data()
+        pyhub.data._cluster_data()
+
+        assert len(pyhub.data.topology["time_index"]["clustered"]) == 2 * 8
+
+        pyhub.quick_solve()
+
+        assert (
+            abs(npv_no_cluster - pyhub.model["clustered"].var_npv.value)
+            / npv_no_cluster
+        ) <= 0.05
+
+
+def test_clustering_duplicate_days(request):
+    """
+    Tests that the number of typical days is reduced if there are fewer distinct
+    days than typical days
+    """
+    path = Path("tests/case_study_full_pipeline")
+
+    pyhub = ModelHub()
+    pyhub.data.set_settings(path, start_period=0, end_period=2 * 24)
+    pyhub.data._read_topology()
+    pyhub.data._read_model_config()
+    pyhub.data.model_config["optimization"]["typicaldays"]["N"]["value"] = 2
+    pyhub.data.model_config["data_management"]["aggregation_engine"][
+        "value"
+    ] = "internal"
+    pyhub.data._read_time_series()
+    time_series = pyhub.data.time_series["full"]["period1"]
+    time_series.iloc[24:] = time_series.iloc[:24].to_numpy()
+    pyhub.data._read_node_locations()
+    pyhub.data._read_energybalance_options()
+    pyhub.data._read_technology_data()
+    pyhub.data._read_network_data()
+    pyhub.data._cluster_data()
+
+    assert pyhub.data.nr_typical_days == 1
+    assert len(pyhub.data.topology["time_index"]["clustered"]) == 24
+    assert len(pyhub.data.time_series["clustered"]["period1"]) == 24
+
+    pyhub.data.model_config["solveroptions"]["solver"]["value"] = request.config.solver
+    pyhub.quick_solve()
+    termination = pyhub.solution.solver.termination_condition
+    assert termination == TerminationCondition.optimal
+
+
 def test_average_algo(request):
     """
     Tests two stage averaging algorithm
@@ -262,3 +348,193 @@ def test_scaling(request):
     pyhub.construct_balances()
     pyhub.data.model_config["scaling"]["scaling_on"]["value"] = 1
     pyhub.solve()
+
+
+def test_lazy_loading(request):
+    """
+    Tests lazy loading of investment periods:
+    - no investment period is read before constructing the model
+    - results equal the results of reading all data at once
+    - time series are released after constructing the investment period
+    """
+    path = Path("tests/case_study_full_pipeline")
+
+    pyhub = ModelHub()
+    pyhub.read_data(path, start_period=0, end_period=24)
+    pyhub.data.model_config["solveroptions"]["solver"]["value"] = request.config.solver
+    pyhub.quick_solve()
+    npv_eager = pyhub.model["full"].var_npv.value
+
+    pyhub = ModelHub()
+    pyhub.data.set_settings(path, start_period=0, end_period=24)
+    pyhub.data._read_topology()
+    pyhub.data._read_model_config()
+    pyhub.data.model_config["data_management"]["lazy_loading"]["value"] = 1
+    pyhub.data.model_config["solveroptions"]["solver"]["value"] = request.config.solver
+    pyhub.data._read_node_locations()
+    pyhub.data._initialize_lazy_loading()
+    assert "period1" not in pyhub.data.technology_data
+    assert "period1" not in pyhub.data.time_series["full"]
+
+    time_series = weakref.ref(pyhub.data.time_series["full"]["period1"])
+    assert "period1" in pyhub.data.technology_data
+    pyhub.quick_solve()
+    gc.collect()
+
+    assert time_series() is None
+    assert "period1" not in pyhub.data.time_series["full"]
+    assert "period1" in pyhub.data.technology_data
+    assert abs(pyhub.model["full"].var_npv.value - npv_eager) <= 1e-6 * abs(npv_eager)
+
+
+def test_add_technology_lazy_loading(request):
+    """
+    Tests adding a technology to a constructed model after the data of its
+    investment period has been released
+    """
+    path = Path("tests/case_study_full_pipeline")
+
+    pyhub = ModelHub()
+    pyhub.data.set_settings(path, start_period=0, end_period=24)
+    pyhub.data._read_topology()
+    pyhub.data._read_model_config()
+    pyhub.data.model_config["data_management"]["lazy_loading"]["value"] = 1
+    pyhub.data.model_config["solveroptions"]["solver"]["value"] = request.config.solver
+    pyhub.data._read_node_locations()
+    pyhub.data._initialize_lazy_loading()
+    pyhub.quick_solve()
+    assert "period1" in pyhub.data.time_series["full"].released
+
+    climate_data = pyhub.data.get_climate_data("period1", "node1")
+    assert len(climate_data) == 24
+    assert "temp_air" in climate_data.columns
+
+    pyhub.add_technology("period1", "node1", ["TestTec_GasTurbine_simple"])
+    b_node = pyhub.model["full"].periods["period1"].node_blocks["node1"]
+    assert "TestTec_GasTurbine_simple" in b_node.set_technologies
+    assert "TestTec_GasTurbine_simple" in pyhub.data.technology_data["period1"]["node1"]
+
+    pyhub.construct_balances()
+    pyhub.solve()
+    termination = pyhub.solution.solver.termination_condition
+    assert termination == TerminationCondition.optimal
+
+
+def test_refresh_data(request):
+    """
+    Tests refreshing the data of a constructed model:
+    - the changed investment period is constructed again
+    - results equal the results of reading the changed data from scratch
+    """
+    path = request.config.data_folder_path / "refresh_model_case"
+    shutil.copytree(Path("tests/case_study_full_pipeline"), path)
+
+    pyhub = ModelHub()
+    pyhub.read_data(path, start_period=0, end_period=24)
+    pyhub.data.model_config["solveroptions"]["solver"]["value"] = request.config.solver
+    pyhub.quick_solve()
+    npv_initial = pyhub.model["full"].var_npv.value
+
+    carrier_file = (
+        path / "period1" / "node_data" / "node2" / "carrier_data" / "heat.csv"
+    )
+    carrier_data = pd.read_csv(carrier_file, sep=";", index_col=0)
+    carrier_data["Demand"] = carrier_data["Demand"] * 2
+    carrier_data.to_csv(carrier_file, sep=";")
+
+    changes = pyhub.refresh_data()
+    assert changes["investment_periods"] == ["period1"]
+    pyhub.construct_balances()
+    pyhub.solve()
+    npv_refreshed = pyhub.model["full"].var_npv.value
+
+    pyhub = ModelHub()
+    pyhub.read_data(path, start_period=0, end_period=24)
+    pyhub.data.model_config["solveroptions"]["solver"]["value"] = request.config.solver
+    pyhub.quick_solve()
+    npv = pyhub.model["full"].var_npv.value
+    assert abs(npv_refreshed - npv) <= 1e-6 * abs(npv)
+    assert abs(npv_refreshed - npv_initial) > 1e-6 * abs(npv_initial)
+
+
+def test_deferred_gdp_transformation(request):
+    """
+    Tests that transforming all disjunctions in one pass after constructing the
+    balances gives the same results as transforming each block
+    """
+    path = Path("tests/case_study_full_pipeline")
+
+    npv = {}
+    for deferred in [0, 1]:
+        pyhub = ModelHub()
+        pyhub.read_data(path, start_period=0, end_period=24)
+        config = pyhub.data.model_config
+        config["solveroptions"]["solver"]["value"] = request.config.solver
+        config["performance"]["deferred_gdp_transformation"]["value"] = deferred
+        pyhub.quick_solve()
+        npv[deferred] = pyhub.model["full"].var_npv.value
+
+        arc = (
+            pyhub.model["full"]
+            .periods["period1"]
+            .network_block["electricitySimple"]
+            .arc_block["node1", "node2"]
+        )
+        assert arc.find_component("_pyomo_gdp_bigm_reformulation") is not None
+
+    assert abs(npv[1] - npv[0]) <= 1e-6 * abs(npv[0])
+
+
+def test_construction_profiler(request):
+    """
+    Tests profiling the model construction:
+    - all investment periods, networks, arcs, nodes, technologies and balances are
+      recorded
+    - the size of a technology equals the size of its block
+    - the profile is written to the result folder
+    """
+    path = Path("tests/case_study_full_pipeline")
+
+    pyhub = ModelHub()
+    pyhub.read_data(path, start_period=0, end_period=24)
+    config = pyhub.data.model_config
+    config["solveroptions"]["solver"]["value"] = request.config.solver
+    config["reporting"]["save_path"]["value"] = str(request.config.result_folder_path)
+    config["reporting"]["profile_construction"]["value"] = 1
+    pyhub.quick_solve()
+
+    report = pyhub.construction_profiler.get_report()
+    for name, component_type in [
+        ("period1", "investment_period"),
+        ("period1/electricitySimple", "network"),
+        ("period1/electricitySimple/node1-node2", "arc"),
+        ("period1/node2", "node"),
+        ("period1/node2/TestTec_BoilerEl", "technology"),
+        ("nodal_energybalance", "balance"),
+        ("system_cost", "balance"),
+    ]:
+        assert report.loc[name, "component_type"] == component_type
+        assert report.loc[name, "wall_time"] > 0
+        assert report.loc[name, "constraints"] > 0
+        assert report.loc[name, "nonzeros"] >= report.loc[name, "constraints"]
+
+    b_tec = pyhub.model["full"].periods["period1"].node_blocks["node2"]
+    b_tec = b_tec.tech_blocks_active["TestTec_BoilerEl"]
+    size = get_model_size([b_tec])
+    for column in ["variables", "constraints", "binaries", "nonzeros"]:
+        assert report.loc["period1/node2/TestTec_BoilerEl", column] == size[column]
+    assert (
+        report.loc["period1/node2", "variables"]
+        >= report.loc["period1/node2/TestTec_BoilerEl", "variables"]
+    )
+
+    largest = pyhub.construction_profiler.get_largest_components(3)
+    assert len(largest) == 3
+    assert "period1" not in largest.index
+
+    result_folder_path = pyhub.last_solve_info["result_folder_path"]
+    assert (result_folder_path / "construction_profile.json").exists()
+    profile = pd.read_csv(
+        result_folder_path / "construction_profile.csv", sep=";", index_col=0
+    )
+    assert profile.index.to_list() == report.index.to_list()
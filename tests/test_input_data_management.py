@@ -1,6 +1,31 @@
+import json
 import pytest
+import shutil
+import numpy as np
+import pandas as pd
 
-from adopt_net0.data_management import DataHandle
+import tsam.timeseriesaggregation as tsam
+
+from adopt_net0.data_management import (
+    DataHandle,
+    average_time_series,
+    cluster_investment_periods,
+    export_case_bundle,
+    import_case_bundle,
+)
+from adopt_net0.components.technologies.genericTechnologies.res import Res
+from adopt_net0.data_management import technology_fit_cache
+from adopt_net0.modelhub import ModelHub
+from adopt_net0.data_management.time_series_clustering import (
+    cluster_time_series,
+    evaluate_nr_typical_days,
+    get_typical_day_sequence,
+    select_nr_typical_days,
+)
+from adopt_net0.model_construction import (
+    get_data_for_investment_period,
+    get_data_for_node,
+)
 
 
 @pytest.mark.data_management
@@ -15,6 +40,52 @@ def test_data_handle_reading(request):
     dh.set_settings(case_study_folder_path)
 
 
+@pytest.mark.data_management
+def test_data_handle_time_series_cache(request):
+    """
+    Tests caching of time series:
+    - data read in parallel equals data read serially
+    - cached data equals data read from csv files
+    - changed files are re-read from the input data folder
+    """
+    data_path = request.config.data_folder_path / "cache_case"
+    shutil.copytree(
+        request.config.root_folder_path / "tests/case_study_full_pipeline", data_path
+    )
+
+    def read_time_series(cache, nr_workers=1):
+        dh = DataHandle()
+        dh.set_settings(data_path)
+        dh._read_topology()
+        dh._read_model_config()
+        dh.model_config["data_management"]["cache_time_series"]["value"] = cache
+        dh.model_config["data_management"]["nr_workers"]["value"] = nr_workers
+        dh._read_time_series()
+        return dh.time_series["full"]
+
+    ts_csv = read_time_series(0)
+    pd.testing.assert_frame_equal(ts_csv, read_time_series(0, nr_workers=2))
+    ts_cache_cold = read_time_series(1)
+    assert (data_path / ".cache" / "time_series" / "index.json").exists()
+    ts_cache_warm = read_time_series(1)
+    pd.testing.assert_frame_equal(ts_csv, ts_cache_cold)
+    pd.testing.assert_frame_equal(ts_csv, ts_cache_warm)
+
+    # Change one file
+    carrier_file = (
+        data_path / "period1" / "node_data" / "node1" / "carrier_data" / "gas.csv"
+    )
+    carrier_data = pd.read_csv(carrier_file, sep=";", index_col=0)
+    carrier_data["Demand"] = 5
+    carrier_data.to_csv(carrier_file, sep=";")
+
+    ts_cache_changed = read_time_series(1)
+    assert (
+        ts_cache_changed["period1"]["node1"]["CarrierData"]["gas"]["Demand"] == 5
+    ).all()
+    pd.testing.assert_frame_equal(ts_cache_changed, read_time_series(0))
+
+
 #
 # @pytest.mark.data_management
 # def test_data_handle_clustering(request):
@@ -44,3 +115,726 @@ def test_data_handle_reading(request):
 #     dh.read_input_data(case_study_folder_path)
 #     dh.model_config["optimization"]["timestaging"]["value"] = 2
 #     dh._average_data()
+
+
+@pytest.mark.data_management
+def test_data_handle_parallel_technology_fitting(request):
+    """
+    Tests that technologies fitted in parallel equal technologies fitted serially
+    """
+    data_path = request.config.root_folder_path / "tests/case_study_full_pipeline"
+
+    def read_technology_data(nr_workers):
+        dh = DataHandle()
+        dh.set_settings(data_path)
+        dh._read_topology()
+        dh._read_model_config()
+        dh.model_config["data_management"]["nr_workers"]["value"] = nr_workers
+        dh._read_time_series()
+        dh._read_node_locations()
+        dh._read_technology_data()
+        return dh.technology_data
+
+    tec_serial = read_technology_data(1)
+    tec_parallel = read_technology_data(2)
+
+    for investment_period in tec_serial:
+        for node in tec_serial[investment_period]:
+            assert list(tec_serial[investment_period][node]) == list(
+                tec_parallel[investment_period][node]
+            )
+            for tec in tec_serial[investment_period][node]:
+                coeff_serial = tec_serial[investment_period][node][tec].processed_coeff
+                coeff_parallel = tec_parallel[investment_period][node][
+                    tec
+                ].processed_coeff
+                assert (
+                    coeff_serial.time_independent.keys()
+                    == coeff_parallel.time_independent.keys()
+                )
+                for par in coeff_serial.time_dependent_full:
+                    np.testing.assert_array_equal(
+                        coeff_serial.time_dependent_full[par],
+                        coeff_parallel.time_dependent_full[par],
+                    )
+
+
+@pytest.mark.data_management
+def test_data_handle_technology_fit_cache(request, monkeypatch):
+    """
+    Tests caching of fitted technologies:
+    - second read is served from the cache
+    - cached technologies equal fitted technologies
+    - fits of another version of adopt_net0 or pvlib (renewables) are not used
+    - cache is kept within its size limit
+    """
+    data_path = request.config.data_folder_path / "tec_cache_case"
+    shutil.copytree(
+        request.config.root_folder_path / "tests/case_study_full_pipeline", data_path
+    )
+
+    def read_technology_data(size_limit=1000):
+        dh = DataHandle()
+        dh.set_settings(data_path)
+        dh._read_topology()
+        dh._read_model_config()
+        dh.model_config["data_management"]["cache_technology_fits"]["value"] = 1
+        dh.model_config["data_management"]["cache_size_limit"]["value"] = size_limit
+        dh._read_time_series()
+        dh._read_node_locations()
+        dh._read_technology_data()
+        return dh
+
+    dh_fitted = read_technology_data()
+    nr_technologies = sum(
+        len(dh_fitted.technology_data["period1"][node])
+        for node in dh_fitted.technology_data["period1"]
+    )
+    assert dh_fitted.technology_fit_cache.misses == nr_technologies
+
+    dh_cached = read_technology_data()
+    assert dh_cached.technology_fit_cache.hits == nr_technologies
+    assert dh_cached.technology_fit_cache.misses == 0
+    for node in dh_fitted.technology_data["period1"]:
+        for tec, tec_fitted in dh_fitted.technology_data["period1"][node].items():
+            tec_cached = dh_cached.technology_data["period1"][node][tec]
+            assert (
+                tec_fitted.processed_coeff.time_independent
+                == tec_cached.processed_coeff.time_independent
+            )
+            for par in tec_fitted.processed_coeff.time_dependent_full:
+                np.testing.assert_array_equal(
+                    tec_fitted.processed_coeff.time_dependent_full[par],
+                    tec_cached.processed_coeff.time_dependent_full[par],
+                )
+
+    with monkeypatch.context() as patch:
+        patch.setattr(technology_fit_cache, "get_code_version", lambda: "0.0.0")
+        dh_other_version = read_technology_data()
+    assert dh_other_version.technology_fit_cache.misses == nr_technologies
+
+    nr_res = sum(
+        isinstance(tec, Res)
+        for node in dh_fitted.technology_data["period1"]
+        for tec in dh_fitted.technology_data["period1"][node].values()
+    )
+    assert nr_res
+    with monkeypatch.context() as patch:
+        patch.setattr(technology_fit_cache, "version", lambda name: "0.0.0")
+        dh_other_pvlib = read_technology_data()
+    assert dh_other_pvlib.technology_fit_cache.misses == nr_res
+
+    read_technology_data(size_limit=0)
+    cache_path = data_path / ".cache" / "technology_fits"
+    assert not list(cache_path.glob("*.pkl"))
+
+
+@pytest.mark.data_management
+def test_data_handle_technology_deduplication(request):
+    """
+    Tests that identical technologies at different nodes are fitted once and share
+    their fitted coefficients, also after collecting them in the full resolution
+    matrix and aggregating them
+    """
+    data_path = request.config.data_folder_path / "dedup_case"
+    shutil.copytree(
+        request.config.root_folder_path / "tests/case_study_full_pipeline", data_path
+    )
+    node_path = data_path / "period1" / "node_data"
+    shutil.copy(node_path / "node1" / "ClimateData.csv", node_path / "node2")
+    shutil.copy(node_path / "node1" / "Technologies.json", node_path / "node2")
+    shutil.copytree(
+        node_path / "node1" / "technology_data",
+        node_path / "node2" / "technology_data",
+        dirs_exist_ok=True,
+    )
+
+    dh = DataHandle()
+    dh.set_settings(data_path)
+    dh._read_topology()
+    dh._read_model_config()
+    dh._read_time_series()
+    dh._read_node_locations()
+    dh._read_technology_data()
+
+    def assert_shared_coefficients(aggregation_model):
+        nr_shared = 0
+        for tec in dh.technology_data["period1"]["node1"]:
+            tec_node1 = dh.technology_data["period1"]["node1"][tec]
+            tec_node2 = dh.technology_data["period1"]["node2"][tec]
+            assert tec_node1 is not tec_node2
+            assert tec_node1.processed_coeff is not tec_node2.processed_coeff
+            coeff_node1 = getattr(tec_node1.processed_coeff, aggregation_model)
+            coeff_node2 = getattr(tec_node2.processed_coeff, aggregation_model)
+            for par in coeff_node1:
+                assert np.shares_memory(coeff_node1[par], coeff_node2[par])
+                nr_shared += 1
+        assert nr_shared
+
+    assert_shared_coefficients("time_dependent_full")
+
+    matrix = dh._get_full_res_matrix("period1")
+    assert_shared_coefficients("time_dependent_full")
+    tec_columns = matrix.columns[matrix.nr_time_series :]
+    assert set(tec_columns.get_level_values("Node")) == {"node1"}
+
+    dh.model_config["optimization"]["typicaldays"]["N"]["value"] = 2
+    dh._cluster_data()
+    assert_shared_coefficients("time_dependent_full")
+    assert_shared_coefficients("time_dependent_clustered")
+
+
+@pytest.mark.data_management
+def test_data_handle_clustering_cache(request):
+    """
+    Tests caching and parallel clustering of typical days:
+    - second clustering is served from the cache
+    - cached results equal clustered results
+    - investment periods can be clustered in parallel
+    """
+    data_path = request.config.data_folder_path / "clustering_cache_case"
+    shutil.copytree(
+        request.config.root_folder_path / "tests/case_study_full_pipeline", data_path
+    )
+
+    def cluster_data():
+        dh = DataHandle()
+        dh.set_settings(data_path)
+        dh._read_topology()
+        dh._read_model_config()
+        dh.model_config["data_management"]["cache_clustering"]["value"] = 1
+        dh.model_config["optimization"]["typicaldays"]["N"]["value"] = 2
+        dh._read_time_series()
+        dh._read_node_locations()
+        dh._read_technology_data()
+        dh._cluster_data()
+        return dh
+
+    dh_clustered = cluster_data()
+    assert dh_clustered.clustering_cache.misses == 1
+    dh_cached = cluster_data()
+    assert dh_cached.clustering_cache.hits == 1
+    assert dh_cached.clustering_cache.misses == 0
+    for spec in ["sequence", "factors"]:
+        np.testing.assert_array_equal(
+            dh_clustered.k_means_specs["period1"][spec],
+            dh_cached.k_means_specs["period1"][spec],
+        )
+    pd.testing.assert_frame_equal(
+        dh_clustered.time_series["clustered"], dh_cached.time_series["clustered"]
+    )
+
+    # Parallel clustering
+    full_res_data = dh_cached._collect_full_res_data("period1")
+    results = cluster_investment_periods(
+        {"period1": full_res_data, "period2": full_res_data}, 2, 24, nr_workers=2
+    )
+    for result in results.values():
+        assert result["typical_periods"].shape == (48, full_res_data.shape[1])
+        assert sum(result["cluster_no_occ"].values()) == 2
+
+
+@pytest.mark.data_management
+def test_typical_day_sequence():
+    """
+    Tests sequence and factors of clustered timesteps
+    """
+    hours_per_day = 3
+    typical_day_of_row = np.repeat([0, 1], hours_per_day)
+    cluster_order = np.array([1, 0, 1, 1])
+    cluster_no_occ = {0: 1, 1: 3}
+
+    sequence, factors = get_typical_day_sequence(
+        typical_day_of_row, cluster_order, cluster_no_occ
+    )
+
+    np.testing.assert_array_equal(sequence, [4, 5, 6, 1, 2, 3, 4, 5, 6, 4, 5, 6])
+    np.testing.assert_array_equal(factors, [1, 1, 1, 3, 3, 3])
+
+    # Segmented typical days
+    typical_day_of_row = np.repeat([0, 1], 2)
+    segment_durations = np.array([1, 2, 2, 1])
+
+    sequence, factors = get_typical_day_sequence(
+        typical_day_of_row, cluster_order, cluster_no_occ, segment_durations
+    )
+
+    np.testing.assert_array_equal(sequence, [3, 3, 4, 1, 2, 2, 3, 3, 4, 3, 3, 4])
+    np.testing.assert_array_equal(factors, [1, 2, 6, 3])
+
+
+@pytest.mark.data_management
+def test_internal_aggregation_engine():
+    """
+    Tests the internal aggregation engine:
+    - averaging equals averaging with tsam
+    - clustering returns typical days in the structure of tsam
+    - clustering is deterministic and preserves the mean of each time series
+    """
+    rng = np.random.default_rng(0)
+    nr_days = 30
+    hours = np.arange(nr_days * 24)
+    columns = pd.MultiIndex.from_product([["node1", "node2"], ["Demand", "Import"]])
+    data = pd.DataFrame(
+        np.column_stack(
+            [
+                np.sin(2 * np.pi * hours / 24 + shift) + rng.random(len(hours))
+                for shift in range(len(columns))
+            ]
+        ),
+        columns=columns,
+        index=pd.date_range("2022-01-01", periods=len(hours), freq="h"),
+    )
+
+    # Averaging
+    for nr_periods in [len(hours) // 4, len(hours) // 7]:
+        averaged_tsam = tsam.TimeSeriesAggregation(
+            data,
+            noTypicalPeriods=nr_periods,
+            hoursPerPeriod=1,
+            noSegments=1,
+            resolution=1,
+            clusterMethod="averaging",
+        ).createTypicalPeriods()
+        np.testing.assert_allclose(
+            average_time_series(data.to_numpy(), nr_periods),
+            averaged_tsam[columns].to_numpy(),
+        )
+
+    # Clustering
+    for cluster_method in ["k_means", "k_medoids", "hierarchical"]:
+        result = cluster_time_series(
+            data, 4, 24, "internal", cluster_method, {"Demand": 2}
+        )
+        typical_periods = result["typical_periods"]
+        assert typical_periods.shape == (4 * 24, len(columns))
+        assert list(typical_periods.index.get_level_values(0).unique()) == [0, 1, 2, 3]
+        assert len(result["cluster_order"]) == nr_days
+        assert sum(result["cluster_no_occ"].values()) == nr_days
+        reconstructed = typical_periods.to_numpy().reshape(4, 24, -1)[
+            result["cluster_order"]
+        ]
+        np.testing.assert_allclose(
+            reconstructed.reshape(len(hours), -1).mean(axis=0),
+            data.to_numpy().mean(axis=0),
+            rtol=1e-4,
+        )
+        result_repeated = cluster_time_series(
+            data, 4, 24, "internal", cluster_method, {"Demand": 2}
+        )
+        pd.testing.assert_frame_equal(
+            typical_periods, result_repeated["typical_periods"]
+        )
+
+    # Fewer distinct days than typical days
+    duplicate_days = pd.DataFrame(
+        np.tile(data.to_numpy()[: 2 * 24].reshape(2, 24, -1), (5, 1, 1)).reshape(
+            10 * 24, -1
+        ),
+        columns=columns,
+        index=pd.date_range("2022-01-01", periods=10 * 24, freq="h"),
+    )
+    for cluster_method in ["k_means", "k_medoids", "hierarchical"]:
+        result = cluster_time_series(duplicate_days, 4, 24, "internal", cluster_method)
+        assert result["typical_periods"].shape == (2 * 24, len(columns))
+        assert list(result["cluster_order"]) == [0, 1] * 5
+        assert result["cluster_no_occ"] == {0: 5, 1: 5}
+
+
+@pytest.mark.data_management
+@pytest.mark.parametrize("engine", ["tsam", "internal"])
+def test_segmentation(engine):
+    """
+    Tests intra-day segmentation of typical days:
+    - each typical day has the given number of segments covering the full day
+    - the sum of each time series is preserved by sequence and factors
+    """
+    rng = np.random.default_rng(0)
+    nr_days = 20
+    hours = np.arange(nr_days * 24)
+    columns = pd.MultiIndex.from_product([["node1"], ["Demand", "Import"]])
+    data = pd.DataFrame(
+        np.column_stack(
+            [np.sin(2 * np.pi * hours / 24) + 2, rng.random(len(hours)) + 1]
+        ),
+        columns=columns,
+        index=pd.date_range("2022-01-01", periods=len(hours), freq="h"),
+    )
+
+    result = cluster_time_series(data, 3, 24, engine, nr_segments=6)
+    typical_periods = result["typical_periods"]
+    assert typical_periods.shape == (3 * 6, len(columns))
+    durations = result["segment_durations"]
+    np.testing.assert_array_equal(durations.reshape(3, 6).sum(axis=1), 24)
+
+    sequence, factors = get_typical_day_sequence(
+        typical_periods.index.get_level_values(0).to_numpy(),
+        result["cluster_order"],
+        result["cluster_no_occ"],
+        durations,
+    )
+    assert len(sequence) == len(hours)
+    assert factors.sum() == len(hours)
+    np.testing.assert_allclose(
+        typical_periods.to_numpy()[sequence - 1].sum(axis=0),
+        (typical_periods.to_numpy() * factors[:, np.newaxis]).sum(axis=0),
+    )
+    np.testing.assert_allclose(
+        (typical_periods.to_numpy() * factors[:, np.newaxis]).sum(axis=0),
+        data.to_numpy().sum(axis=0),
+        rtol=1e-2,
+    )
+
+
+@pytest.mark.data_management
+def test_select_nr_typical_days():
+    """
+    Tests the evaluation of numbers of typical days:
+    - errors are reported for each investment period, number of typical days,
+      metric and column
+    - the smallest number of typical days below the threshold is selected
+    """
+    rng = np.random.default_rng(0)
+    day_types = rng.random((3, 24, 2))
+    days = day_types[rng.permutation(np.arange(30) % 3)]
+    columns = pd.MultiIndex.from_product([["node1"], ["Demand", "Import"]])
+    data = pd.DataFrame(
+        days.reshape(-1, 2) + 0.001 * rng.random((30 * 24, 2)),
+        columns=columns,
+        index=pd.date_range("2022-01-01", periods=30 * 24, freq="h"),
+    )
+
+    errors = evaluate_nr_typical_days(
+        {"period1": data}, [1, 2, 3, 4], 24, nr_workers=2, engine="internal"
+    )
+    assert errors.shape == (4 * 3, 2)
+    assert list(errors.index.names) == ["InvestmentPeriod", "NrTypicalDays", "Metric"]
+    rmse = errors.xs("rmse", level="Metric").mean(axis=1)
+    assert rmse[("period1", 3)] < 0.01 < rmse[("period1", 2)]
+    assert select_nr_typical_days(errors, "rmse", 0.01) == 3
+    assert select_nr_typical_days(errors, "rmse", 0) == 4
+
+
+@pytest.mark.data_management
+def test_data_handle_auto_typical_days(request):
+    """
+    Tests automatic selection of the number of typical days with a data handle:
+    - number of typical days is selected, the model configuration keeps 'auto'
+    - report is not written when reading data, but to the result folder when
+      solving
+    """
+    data_path = request.config.data_folder_path / "auto_typical_days_case"
+    shutil.copytree(
+        request.config.root_folder_path / "tests/case_study_full_pipeline", data_path
+    )
+
+    pyhub = ModelHub()
+    dh = pyhub.data
+    dh.set_settings(data_path, start_period=0, end_period=3 * 24)
+    dh._read_topology()
+    dh._read_model_config()
+    dh.model_config["optimization"]["typicaldays"]["N"]["value"] = "auto"
+    dh.model_config["optimization"]["typicaldays"]["auto_N_range"]["value"] = [1, 5]
+    dh.model_config["reporting"]["save_path"]["value"] = str(data_path)
+    dh.model_config["solveroptions"]["solver"]["value"] = request.config.solver
+    dh._read_time_series()
+    dh._read_node_locations()
+    dh._read_energybalance_options()
+    dh._read_technology_data()
+    dh._read_network_data()
+    dh._cluster_data()
+
+    nr_typical_days = dh.nr_typical_days
+    assert nr_typical_days in [1, 2, 3]
+    assert dh.model_config["optimization"]["typicaldays"]["N"]["value"] == "auto"
+    assert len(dh.topology["time_index"]["clustered"]) == nr_typical_days * 24
+    assert "Mean" in dh.typical_days_selection.columns
+    assert not list(data_path.rglob("typical_days_selection.csv"))
+
+    pyhub.quick_solve()
+    report_path = (
+        pyhub.last_solve_info["result_folder_path"] / "typical_days_selection.csv"
+    )
+    pd.testing.assert_frame_equal(
+        pd.read_csv(report_path, sep=";", index_col=[0, 1, 2]),
+        dh.typical_days_selection,
+        check_names=False,
+    )
+
+
+@pytest.mark.data_management
+def test_full_resolution_matrix(request):
+    """
+    Tests the full resolution matrix of a data handle:
+    - technology coefficients are views into the matrix and keep their values
+    - data frame of the matrix does not copy data
+    - aggregated data is written back to time series and technologies
+    """
+    data_path = request.config.root_folder_path / "tests/case_study_full_pipeline"
+
+    dh = DataHandle()
+    dh.set_settings(data_path)
+    dh._read_topology()
+    dh._read_model_config()
+    dh._read_time_series()
+    dh._read_node_locations()
+    dh._read_technology_data()
+
+    technologies = dh.technology_data["period1"]
+    coefficients = {
+        (node, tec, series): np.array(coeff)
+        for node in technologies
+        for tec in technologies[node]
+        for series, coeff in technologies[node][
+            tec
+        ].processed_coeff.time_dependent_full.items()
+    }
+    assert coefficients
+
+    matrix = dh._get_full_res_matrix("period1")
+    full_res_data = matrix.to_frame()
+    assert np.shares_memory(full_res_data.to_numpy(), matrix.values)
+    np.testing.assert_array_equal(
+        full_res_data["time_series"].to_numpy(),
+        dh.time_series["full"]["period1"].to_numpy(),
+    )
+    for (node, tec, series), coeff in coefficients.items():
+        coeff_td = technologies[node][tec].processed_coeff.time_dependent_full
+        assert np.shares_memory(np.asarray(coeff_td[series]), matrix.values)
+        np.testing.assert_array_equal(np.asarray(coeff_td[series]), coeff)
+        np.testing.assert_array_equal(
+            full_res_data["tec_series"][node][tec][series].to_numpy(), coeff
+        )
+
+    # Aggregated data in different column order
+    aggregated_data = full_res_data.iloc[::2, ::-1].reset_index(drop=True)
+    aggregated_values = matrix.align(aggregated_data)
+    np.testing.assert_array_equal(aggregated_values, matrix.values[::2])
+    pd.testing.assert_frame_equal(
+        matrix.get_time_series(aggregated_values),
+        dh.time_series["full"]["period1"].iloc[::2].reset_index(drop=True),
+    )
+    matrix.write_aggregated_data(aggregated_values, "averaged")
+    for (node, tec, series), coeff in coefficients.items():
+        coeff_td = technologies[node][tec].processed_coeff.time_dependent_averaged
+        np.testing.assert_array_equal(coeff_td[series], coeff[::2])
+
+
+@pytest.mark.data_management
+def test_data_handle_memory_mapped_store(request):
+    """
+    Tests memory-mapped time series:
+    - time series and technology performances equal the data kept in memory
+    - data of investment periods and nodes are views of memory-mapped files
+    """
+    data_path = request.config.data_folder_path / "memmap_case"
+    shutil.copytree(
+        request.config.root_folder_path / "tests/case_study_full_pipeline", data_path
+    )
+
+    def read_data(time_series_store):
+        dh = DataHandle()
+        dh.set_settings(data_path)
+        dh._read_topology()
+        dh._read_model_config()
+        dh.model_config["data_management"]["time_series_store"][
+            "value"
+        ] = time_series_store
+        dh.model_config["optimization"]["typicaldays"]["N"]["value"] = 2
+        dh.model_config["data_management"]["aggregation_engine"]["value"] = "internal"
+        dh._read_time_series()
+        dh._read_node_locations()
+        dh._read_energybalance_options()
+        dh._read_technology_data()
+        dh._read_network_data()
+        dh._cluster_data()
+        return dh
+
+    def is_memory_mapped(array):
+        while array is not None:
+            if isinstance(array, np.memmap):
+                return True
+            array = array.base
+        return False
+
+    dh_memory = read_data("memory")
+    dh_memmap = read_data("memmap")
+    assert any((data_path / ".cache" / "time_series_store").rglob("*.npy"))
+
+    for aggregation_model in ["full", "clustered"]:
+        pd.testing.assert_frame_equal(
+            dh_memory.time_series[aggregation_model],
+            dh_memmap.time_series[aggregation_model],
+        )
+        data_node = get_data_for_node(
+            get_data_for_investment_period(dh_memmap, "period1", aggregation_model),
+            "node1",
+        )
+        assert is_memory_mapped(data_node["time_series"].values)
+
+    for node, technologies in dh_memmap.technology_data["period1"].items():
+        for tec, tec_data in technologies.items():
+            coeff = tec_data.processed_coeff
+            coeff_memory = dh_memory.technology_data["period1"][node][
+                tec
+            ].processed_coeff
+            for series in coeff.time_dependent_full:
+                assert is_memory_mapped(np.asarray(coeff.time_dependent_full[series]))
+                assert is_memory_mapped(coeff.time_dependent_clustered[series])
+                np.testing.assert_array_equal(
+                    coeff.time_dependent_clustered[series],
+                    coeff_memory.time_dependent_clustered[series],
+                )
+
+
+@pytest.mark.data_management
+def test_data_handle_refresh(request):
+    """
+    Tests refreshing the input data:
+    - unchanged data results in an empty change set
+    - changed time series are re-read without re-fitting technologies
+    - only technologies with a changed json file are re-fitted
+    - changed climate data re-fits all technologies at the node
+    - a changed model configuration reads all data again
+    """
+    data_path = request.config.data_folder_path / "refresh_case"
+    shutil.copytree(
+        request.config.root_folder_path / "tests/case_study_full_pipeline", data_path
+    )
+    node_path = data_path / "period1" / "node_data" / "node1"
+
+    dh = DataHandle()
+    dh.set_settings(data_path, start_period=0, end_period=24)
+    dh.read_data()
+    changes = dh.refresh()
+    assert not changes["files"]
+    assert not changes["investment_periods"]
+
+    # Time series
+    technologies = dict(dh.technology_data["period1"]["node1"])
+    carrier_file = node_path / "carrier_data" / "electricity.csv"
+    carrier_data = pd.read_csv(carrier_file, sep=";", index_col=0)
+    carrier_data["Demand"] = 7
+    carrier_data.to_csv(carrier_file, sep=";")
+    changes = dh.refresh()
+    assert changes["files"] == ["period1/node_data/node1/carrier_data/electricity.csv"]
+    assert changes["time_series"] == [
+        ("period1", "node1", "CarrierData", "electricity")
+    ]
+    assert not changes["technologies"]
+    assert changes["investment_periods"] == ["period1"]
+    assert (
+        dh.time_series["full"]["period1"]["node1"]["CarrierData"]["electricity"][
+            "Demand"
+        ]
+        == 7
+    ).all()
+    for tec, tec_data in technologies.items():
+        assert dh.technology_data["period1"]["node1"][tec] is tec_data
+
+    # Technology json
+    tec_file = node_path / "technology_data" / "TestTec_WindTurbine.json"
+    tec_file.touch()
+    assert not dh.refresh()["files"]
+    with open(tec_file) as json_file:
+        tec_json = json.load(json_file)
+    tec_json["Economics"]["unit_CAPEX"] = tec_json["Economics"]["unit_CAPEX"] * 2
+    with open(tec_file, "w") as json_file:
+        json.dump(tec_json, json_file)
+    changes = dh.refresh()
+    assert changes["technologies"] == [("period1", "node1", "TestTec_WindTurbine")]
+    assert not changes["time_series"]
+    assert (
+        dh.technology_data["period1"]["node1"]["TestTec_WindTurbine"]
+        is not technologies["TestTec_WindTurbine"]
+    )
+    assert (
+        dh.technology_data["period1"]["node1"]["TestTec_GasTurbine_simple_existing"]
+        is technologies["TestTec_GasTurbine_simple_existing"]
+    )
+
+    # Climate data
+    climate_file = node_path / "ClimateData.csv"
+    climate_data = pd.read_csv(climate_file, sep=";", index_col=0)
+    climate_data["temp_air"] = 10
+    climate_data.to_csv(climate_file, sep=";")
+    changes = dh.refresh()
+    assert sorted(changes["technologies"]) == sorted(
+        ("period1", "node1", tec) for tec in technologies
+    )
+
+    # Model configuration
+    with open(data_path / "ConfigModel.json") as json_file:
+        config = json.load(json_file)
+    config["optimization"]["typicaldays"]["N"]["value"] = 1
+    with open(data_path / "ConfigModel.json", "w") as json_file:
+        json.dump(config, json_file)
+    changes = dh.refresh()
+    assert changes["full_reload"]
+    assert "clustered" in dh.time_series
+
+
+@pytest.mark.data_management
+def test_case_bundle(request):
+    """
+    Tests case bundles:
+    - data read from a bundle equals data read from the folder
+    - an imported bundle equals the original folder
+    - changes of a re-exported bundle are detected when refreshing
+    """
+    data_path = request.config.data_folder_path / "bundle_case"
+    shutil.copytree(
+        request.config.root_folder_path / "tests/case_study_full_pipeline", data_path
+    )
+    bundle_path = request.config.data_folder_path / "bundle_case.h5"
+    export_case_bundle(data_path, bundle_path)
+
+    def read_data(path):
+        dh = DataHandle()
+        dh.set_settings(path, start_period=0, end_period=24)
+        dh.read_data()
+        return dh
+
+    dh_folder = read_data(data_path)
+    dh_bundle = read_data(bundle_path)
+    pd.testing.assert_frame_equal(
+        dh_folder.time_series["full"]["period1"],
+        dh_bundle.time_series["full"]["period1"],
+    )
+    pd.testing.assert_frame_equal(dh_folder.node_locations, dh_bundle.node_locations)
+    assert dh_folder.energybalance_options == dh_bundle.energybalance_options
+    for node, technologies in dh_folder.technology_data["period1"].items():
+        assert list(technologies) == list(dh_bundle.technology_data["period1"][node])
+        for tec, tec_data in technologies.items():
+            tec_bundle = dh_bundle.technology_data["period1"][node][tec]
+            assert (
+                tec_data.processed_coeff.time_independent
+                == tec_bundle.processed_coeff.time_independent
+            )
+    for netw, netw_data in dh_folder.network_data["period1"].items():
+        netw_bundle = dh_bundle.network_data["period1"][netw]
+        pd.testing.assert_frame_equal(netw_data.connection, netw_bundle.connection)
+        pd.testing.assert_frame_equal(netw_data.distance, netw_bundle.distance)
+
+    import_path = request.config.data_folder_path / "bundle_case_imported"
+    import_case_bundle(bundle_path, import_path)
+    pd.testing.assert_frame_equal(
+        dh_folder.time_series["full"]["period1"],
+        read_data(import_path).time_series["full"]["period1"],
+    )
+
+    carrier_file = (
+        data_path / "period1" / "node_data" / "node1" / "carrier_data" / "gas.csv"
+    )
+    carrier_data = pd.read_csv(carrier_file, sep=";", index_col=0)
+    carrier_data["Import price"] = 3
+    carrier_data.to_csv(carrier_file, sep=";")
+    export_case_bundle(data_path, bundle_path)
+    changes = dh_bundle.refresh()
+    assert changes["time_series"] == [("period1", "node1", "CarrierData", "gas")]
+    assert (
+        dh_bundle.time_series["full"]["period1"]["node1"]["CarrierData"]["gas"][
+            "Import price"
+        ]
+        == 3
+    ).all()
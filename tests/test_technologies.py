@@ -1,3 +1,4 @@
+import os
 import warnings
 
 import pytest
@@ -5,6 +6,10 @@ from pathlib import Path
 from pyomo.environ import ConcreteModel, Set, Constraint, TerminationCondition
 import json
 import numpy as np
+import pandas as pd
+import pvlib
+import statsmodels.api as sm
+from scipy.interpolate import griddata
 
 from tests.utilities import (
     make_climate_data,
@@ -15,6 +20,26 @@ from adopt_net0.components.technologies.technology import Technology
 from adopt_net0.data_management.utilities import open_json, select_technology
 from adopt_net0.components.utilities import annualize
 from adopt_net0.components.utilities import perform_disjunct_relaxation
+from adopt_net0.components.technologies.genericTechnologies.res import (
+    calculate_pv_capacity_factors,
+    calculate_wt_capacity_factors,
+)
+from adopt_net0.components.technologies.resources import (
+    get_pv_module,
+    get_pv_module_database,
+    get_timezone,
+    get_timezone_finder,
+    get_user_cache_path,
+    get_wind_turbine_data,
+)
+from adopt_net0.components.technologies.utilities import (
+    fit_linear_function,
+    fit_piecewise_function,
+    fit_piecewise_function_batch,
+    calculate_interpolation_weights,
+    interpolate_linear,
+    interpolate_performance_points,
+)
 
 
 def define_technology(
@@ -1118,3 +1143,259 @@ def test_ccs(request):
     assert round(model.var_input_tot[1, "electricity"].value, 3) >= 0.001
     assert cost_ccs > cost_no_ccs * 1.01
     assert emissions_ccs < emissions_no_ccs * 0.11
+
+
+@pytest.mark.technologies
+def test_fit_piecewise_function_batch():
+    """
+    tests that the batch fit of piecewise functions matches the fit of
+    fit_piecewise_function for each data set
+    """
+    nr_sets = 20
+    x = np.linspace(0.3, 1, 9)
+    scale = np.linspace(1, 5, nr_sets)
+    Y = {
+        "convex": np.outer(scale, (x / (1 - 0.9 * (1 - x))) * x),
+        "concave": np.outer(scale, np.sqrt(x)),
+    }
+
+    fit_batch = fit_piecewise_function_batch(x, Y, 2)
+
+    for idx in range(nr_sets):
+        fit = fit_piecewise_function(
+            x, {car: Y[car][idx, :] for car in Y}, nr_segments=2
+        )
+        for car in Y:
+            for point in x:
+                value = calculate_piecewise_function(
+                    point, fit[car]["bp_x"], fit[car]["bp_y"]
+                )
+                value_batch = calculate_piecewise_function(
+                    point, fit_batch[car]["bp_x"][idx], fit_batch[car]["bp_y"][idx]
+                )
+                assert abs(value - value_batch) <= 0.01 * abs(value)
+
+
+@pytest.mark.technologies
+def test_interpolation_weights():
+    """
+    tests that interpolation with precomputed weights matches scipy's griddata
+    """
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 1, (15, 2))
+    values = rng.normal(size=(15, 3))
+    xi = rng.uniform(-0.1, 1.1, (100, 2))
+
+    vertices, weights = calculate_interpolation_weights(points, xi)
+    interpolated = interpolate_linear(vertices, weights, values)
+
+    for var in range(values.shape[1]):
+        expected = griddata(points, values[:, var], xi, method="linear")
+        np.testing.assert_allclose(interpolated[:, var], expected, atol=1e-12)
+
+
+@pytest.mark.technologies
+def test_interpolate_performance_points():
+    """
+    tests that the interpolation of performance points with shuffled rows matches
+    scipy's griddata for each performance point
+    """
+    rng = np.random.default_rng(0)
+    labels = [2, 5, 9]
+    coordinates = rng.uniform(0, 1, (15, 2))
+    xi = rng.uniform(0, 1, (50, 2))
+
+    for shared_coordinates in [True, False]:
+        data = pd.DataFrame(
+            [
+                [label, *coordinate]
+                for label in labels
+                for coordinate in (
+                    coordinates
+                    if shared_coordinates or label != 5
+                    else rng.uniform(0, 1, (15, 2))
+                )
+            ],
+            columns=["Point", "x", "y"],
+        )
+        data["value1"] = rng.normal(size=len(data))
+        data["value2"] = rng.normal(size=len(data))
+        data = data.sample(frac=1, random_state=0)
+
+        interpolated = interpolate_performance_points(
+            data.Point.to_numpy(),
+            data[["x", "y"]].to_numpy(),
+            data[["value1", "value2"]].to_numpy(),
+            xi,
+        )
+
+        assert interpolated.shape == (len(xi), len(labels), 2)
+        for column, label in enumerate(labels):
+            point_data = data.loc[data.Point == label]
+            for var, value in enumerate(["value1", "value2"]):
+                expected = griddata(
+                    point_data[["x", "y"]].to_numpy(),
+                    point_data[value].to_numpy(),
+                    xi,
+                    method="linear",
+                )
+                np.testing.assert_allclose(
+                    interpolated[:, column, var], expected, atol=1e-12
+                )
+
+
+@pytest.mark.technologies
+def test_heat_pump_fitting(request):
+    """
+    tests the vectorized fit of the heat pump against a fit for each timestep
+    """
+    time_steps = 24
+    technology = "TestTec_HeatPump_AirSourced"
+
+    climate_data = make_climate_data("2022-01-01 12:00", time_steps)
+    climate_data["temp_air"] = np.linspace(-10, 30, time_steps)
+
+    for perf_funct in [1, 2, 3]:
+        with open(
+            request.config.technology_data_folder_path / (technology + ".json")
+        ) as json_file:
+            tec = json.load(json_file)
+        tec["name"] = technology
+        tec["Performance"]["performance_function_type"] = perf_funct
+        tec = select_technology(tec)
+        tec.fit_technology_performance(climate_data, {})
+        coeff = tec.processed_coeff.time_dependent_full
+
+        # Fit for each timestep
+        if tec.input_parameters.performance_data["application"] == "floor_heating":
+            t_out = 30 - 0.5 * climate_data["temp_air"]
+        elif tec.input_parameters.performance_data["application"] == "radiator_heating":
+            t_out = 40 - climate_data["temp_air"]
+        else:
+            t_out = tec.input_parameters.performance_data["T_out"]
+        delta_T = t_out - climate_data["temp_air"]
+        cop = 6.08 - 0.09 * delta_T + 0.0005 * delta_T**2
+        x = np.linspace(tec.input_parameters.performance_data["min_part_load"], 1, 9)
+
+        for t, cop_t in enumerate(cop):
+            y = (x / (1 - 0.9 * (1 - x))) * cop_t * x
+            if perf_funct == 1:
+                expected = fit_linear_function(x, y)
+                assert coeff["alpha1"][t, 0] == pytest.approx(expected[0], abs=1e-5)
+            elif perf_funct == 2:
+                expected = fit_linear_function(sm.add_constant(x), y)
+                assert coeff["alpha1"][t, 0] == pytest.approx(expected[1], abs=1e-5)
+                assert coeff["alpha2"][t, 0] == pytest.approx(expected[0], abs=1e-5)
+            elif perf_funct == 3:
+                expected = fit_piecewise_function(x, {"out": y}, 2)["out"]
+                bp_x = coeff["bp_x"][t, :]
+                bp_y = np.append(
+                    coeff["alpha1"][t, :] * bp_x[:-1] + coeff["alpha2"][t, :],
+                    coeff["alpha1"][t, -1] * bp_x[-1] + coeff["alpha2"][t, -1],
+                )
+                for point in x:
+                    value = calculate_piecewise_function(
+                        point, expected["bp_x"], expected["bp_y"]
+                    )
+                    value_vectorized = calculate_piecewise_function(point, bp_x, bp_y)
+                    assert abs(value - value_vectorized) <= 0.01 * abs(value)
+
+
+@pytest.mark.technologies
+def test_res_shared_resources():
+    """
+    tests that static data for fitting renewables is loaded once per process
+    """
+    assert get_pv_module_database() is get_pv_module_database()
+    assert get_timezone_finder() is get_timezone_finder()
+    assert get_wind_turbine_data() is get_wind_turbine_data()
+    assert get_timezone(5.5, 52.5) == "Europe/Amsterdam"
+    module = get_pv_module("SunPower_SPR_X20_327")
+    assert module["STC"] > 0
+
+
+@pytest.mark.technologies
+def test_res_module_database_cache(request, monkeypatch):
+    """
+    tests that the PV module database is cached in a folder of the user
+    """
+    cache_home = request.config.result_folder_path / "user_cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    monkeypatch.setenv("LOCALAPPDATA", str(cache_home))
+    cache_path = get_user_cache_path()
+    assert cache_path == cache_home / "adopt_net0"
+
+    get_pv_module_database.cache_clear()
+    module_database = get_pv_module_database()
+    assert len(list(cache_path.glob("CECMod_*.pkl"))) == 1
+
+    get_pv_module_database.cache_clear()
+    pd.testing.assert_frame_equal(get_pv_module_database(), module_database)
+    if os.name != "nt":
+        assert cache_path.stat().st_mode & 0o077 == 0
+
+
+@pytest.mark.technologies
+def test_res_capacity_factors_multiple_nodes():
+    """
+    tests that capacity factors calculated for multiple nodes at once are equal to
+    the ones from a pvlib ModelChain and from a calculation per node
+    """
+    rng = np.random.default_rng(0)
+    climate_data = []
+    locations = []
+    for _ in range(3):
+        data = make_climate_data("2022-06-01 00:00", 48)
+        data["ghi"] = rng.random(48) * 800
+        data["dni"] = data["ghi"] * 0.6
+        data["dhi"] = data["ghi"] * 0.3
+        data["temp_air"] = rng.random(48) * 30
+        data["ws10"] = rng.random(48) * 15
+        climate_data.append(data)
+        locations.append(
+            {"lon": rng.random() * 20, "lat": 40 + rng.random() * 20, "alt": 10}
+        )
+
+    # PV
+    system_data = {
+        "tilt": 30,
+        "surface_azimuth": 170,
+        "module_name": "SunPower_SPR_X20_327",
+        "inverter_eff": 0.96,
+    }
+    capacity_factors = calculate_pv_capacity_factors(
+        climate_data, locations, system_data
+    )
+    module = get_pv_module(system_data["module_name"])
+    for node, (data, location) in enumerate(zip(climate_data, locations)):
+        system = pvlib.pvsystem.PVSystem(
+            surface_tilt=system_data["tilt"],
+            surface_azimuth=system_data["surface_azimuth"],
+            module_parameters=module,
+            inverter_parameters={"pdc0": 5000, "eta_inv_nom": 0.96},
+            temperature_model_parameters=pvlib.temperature.TEMPERATURE_MODEL_PARAMETERS[
+                "sapm"
+            ]["open_rack_glass_glass"],
+        )
+        pv_model = pvlib.modelchain.ModelChain(
+            system,
+            pvlib.location.Location(
+                location["lat"], location["lon"], altitude=location["alt"]
+            ),
+            spectral_model="no_loss",
+            aoi_model="physical",
+        )
+        pv_model.run_model(data.astype(float))
+        expected = round(pv_model.results.ac.p_mp / module.STC, 3).values
+        assert np.allclose(capacity_factors[:, node], expected)
+    assert capacity_factors.max() > 0
+
+    # Wind turbine
+    capacity_factors = calculate_wt_capacity_factors(
+        climate_data, "WindTurbine_Onshore_1500", 120
+    )
+    for node, data in enumerate(climate_data):
+        assert np.array_equal(
+            capacity_factors[:, [node]],
+            calculate_wt_capacity_factors([data], "WindTurbine_Onshore_1500", 120),
+        )